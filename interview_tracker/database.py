@@ -0,0 +1,116 @@
+"""
+Database configuration read from the environment
+
+DATABASE_PROFILE picks one of:
+
+- ``sqlite`` (default): the development setup, a plain SQLite file
+- ``sqlite-tuned``: SQLite for small deployments, in WAL mode so readers
+  don't wait for the writer, with a busy timeout instead of instant
+  "database is locked" errors
+- ``postgres``: PostgreSQL, with persistent health-checked connections or,
+  when DATABASE_POOL is set, a psycopg connection pool (requires
+  ``psycopg[pool]``)
+
+Compare them with ``python manage.py benchmark_concurrency``.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+PROFILES = ('sqlite', 'sqlite-tuned', 'postgres')
+
+
+def _env(env, name, default=None):
+    value = env.get(name, '').strip()
+    return value if value else default
+
+
+def _env_bool(env, name, default=False):
+    value = _env(env, name)
+    if value is None:
+        return default
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ImproperlyConfigured(f'{name} must be a boolean, not {value!r}')
+
+
+def _env_int(env, name, default):
+    value = _env(env, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f'{name} must be an integer, not {value!r}') from None
+
+
+def _sqlite_config(env, base_dir, tuned):
+    config = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _env(env, 'DATABASE_NAME', base_dir / 'db.sqlite3'),
+    }
+    if tuned:
+        config['OPTIONS'] = {
+            # Seconds a connection waits for the write lock before failing
+            'timeout': _env_int(env, 'DATABASE_SQLITE_BUSY_TIMEOUT', 5),
+            # Take the write lock when the transaction starts: a deferred transaction
+            # that later writes can't wait for the lock and fails at once
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                # Durable at each checkpoint rather than each commit, which is safe in WAL mode
+                'PRAGMA synchronous=NORMAL',
+                f"PRAGMA mmap_size={_env_int(env, 'DATABASE_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+            ]),
+        }
+    return config
+
+
+def _postgres_config(env):
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': _env(env, 'DATABASE_NAME', 'interview_tracker'),
+        'USER': _env(env, 'DATABASE_USER', ''),
+        'PASSWORD': _env(env, 'DATABASE_PASSWORD', ''),
+        'HOST': _env(env, 'DATABASE_HOST', ''),
+        'PORT': _env(env, 'DATABASE_PORT', ''),
+        'OPTIONS': {},
+    }
+    if _env_bool(env, 'DATABASE_POOL'):
+        # Django refuses persistent connections with a pool: the pool keeps them instead
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': _env_int(env, 'DATABASE_POOL_MIN_SIZE', 2),
+            'max_size': _env_int(env, 'DATABASE_POOL_MAX_SIZE', 10),
+            # Seconds a request waits for a free connection
+            'timeout': _env_int(env, 'DATABASE_POOL_TIMEOUT', 10),
+        }
+    else:
+        # Reuse each worker's connection for this many seconds, checking it is
+        # still alive before each request that reuses it
+        config['CONN_MAX_AGE'] = _env_int(env, 'DATABASE_CONN_MAX_AGE', 60)
+        config['CONN_HEALTH_CHECKS'] = True
+    return config
+
+
+def database_config(base_dir, env=None):
+    """
+    The default entry of DATABASES for the DATABASE_PROFILE of the environment
+
+    Args:
+        base_dir: Directory of the default SQLite file
+        env: Mapping of environment variables (default: os.environ)
+
+    Returns:
+        dict: Settings of the default database
+    """
+    env = os.environ if env is None else env
+    profile = _env(env, 'DATABASE_PROFILE', 'sqlite')
+    if profile == 'postgres':
+        return _postgres_config(env)
+    if profile in ('sqlite', 'sqlite-tuned'):
+        return _sqlite_config(env, base_dir, tuned=profile == 'sqlite-tuned')
+    raise ImproperlyConfigured(f"DATABASE_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}")
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Does nothing unless QUERY_PROFILER_ENABLED is set; first so it sees every query
+    'jobs.middleware.QueryProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,12 +77,17 @@ WSGI_APPLICATION = 'interview_tracker.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+#
+# Chosen by the DATABASE_PROFILE environment variable, see interview_tracker/database.py:
+#   sqlite (default)  SQLite file at DATABASE_NAME (default: db.sqlite3)
+#   sqlite-tuned      SQLite in WAL mode with synchronous=NORMAL, mmap and a busy timeout
+#                     (DATABASE_SQLITE_BUSY_TIMEOUT seconds, DATABASE_SQLITE_MMAP_SIZE bytes)
+#   postgres          PostgreSQL at DATABASE_NAME/USER/PASSWORD/HOST/PORT, reusing connections for
+#                     DATABASE_CONN_MAX_AGE seconds (default: 60) with health checks; with DATABASE_POOL=1
+#                     a psycopg pool of DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections instead
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
 }
 
 
@@ -126,6 +135,51 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# The default per-process cache is fine for development; multi-process
+# deployments need a shared backend (e.g. Redis or Memcached) so that cache
+# invalidation reaches every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a user's dashboard data stays cached (it is also dropped on change)
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Seconds the rendered fragments of an application's detail page stay cached
+# (they are retired as soon as the application, its interviews or notes change)
+APPLICATION_FRAGMENT_CACHE_TIMEOUT = 3600
+
+# Company and position autocomplete endpoints
+AUTOCOMPLETE_RESULT_LIMIT = 20
+AUTOCOMPLETE_CACHE_TIMEOUT = 60  # Seconds results are cached, server side and in the browser
+
+# Maximum number of results returned by a full-text search
+SEARCH_RESULT_LIMIT = 1000
+
+# Per-request query profiler (Server-Timing header and a JSON log line per request)
+QUERY_PROFILER_ENABLED = False
+QUERY_PROFILER_SIMILAR_THRESHOLD = 3  # Repeats of one query shape reported as an N+1 pattern
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'jobs.profiler': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Rows written per transaction by the bulk application import
+IMPORT_BATCH_SIZE = 1000
+
+# Applications fetched per query (and Parquet row group size) by the streaming export
+EXPORT_CHUNK_SIZE = 2000
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'  # You can change this based on your email provider
@@ -135,10 +189,29 @@ EMAIL_HOST_USER = ''  # Set your email here
 EMAIL_HOST_PASSWORD = ''  # Set your email password or app password here
 DEFAULT_FROM_EMAIL = ''  # Set your default from email here
 
+# Outbound email queue, drained by `python manage.py send_queued_emails`
+EMAIL_QUEUE_CONCURRENCY = 4  # Emails sent in parallel by the worker
+EMAIL_QUEUE_MAX_ATTEMPTS = 5  # Attempts before a queued email is marked as failed
+EMAIL_MAX_MESSAGES_PER_CONNECTION = 100  # SMTP connections are reused, then recycled after this many messages
+EMAIL_RENDER_CACHE_TIMEOUT = 3600  # Seconds rendered HR application emails are cached
+EMAIL_ATTACHMENT_CACHE_BYTES = 32 * 1024 * 1024  # In-process cache of encoded attachments, per worker
+
+# Reminders, queued by `python manage.py send_reminders`
+REMINDER_INTERVIEW_LEAD_HOURS = 24  # Remind of interviews starting within this many hours
+REMINDER_DEADLINE_LEAD_DAYS = 3  # Remind of draft applications due within this many days
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 
+# Documents are streamed to storage, so their size isn't bound by the limits above
+DOCUMENT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB
+DOCUMENT_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # Files larger than this are uploaded in resumable chunks
+DOCUMENT_UPLOAD_EXPIRY_HOURS = 24  # Abandoned resumable uploads are purged after this long
+# Set to an nginx "internal" location aliasing MEDIA_ROOT (e.g. '/protected-media/') to let
+# nginx send document downloads via X-Accel-Redirect once the view has checked access
+DOCUMENT_DOWNLOAD_ACCEL_REDIRECT = None
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
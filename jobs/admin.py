@@ -1,13 +1,13 @@
 from django.contrib import admin
-from .models import Company, JobPosition, Document, JobApplication, InterviewRound, ApplicationNote
+from .models import Company, JobPosition, Document, JobApplication, InterviewRound, ApplicationNote, ApplicationStatsSnapshot, OutboundEmail, ReminderLog
 
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
-    list_display = ['name', 'location', 'industry', 'created_at']
+    list_display = ['name', 'location', 'industry', 'application_count', 'created_at']
     list_filter = ['industry', 'created_at']
-    search_fields = ['name', 'location', 'industry']
-    readonly_fields = ['created_at', 'updated_at']
+    search_fields = ['name', 'normalized_name', 'location', 'industry']
+    readonly_fields = ['normalized_name', 'application_count', 'created_at', 'updated_at']
 
 
 @admin.register(JobPosition)
@@ -42,10 +42,15 @@ class ApplicationNoteInline(admin.TabularInline):
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'position', 'status', 'priority', 'applied_date', 'email_sent', 'created_at']
+    list_display = [
+        'user', 'position', 'status', 'priority', 'applied_date', 'email_sent',
+        'interview_round_count', 'note_count', 'last_activity_at', 'created_at',
+    ]
     list_filter = ['status', 'priority', 'email_sent', 'applied_date', 'created_at', 'position__company']
     search_fields = ['user__username', 'position__title', 'position__company__name', 'hr_name', 'recruiter_name']
-    readonly_fields = ['created_at', 'updated_at', 'email_sent_date']
+    readonly_fields = [
+        'created_at', 'updated_at', 'email_sent_date', 'interview_round_count', 'note_count', 'last_activity_at'
+    ]
     raw_id_fields = ['user', 'position', 'resume', 'cover_letter']
     inlines = [InterviewRoundInline, ApplicationNoteInline]
     
@@ -65,6 +70,9 @@ class JobApplicationAdmin(admin.ModelAdmin):
         ('Additional Information', {
             'fields': ('notes',)
         }),
+        ('Activity', {
+            'fields': ('interview_round_count', 'note_count', 'last_activity_at')
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -92,3 +100,30 @@ class ApplicationNoteAdmin(admin.ModelAdmin):
     def note_preview(self, obj):
         return obj.note[:50] + '...' if len(obj.note) > 50 else obj.note
     note_preview.short_description = 'Note Preview'
+
+
+
+@admin.register(ApplicationStatsSnapshot)
+class ApplicationStatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+    raw_id_fields = ['user']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'user', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'user__username']
+    readonly_fields = ['created_at', 'updated_at', 'sent_at']
+    raw_id_fields = ['user', 'application']
+
+
+@admin.register(ReminderLog)
+class ReminderLogAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'user', 'due_at', 'created_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at']
+    raw_id_fields = ['user']
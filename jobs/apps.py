@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        # Connect signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .company_utils import normalize_company_name
+from .models import Company, JobPosition
+
+
+# Greater than any character, so [prefix, prefix + MAX_CHAR) holds every string starting with prefix
+MAX_CHAR = '\U0010ffff'
+MAX_QUERY_LENGTH = 100
+
+
+def autocomplete_limit():
+    """Most results an autocomplete endpoint returns"""
+    return getattr(settings, 'AUTOCOMPLETE_RESULT_LIMIT', 20)
+
+
+def autocomplete_cache_timeout():
+    """Seconds autocomplete results are cached, on the server and in the browser"""
+    return getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 60)
+
+
+def prefix_q(field, prefix):
+    """
+    Match values of field starting with prefix, in a way an index can serve
+
+    The range lets the database seek a plain B-tree index; startswith
+    keeps the match exact where the collation doesn't order by code point.
+    """
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + MAX_CHAR, f'{field}__startswith': prefix})
+
+
+def _generation_key(kind):
+    return f'jobs:autocomplete_generation:{kind}'
+
+
+def invalidate_autocomplete(*kinds):
+    """Retire the cached results of the given kinds ('companies', 'positions'), e.g. after a save"""
+    cache.set_many({_generation_key(kind): uuid.uuid4().hex[:12] for kind in kinds}, None)
+
+
+def _cached(kind, parts, load):
+    generation_key = _generation_key(kind)
+    cache.add(generation_key, uuid.uuid4().hex[:12], None)
+    digest = hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+    key = f'jobs:autocomplete:{kind}:{cache.get(generation_key)}:{digest}'
+    results = cache.get(key)
+    if results is None:
+        results = load()
+        cache.set(key, results, autocomplete_cache_timeout())
+    return results
+
+
+def autocomplete_companies(query, limit=None):
+    """
+    Companies whose normalized name starts with the normalized query
+
+    Served by the unique index on Company.normalized_name. An empty query
+    returns the first companies by name.
+
+    Returns:
+        list: dicts with id and text (the company name)
+    """
+    limit = limit or autocomplete_limit()
+    prefix = normalize_company_name(query[:MAX_QUERY_LENGTH])
+
+    def load():
+        companies = Company.objects.all()
+        if prefix:
+            companies = companies.filter(prefix_q('normalized_name', prefix)).order_by('normalized_name')
+        else:
+            companies = companies.order_by('name', 'id')
+        return [
+            {'id': row['id'], 'text': row['name']}
+            for row in companies.values('id', 'name')[:limit]
+        ]
+
+    return _cached('companies', [prefix, limit], load)
+
+
+def autocomplete_positions(query, company_id=None, limit=None):
+    """
+    Positions whose title starts with the query, case-insensitively
+
+    Served by the index on lower(title). An empty query returns the
+    latest positions.
+
+    Args:
+        query: Typed text
+        company_id: Only positions of this company
+        limit: Maximum number of results (default: AUTOCOMPLETE_RESULT_LIMIT)
+
+    Returns:
+        list: dicts with id, text ("<title> at <company>"), title, company and company_id
+    """
+    limit = limit or autocomplete_limit()
+    prefix = query[:MAX_QUERY_LENGTH].strip().lower()
+
+    def load():
+        positions = JobPosition.objects.all()
+        if company_id:
+            positions = positions.filter(company_id=company_id)
+        if prefix:
+            positions = positions.annotate(title_key=Lower('title')).filter(
+                prefix_q('title_key', prefix)
+            ).order_by('title_key', 'id')
+        else:
+            positions = positions.order_by('-id')
+        rows = positions.values('id', 'title', 'company_id', 'company__name')[:limit]
+        return [
+            {
+                'id': row['id'],
+                'text': f"{row['title']} at {row['company__name']}",
+                'title': row['title'],
+                'company': row['company__name'],
+                'company_id': row['company_id'],
+            }
+            for row in rows
+        ]
+
+    return _cached('positions', [prefix, company_id, limit], load)
@@ -0,0 +1,443 @@
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .counter_utils import rebuild_counters
+from .email_utils import (build_deadline_reminder_email, build_hr_application_email_content,
+                          build_interview_reminder_email, build_status_update_email,
+                          hr_application_email_cache_key)
+from .models import ApplicationNote, Company, Document, InterviewRound, JobApplication, JobPosition
+from .profiling_utils import profile_queries
+
+
+INDUSTRIES = ['Technology', 'Finance', 'Healthcare', 'Education', 'Manufacturing', 'Retail', 'Other', None]
+TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'Designer', 'DevOps Engineer',
+          'QA Engineer', 'Data Scientist', 'Backend Developer', 'Frontend Developer', 'Support Engineer']
+STATUS_WEIGHTS = {
+    'DRAFT': 10, 'APPLIED': 40, 'PHONE_SCREEN': 10, 'TECHNICAL_INTERVIEW': 6, 'ONSITE_INTERVIEW': 4,
+    'FINAL_INTERVIEW': 2, 'OFFER_RECEIVED': 2, 'ACCEPTED': 1, 'REJECTED': 20, 'WITHDRAWN': 5,
+}
+INTERVIEW_STATUS_WEIGHTS = {'SCHEDULED': 40, 'COMPLETED': 45, 'CANCELLED': 10, 'RESCHEDULED': 5}
+# Seeded documents cycle through these types; the first one of each user is the default resume
+DOCUMENT_TYPES = ['RESUME', 'COVER_LETTER', 'PORTFOLIO', 'OTHER']
+NOTES = ['Followed up with the recruiter', 'Referral from a former colleague', 'Asked about remote work',
+         'Salary range discussed on the phone', 'Waiting for feedback from the team']
+
+
+@contextmanager
+def _without_auto_now(model, *field_names):
+    """Let bulk_create keep explicit timestamps instead of stamping them with now()"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_dataset(users=100, companies=1000, positions_per_company=10, applications=10000,
+                 interview_ratio=0.3, note_ratio=0.2, documents_per_user=2, batch_size=5000, seed=0,
+                 stdout=None):
+    """
+    Bulk-create a synthetic dataset for benchmarks
+
+    Rows are written with bulk_create in batches of batch_size, so memory
+    stays flat whatever the size. Signals don't fire for bulk_create:
+    statistics snapshots and the search index are not maintained for the
+    seeded rows. The counter columns are recomputed at the end.
+
+    Args:
+        users: Number of users
+        companies: Number of companies
+        positions_per_company: Number of positions per company
+        applications: Number of applications, spread round-robin over the users
+        interview_ratio: Fraction of applications that get interview rounds
+        note_ratio: Fraction of applications that get notes
+        documents_per_user: Number of documents per user; half of the applications
+            of a user with documents are sent with their default resume
+        batch_size: Rows per bulk_create
+        seed: Random seed, so runs are reproducible
+        stdout: Optional stream for progress messages
+
+    Returns:
+        dict: Number of rows created per model
+    """
+    if applications > users * companies * positions_per_company:
+        raise ValueError('Not enough users x positions for that many unique applications')
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    interview_statuses, interview_weights = zip(*INTERVIEW_STATUS_WEIGHTS.items())
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    user_objects = User.objects.bulk_create(
+        [
+            User(username=f'bench_user_{index}', email=f'bench_user_{index}@example.com',
+                 first_name='Bench', last_name=f'User {index}', password='!')
+            for index in range(users)
+        ],
+        batch_size=batch_size
+    )
+    user_ids = [user.pk for user in user_objects]
+    log(f'Created {users} users')
+
+    # Only the names are stored; no file is written to the document storage
+    document_objects = Document.objects.bulk_create(
+        [
+            Document(user_id=user_id, name=f'Document {index}', is_default=index == 0,
+                     document_type=DOCUMENT_TYPES[index % len(DOCUMENT_TYPES)],
+                     file=f'bench/{user_id}/document_{index}.pdf')
+            for user_id in user_ids
+            for index in range(documents_per_user)
+        ],
+        batch_size=batch_size
+    )
+    resume_ids = {document.user_id: document.pk for document in document_objects if document.is_default}
+    log(f'Created {len(document_objects)} documents')
+
+    company_objects = Company.objects.bulk_create(
+        [
+            Company(name=f'Company {index}', normalized_name=f'company {index}',
+                    industry=rng.choice(INDUSTRIES), location=f'City {index % 50}')
+            for index in range(companies)
+        ],
+        batch_size=batch_size
+    )
+    log(f'Created {companies} companies')
+
+    position_ids = []
+    positions = (
+        JobPosition(company=company, title=f'{rng.choice(TITLES)} {index}')
+        for company in company_objects
+        for index in range(positions_per_company)
+    )
+    for batch in _batched(positions, batch_size):
+        position_ids.extend(position.pk for position in JobPosition.objects.bulk_create(batch))
+    log(f'Created {len(position_ids)} positions')
+
+    # Application k goes to user k % users and position k // users, which
+    # keeps (user, position) unique without tracking pairs
+    def make_applications():
+        for index in range(applications):
+            user_id = user_ids[index % users]
+            created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            yield JobApplication(
+                user_id=user_id,
+                position_id=position_ids[index // users],
+                status=rng.choices(statuses, status_weights)[0],
+                priority=rng.choice(['LOW', 'MEDIUM', 'HIGH']),
+                deadline=(now + timedelta(days=rng.randint(-30, 60))).date() if rng.random() < 0.3 else None,
+                resume_id=resume_ids.get(user_id) if rng.random() < 0.5 else None,
+                created_at=created_at,
+                updated_at=created_at,
+                last_activity_at=created_at,
+            )
+
+    application_count = interview_count = note_count = 0
+    with _without_auto_now(JobApplication, 'created_at', 'updated_at'), \
+            _without_auto_now(ApplicationNote, 'created_at', 'updated_at'):
+        for batch in _batched(make_applications(), batch_size):
+            with transaction.atomic():
+                created = JobApplication.objects.bulk_create(batch)
+                interviews = []
+                notes = []
+                for application in created:
+                    if rng.random() < note_ratio:
+                        for _ in range(rng.randint(1, 3)):
+                            noted_at = application.created_at + timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+                            notes.append(ApplicationNote(
+                                application_id=application.pk, note=rng.choice(NOTES),
+                                created_at=noted_at, updated_at=noted_at,
+                            ))
+                    if rng.random() >= interview_ratio:
+                        continue
+                    for round_number in range(1, rng.randint(1, 3) + 1):
+                        interviews.append(InterviewRound(
+                            application_id=application.pk,
+                            round_number=round_number,
+                            interview_type=rng.choice(['PHONE', 'VIDEO', 'TECHNICAL', 'ONSITE']),
+                            scheduled_date=now + timedelta(minutes=rng.randint(-90 * 24 * 60, 90 * 24 * 60)),
+                            status=rng.choices(interview_statuses, interview_weights)[0],
+                        ))
+                InterviewRound.objects.bulk_create(interviews)
+                ApplicationNote.objects.bulk_create(notes)
+            application_count += len(created)
+            interview_count += len(interviews)
+            note_count += len(notes)
+            log(f'Created {application_count}/{applications} applications')
+
+    rebuild_counters(batch_size=batch_size)
+    log('Computed the application and company counters')
+
+    return {
+        'users': users,
+        'companies': companies,
+        'positions': len(position_ids),
+        'applications': application_count,
+        'interview_rounds': interview_count,
+        'notes': note_count,
+        'documents': len(document_objects),
+    }
+
+
+def analyze_database():
+    """Refresh the planner statistics after bulk loads or index changes"""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def time_call(func, repeat=5):
+    """
+    Time a callable
+
+    Returns:
+        dict: Median, minimum and maximum wall time in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def profile_call(func, repeat=5):
+    """
+    Time a callable after one profiled run
+
+    The profiled run goes first, so it also warms whatever the callable
+    caches; the timed runs measure the warm path.
+
+    Returns:
+        dict: Queries, duplicate queries and time of the first run, then
+        the time_call figures of the following runs
+    """
+    with profile_queries() as profile:
+        func()
+    return {
+        'queries': profile.query_count,
+        'duplicates': profile.duplicate_count(),
+        'first_ms': round(profile.total_time * 1000, 3),
+        **time_call(func, repeat=repeat),
+    }
+
+
+def hot_view_requests(user):
+    """
+    Requests to the views every page load goes through
+
+    Returns:
+        dict: Name -> (path, query parameters)
+    """
+    application = JobApplication.objects.filter(user=user).order_by('-created_at', '-id').first()
+    search_term = application.position.title.split()[0] if application else 'Engineer'
+    application_list = reverse('jobs:application_list')
+    company_list = reverse('jobs:company_list')
+    requests = {
+        'home': (reverse('jobs:home'), {}),
+        'application_list': (application_list, {}),
+        'application_list_search': (application_list, {'search': search_term}),
+        'application_list_filter': (application_list, {'status': 'APPLIED', 'priority': 'HIGH'}),
+        'statistics': (reverse('jobs:statistics'), {}),
+        'company_list': (company_list, {}),
+        'company_list_by_applications': (company_list, {'sort': 'applications'}),
+        'company_list_search': (company_list, {'search': 'Company 1'}),
+    }
+    if application:
+        requests['application_detail'] = (reverse('jobs:application_detail', args=[application.pk]), {})
+    return requests
+
+
+def benchmark_views(client, user, repeat=5):
+    """
+    Profile and time the hot views as user
+
+    Args:
+        client: django.test.Client to send the requests with
+        user: User the requests are made as
+        repeat: Timed requests per view
+
+    Returns:
+        dict: Name -> status code and profile_call figures
+    """
+    client.force_login(user)
+    results = {}
+    for name, (path, params) in hot_view_requests(user).items():
+        # Dashboard and count caches are shared between views, so each view starts cold
+        cache.clear()
+        status_codes = set()
+
+        def request():
+            status_codes.add(client.get(path, params).status_code)
+
+        results[name] = profile_call(request, repeat=repeat)
+        results[name]['status'] = sorted(status_codes)
+    return results
+
+
+def benchmark_emails(user, repeat=5):
+    """
+    Profile and time rendering the emails sent about user's applications
+
+    Only the messages are built (MIME included); nothing is sent.
+
+    Returns:
+        dict: Name -> profile_call figures
+    """
+    applications = JobApplication.objects.filter(user=user).select_related(
+        'user', 'position__company', 'resume', 'cover_letter'
+    ).order_by('-created_at', '-id')
+    application = applications.filter(resume__isnull=False).first() or applications.first()
+    deadline_application = applications.filter(deadline__isnull=False).first() or application
+    interview_round = InterviewRound.objects.filter(application__user=user).select_related(
+        'application__user', 'application__position__company'
+    ).order_by('-scheduled_date', '-id').first()
+    if application is None:
+        return {}
+
+    def hr_application_email_uncached():
+        cache.delete(hr_application_email_cache_key(application, ''))
+        build_hr_application_email_content(application, hr_name='Alex')
+
+    renders = {
+        'hr_application_email': hr_application_email_uncached,
+        'hr_application_email_cached': lambda: build_hr_application_email_content(application, hr_name='Alex'),
+        'status_update_email': lambda: build_status_update_email(
+            application, 'APPLIED', 'PHONE_SCREEN').message(),
+        'deadline_reminder_email': lambda: build_deadline_reminder_email(deadline_application).message(),
+    }
+    if interview_round:
+        renders['interview_reminder_email'] = lambda: build_interview_reminder_email(interview_round).message()
+    return {name: profile_call(render, repeat=repeat) for name, render in renders.items()}
+
+
+def _percentile(timings, fraction):
+    ordered = sorted(timings)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3) if ordered else None
+
+
+def _read_page(user):
+    # The application list page query
+    list(JobApplication.objects.filter(user=user).select_related('position__company')
+         .order_by('-created_at', '-id')[:10])
+
+
+def _write(rng, application_ids):
+    # A note (with its counter, search entry and fragment stamp) or a status change,
+    # in one transaction like the views that make them
+    application_id = rng.choice(application_ids)
+    with transaction.atomic():
+        if rng.random() < 0.5:
+            ApplicationNote.objects.create(application_id=application_id, note=rng.choice(NOTES))
+        else:
+            application = JobApplication.objects.get(pk=application_id)
+            application.status = rng.choice(['APPLIED', 'PHONE_SCREEN', 'TECHNICAL_INTERVIEW', 'REJECTED'])
+            application.save(update_fields=['status', 'updated_at'])
+
+
+def run_concurrent_workload(users, workers=4, operations=100, write_ratio=0.2, seed=0):
+    """
+    Run a mix of page reads and writes from several threads at once
+
+    Each thread has its own database connection, as each worker process of
+    a deployment has; they start together and go as fast as they can.
+    Operations failing with a database error (e.g. "database is locked")
+    are counted, not retried.
+
+    Args:
+        users: Users the threads act as, round-robin
+        workers: Number of threads
+        operations: Operations per thread
+        write_ratio: Fraction of operations that write
+        seed: Random seed of the operation mix
+
+    Returns:
+        dict: Completed operations, errors, throughput and read and write latencies
+    """
+    started = []
+    barrier = threading.Barrier(workers, action=lambda: started.append(time.perf_counter()))
+    lock = threading.Lock()
+    timings = {'read': [], 'write': []}
+    errors = []
+
+    def work(index):
+        rng = random.Random(seed + index)
+        user = users[index % len(users)]
+        try:
+            application_ids = list(JobApplication.objects.filter(user=user).values_list('pk', flat=True))
+            barrier.wait(timeout=60)
+            done = {'read': [], 'write': []}
+            failed = 0
+            for _ in range(operations):
+                kind = 'write' if application_ids and rng.random() < write_ratio else 'read'
+                start = time.perf_counter()
+                try:
+                    if kind == 'write':
+                        _write(rng, application_ids)
+                    else:
+                        _read_page(user)
+                except DatabaseError:
+                    failed += 1
+                    continue
+                done[kind].append((time.perf_counter() - start) * 1000)
+            with lock:
+                timings['read'].extend(done['read'])
+                timings['write'].extend(done['write'])
+                errors.append(failed)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started[0] if started else 0
+
+    completed = len(timings['read']) + len(timings['write'])
+    return {
+        'workers': workers,
+        'operations': completed,
+        'errors': sum(errors),
+        'seconds': round(elapsed, 3),
+        'ops_per_second': round(completed / elapsed, 1) if elapsed else None,
+        **{
+            kind: {
+                'count': len(values),
+                'median_ms': round(statistics.median(values), 3) if values else None,
+                'p95_ms': _percentile(values, 0.95),
+            }
+            for kind, values in timings.items()
+        },
+    }
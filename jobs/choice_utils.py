@@ -0,0 +1,68 @@
+from django.utils.functional import cached_property
+
+from .models import Document, JobPosition, UserEmail
+
+
+APPLICATION_DOCUMENT_TYPES = ('RESUME', 'COVER_LETTER')
+
+
+class FormChoices:
+    """
+    The documents, sender emails and position a user picks from in the application forms
+
+    Each kind is loaded with one query the first time it is needed and kept
+    for the rest of the request; defaults are picked from the loaded rows
+    instead of being queried separately.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def documents(self):
+        return list(
+            Document.objects.filter(user=self.user, document_type__in=APPLICATION_DOCUMENT_TYPES)
+            .order_by('-is_default', '-updated_at', '-pk')
+        )
+
+    @cached_property
+    def emails(self):
+        """Active sender emails, primary first"""
+        return list(UserEmail.objects.filter(user=self.user, is_active=True))
+
+    def documents_of_type(self, document_type):
+        return [document for document in self.documents if document.document_type == document_type]
+
+    def default_document(self, document_type):
+        return next(
+            (document for document in self.documents_of_type(document_type) if document.is_default), None
+        )
+
+    @property
+    def default_email(self):
+        """The primary email, or the first active one"""
+        return next((email for email in self.emails if email.is_primary), None) or next(iter(self.emails), None)
+
+    def positions(self, selected_id=None):
+        """
+        Position choices rendered with the form: only the selected one
+
+        The other positions are looked up through the position autocomplete
+        endpoint, so the page stays the same size however many there are.
+
+        Args:
+            selected_id: Id of the position currently chosen, if any
+
+        Returns:
+            list: The selected JobPosition with its company, or nothing
+        """
+        if not selected_id:
+            return []
+        return list(JobPosition.objects.select_related('company').filter(pk=selected_id))
+
+
+def get_form_choices(request):
+    """The request's FormChoices, created on first use so every form of a request shares its queries"""
+    if not hasattr(request, '_jobs_form_choices'):
+        request._jobs_form_choices = FormChoices(request.user)
+    return request._jobs_form_choices
@@ -0,0 +1,30 @@
+import re
+import unicodedata
+
+
+# Legal-form words dropped from the end of a company name: "Google LLC" is "Google"
+LEGAL_SUFFIXES = {
+    'ab', 'ag', 'as', 'bv', 'co', 'company', 'corp', 'corporation', 'gmbh', 'inc', 'incorporated',
+    'kg', 'kk', 'limited', 'llc', 'llp', 'lp', 'ltd', 'nv', 'oy', 'plc', 'pte', 'pty', 'pvt',
+    'sa', 'sarl', 'sas', 'spa', 'srl',
+}
+NON_WORD_RE = re.compile(r'[\W_]+')
+NORMALIZED_NAME_MAX_LENGTH = 200
+
+
+def normalize_company_name(name):
+    """
+    Canonical key of a company name, Company.normalized_name
+
+    Case, accents, punctuation and trailing legal suffixes are ignored, so
+    "Google", "google inc." and "Google, LLC" share one key. A name made
+    only of suffix words keeps them.
+    """
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    # "S.A." and "L.L.C." are one word each
+    text = re.sub(r'\b(\w)\.(?=\w\b)', r'\1', text)
+    words = NON_WORD_RE.sub(' ', text.replace('&', ' and ')).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)[:NORMALIZED_NAME_MAX_LENGTH]
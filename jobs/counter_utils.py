@@ -0,0 +1,129 @@
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import ApplicationNote, Company, InterviewRound, JobApplication
+
+
+COUNTER_BATCH_SIZE = 1000
+
+# Counter column of JobApplication maintained for each child model
+CHILD_COUNTERS = {
+    InterviewRound: 'interview_round_count',
+    ApplicationNote: 'note_count',
+}
+
+
+def record_child_added(child):
+    """Count a new interview round or note on its application, and mark the activity"""
+    field = CHILD_COUNTERS[type(child)]
+    JobApplication.objects.filter(pk=child.application_id).update(
+        **{field: F(field) + 1}, last_activity_at=timezone.now()
+    )
+
+
+def record_child_changed(child):
+    """Mark the activity of an edited interview round or note on its application"""
+    JobApplication.objects.filter(pk=child.application_id).update(last_activity_at=timezone.now())
+
+
+def record_child_deleted(child):
+    """Uncount a deleted interview round or note"""
+    field = CHILD_COUNTERS[type(child)]
+    # The filter keeps a drifted counter from going negative
+    JobApplication.objects.filter(pk=child.application_id, **{f'{field}__gt': 0}).update(**{field: F(field) - 1})
+
+
+def adjust_company_applications(position_id, delta):
+    """Add delta to the application_count of the position's company"""
+    companies = Company.objects.filter(positions=position_id)
+    if delta < 0:
+        companies = companies.filter(application_count__gte=-delta)
+    companies.update(application_count=F('application_count') + delta)
+
+
+def _count(queryset, outer_field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field)
+            .annotate(count=Count('pk')).values('count')
+        ),
+        Value(0),
+    )
+
+
+def _latest_update(queryset):
+    return Subquery(
+        queryset.filter(application=OuterRef('pk')).order_by().values('application')
+        .annotate(latest=Max('updated_at')).values('latest')
+    )
+
+
+def application_counter_expressions():
+    """
+    Expressions recomputing the counter columns of JobApplication from its children
+
+    last_activity_at is only moved forward to the latest interview round or
+    note update. It isn't derived from updated_at: save() stamps it a moment
+    before auto_now stamps updated_at, so the two never match exactly and
+    every saved application would look drifted.
+    """
+    return {
+        'interview_round_count': _count(InterviewRound.objects.all(), 'application'),
+        'note_count': _count(ApplicationNote.objects.all(), 'application'),
+        'last_activity_at': Greatest(
+            F('last_activity_at'),
+            Coalesce(_latest_update(InterviewRound.objects.all()), F('last_activity_at')),
+            Coalesce(_latest_update(ApplicationNote.objects.all()), F('last_activity_at')),
+        ),
+    }
+
+
+def company_counter_expressions():
+    """Expressions recomputing Company.application_count"""
+    return {'application_count': _count(JobApplication.objects.all(), 'position__company')}
+
+
+def refresh_company_counts(company_ids):
+    """Recount the applications of these companies, e.g. after a bulk write"""
+    Company.objects.filter(pk__in=company_ids).update(**company_counter_expressions())
+
+
+def _repair_batch(model, ids, expressions, dry_run):
+    """Recompute the counters of a batch of rows; returns the ids of the rows that had drifted"""
+    fields = list(expressions)
+    rows = model.objects.filter(pk__in=ids).annotate(
+        **{f'expected_{field}': expression for field, expression in expressions.items()}
+    ).values_list('pk', *fields, *[f'expected_{field}' for field in fields])
+    drifted = [row[0] for row in rows if row[1:len(fields) + 1] != row[len(fields) + 1:]]
+    if drifted and not dry_run:
+        model.objects.filter(pk__in=drifted).update(**expressions)
+    return drifted
+
+
+def rebuild_counters(batch_size=COUNTER_BATCH_SIZE, dry_run=False):
+    """
+    Recompute every denormalized counter and report the rows that had drifted
+
+    Rows are read in batches of batch_size; each batch costs one query to
+    compare the stored counters with recomputed ones and, unless dry_run,
+    one UPDATE of the rows that differ.
+
+    Returns:
+        dict: Number of drifted applications and companies
+    """
+    counts = {}
+    for name, model, expressions in (
+        ('applications', JobApplication, application_counter_expressions()),
+        ('companies', Company, company_counter_expressions()),
+    ):
+        counts[name] = 0
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                counts[name] += len(_repair_batch(model, batch, expressions, dry_run))
+                batch = []
+        if batch:
+            counts[name] += len(_repair_batch(model, batch, expressions, dry_run))
+    return counts
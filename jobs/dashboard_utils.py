@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import InterviewRound, JobApplication
+from .stats_utils import get_snapshot, summarize_status_counts
+
+
+RECENT_APPLICATIONS_LIMIT = 5
+UPCOMING_INTERVIEWS_LIMIT = 5
+
+# Extra upcoming interviews kept in the cached entry, so interviews that
+# start while it is cached can be dropped without refetching
+UPCOMING_INTERVIEWS_SLACK = 5
+
+
+def dashboard_cache_key(user_id):
+    return f'jobs:dashboard:{user_id}'
+
+
+def invalidate_dashboard(user_id):
+    """Drop a user's cached dashboard data"""
+    cache.delete(dashboard_cache_key(user_id))
+
+
+def _load_dashboard_data(user):
+    """Fetch the dashboard data from the database (three queries)"""
+    counters = summarize_status_counts(get_snapshot(user).status_counts)
+
+    recent_applications = list(
+        JobApplication.objects.filter(user=user).select_related(
+            'position__company'
+        ).order_by('-created_at')[:RECENT_APPLICATIONS_LIMIT]
+    )
+
+    upcoming_interviews = list(
+        InterviewRound.objects.filter(
+            application__user=user,
+            scheduled_date__gte=timezone.now(),
+            status='SCHEDULED'
+        ).select_related(
+            'application__position__company'
+        ).order_by('scheduled_date')[:UPCOMING_INTERVIEWS_LIMIT + UPCOMING_INTERVIEWS_SLACK]
+    )
+
+    return {
+        'total_applications': counters['total_applications'],
+        'pending_applications': counters['pending_applications'],
+        'interview_applications': counters['interview_count'],
+        'recent_applications': recent_applications,
+        'upcoming_interviews': upcoming_interviews,
+    }
+
+
+def get_dashboard_data(user):
+    """
+    Return the context for the dashboard, cached per user
+
+    The counters come from the user's statistics snapshot and the related
+    rows shown by the template are fetched with select_related, so a cache
+    miss costs three queries and a hit costs none. The entry is dropped
+    whenever one of the user's applications or interview rounds changes,
+    and otherwise expires after DASHBOARD_CACHE_TIMEOUT seconds.
+
+    Args:
+        user: User instance
+
+    Returns:
+        dict: Template context for jobs/dashboard.html
+    """
+    key = dashboard_cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = _load_dashboard_data(user)
+        cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+
+    # Interviews that have started since the entry was cached are no longer upcoming
+    now = timezone.now()
+    upcoming_interviews = [
+        interview for interview in data['upcoming_interviews']
+        if interview.scheduled_date >= now
+    ][:UPCOMING_INTERVIEWS_LIMIT]
+    return {**data, 'upcoming_interviews': upcoming_interviews}
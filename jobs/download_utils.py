@@ -0,0 +1,148 @@
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header
+
+    Multiple ranges are not supported and give None, so the whole file is
+    sent, which RFC 9110 allows.
+
+    Returns:
+        tuple: (start, end) inclusive, None for no usable range, or
+        False if the range can't be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+class RangeFileWrapper:
+    """File-like object reading only the bytes start..end of a file"""
+
+    def __init__(self, file, start, end):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = end - start + 1
+
+    def read(self, size=STREAM_BLOCK_SIZE):
+        if self.remaining <= 0:
+            return b''
+        data = self.file.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def document_etag(document):
+    """Strong ETag of a document: its content hash, when known"""
+    return quote_etag(document.sha256) if document.sha256 else None
+
+
+def _range_applies(request, etag, last_modified):
+    """Honour If-Range: only send a range of the representation the client already has"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return etag is not None and if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and if_range_date == last_modified
+
+
+def document_response(request, document, as_attachment=False):
+    """
+    Build the response serving a document's file
+
+    Conditional requests are answered from the document's content hash and
+    modification time without touching the file. With
+    DOCUMENT_DOWNLOAD_ACCEL_REDIRECT set, the bytes are left to the front-end
+    server (nginx X-Accel-Redirect, which handles ranges itself); otherwise
+    the file is streamed, honouring a single byte range.
+
+    Args:
+        request: Current request
+        document: Document to serve, already checked to belong to the user
+        as_attachment: Ask the browser to save the file rather than show it
+
+    Returns:
+        HttpResponse
+    """
+    etag = document_etag(document)
+    last_modified = int(document.updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    if response is None:
+        accel_prefix = getattr(settings, 'DOCUMENT_DOWNLOAD_ACCEL_REDIRECT', None)
+        if accel_prefix:
+            response = HttpResponse(
+                content_type=mimetypes.guess_type(document.filename)[0] or 'application/octet-stream'
+            )
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + document.file.name
+            response['Content-Disposition'] = content_disposition_header(as_attachment, document.filename)
+        else:
+            response = _file_response(request, document, as_attachment, etag, last_modified)
+
+    if etag:
+        response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=0)
+    return response
+
+
+def _file_response(request, document, as_attachment, etag, last_modified):
+    try:
+        file = document.file.storage.open(document.file.name, 'rb')
+    except FileNotFoundError:
+        raise Http404('Document file not found')
+    size = document.file.storage.size(document.file.name)
+
+    byte_range = None
+    if request.headers.get('Range') and _range_applies(request, etag, last_modified):
+        byte_range = parse_range(request.headers['Range'], size)
+
+    if byte_range is False:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(file, as_attachment=as_attachment, filename=document.filename)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFileWrapper(file, start, end), as_attachment=as_attachment, filename=document.filename,
+            status=206,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response.block_size = STREAM_BLOCK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    return response
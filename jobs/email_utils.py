@@ -1,8 +1,360 @@
-from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.db.models import F
+from django.template.loader import get_template, render_to_string
 from django.utils import timezone
+from django.utils.html import escape
+from collections import OrderedDict
+from datetime import timedelta
+from email import encoders
+from email.mime.base import MIMEBase
+import copy
+import functools
+import hashlib
+import json
+import logging
+import mimetypes
 import os
+import smtplib
+import threading
+
+from .models import Document, JobApplication, OutboundEmail
+
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the connection is unusable rather than the message being refused
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class EmailConnectionPool:
+    """
+    Reuse open, authenticated email backend connections across messages
+    
+    Opening an SMTP connection costs a TCP + TLS + AUTH handshake; the pool
+    keeps one connection open per sender address and sends every message to
+    that sender over it. A connection is recycled after
+    max_messages_per_connection messages (servers cap messages per session),
+    and a dropped connection is reopened and the message retried once.
+    
+    Connections are kept per thread, so one pool can be shared by the
+    threads of the queue worker.
+    """
+    
+    def __init__(self, max_messages_per_connection=None):
+        self.max_messages_per_connection = max_messages_per_connection or getattr(
+            settings, 'EMAIL_MAX_MESSAGES_PER_CONNECTION', 100
+        )
+        self._local = threading.local()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @property
+    def _connections(self):
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+    
+    def _acquire(self, key):
+        entry = self._connections.get(key)
+        if entry is not None and entry[1] >= self.max_messages_per_connection:
+            self._discard(key)
+            entry = None
+        if entry is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            entry = self._connections[key] = [connection, 0]
+        return entry
+    
+    def _discard(self, key):
+        entry = self._connections.pop(key, None)
+        if entry is not None:
+            try:
+                entry[0].close()
+            except Exception:
+                # The connection is already broken; nothing left to clean up
+                pass
+    
+    def send(self, message):
+        """
+        Send one message over the pooled connection of its sender
+        
+        Returns:
+            int: Number of messages sent (0 or 1)
+        """
+        key = (settings.EMAIL_BACKEND, message.from_email)
+        for attempt in range(2):
+            entry = self._acquire(key)
+            try:
+                sent = entry[0].send_messages([message])
+            except RECONNECT_ERRORS:
+                self._discard(key)
+                if attempt:
+                    raise
+                continue
+            entry[1] += 1
+            return sent
+    
+    def send_messages(self, messages):
+        """
+        Send messages grouped per sender, skipping those that fail
+        
+        Returns:
+            int: Number of messages sent successfully
+        """
+        by_sender = {}
+        for message in messages:
+            by_sender.setdefault(message.from_email, []).append(message)
+        
+        sent_count = 0
+        for sender_messages in by_sender.values():
+            for message in sender_messages:
+                try:
+                    sent_count += self.send(message)
+                except Exception as e:
+                    print(f"Error sending email to {', '.join(message.to)}: {str(e)}")
+        return sent_count
+    
+    def close(self):
+        """Close the connections opened by the current thread"""
+        for key in list(self._connections):
+            self._discard(key)
+
+
+_connection_pool = EmailConnectionPool()
+
+
+def get_connection_pool():
+    """Return the process-wide email connection pool"""
+    return _connection_pool
+
+
+def application_documents(application, attach_resume=True, attach_cover_letter=True):
+    """
+    Get the documents to attach to an application email
+    
+    Args:
+        application: JobApplication instance
+        attach_resume: Whether to include the resume
+        attach_cover_letter: Whether to include the cover letter
+    
+    Returns:
+        list: Document instances that have a file
+    """
+    documents = []
+    if attach_resume and application.resume and application.resume.file:
+        documents.append(application.resume)
+    if attach_cover_letter and application.cover_letter and application.cover_letter.file:
+        documents.append(application.cover_letter)
+    return documents
+
+
+class AttachmentPartCache:
+    """
+    LRU cache of base64-encoded MIME attachment parts, bounded in bytes
+    
+    Parts are keyed by the document's content hash and file name, so
+    sending the same resume again neither reads the file nor re-encodes it.
+    """
+    
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'EMAIL_ATTACHMENT_CACHE_BYTES', 32 * 1024 * 1024
+        )
+        self._parts = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._parts.get(key)
+            if entry is None:
+                return None
+            self._parts.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key, part, size):
+        with self._lock:
+            if key in self._parts or size > self.max_bytes:
+                return
+            self._parts[key] = (part, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._parts.popitem(last=False)
+                self._size -= evicted_size
+    
+    def clear(self):
+        with self._lock:
+            self._parts.clear()
+            self._size = 0
+
+
+_attachment_cache = AttachmentPartCache()
+
+
+def build_attachment_part(filename, content):
+    """Encode file content as a base64 MIME attachment part"""
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    maintype, subtype = mimetype.split('/', 1)
+    part = MIMEBase(maintype, subtype)
+    part.set_payload(content)
+    encoders.encode_base64(part)
+    if not filename.isascii():
+        filename = ('utf-8', '', filename)
+    part.add_header('Content-Disposition', 'attachment', filename=filename)
+    return part
+
+
+def document_attachment_part(document):
+    """
+    Get the MIME attachment part of a document, from the cache when possible
+    
+    Args:
+        document: Document instance
+    
+    Returns:
+        MIMEBase: Attachment part, or None if the file is missing
+    """
+    filename = document.filename
+    key = (document.sha256, filename) if document.sha256 else None
+    part = _attachment_cache.get(key) if key else None
+    if part is None:
+        try:
+            with document.file.storage.open(document.file.name, 'rb') as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        part = build_attachment_part(filename, content)
+        if key:
+            _attachment_cache.set(key, part, len(part.get_payload()))
+    # Cached parts are shared between messages; give each message its own copy,
+    # headers included (the encoded payload is an immutable string, so it is shared)
+    return copy.deepcopy(part)
+
+
+def attach_documents(email, documents):
+    """Attach the files of documents that exist in storage to an email"""
+    for document in documents:
+        part = document_attachment_part(document)
+        if part is not None:
+            email.attach(part)
+
+
+HR_APPLICATION_EMAIL_TEMPLATES = (
+    ('text', 'jobs/emails/hr_application_email.txt'),
+    ('html', 'jobs/emails/hr_application_email.html'),
+)
+
+# Stands in for the HR name in cached renders and is swapped for each
+# recipient's name, so sending to several recipients renders only once
+HR_NAME_PLACEHOLDER = '\x00hr_name\x00'
+DEFAULT_HR_NAME = 'Hiring Manager'
+
+
+@functools.lru_cache(maxsize=None)
+def email_template_version(template_name):
+    """Short hash of a template's source, so cached renders expire when it changes"""
+    source = get_template(template_name).template.source
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+
+
+def hr_application_email_cache_key(application, custom_message=None):
+    """
+    Cache key of a rendered HR application email
+    
+    Built from the template versions and every value the templates render
+    except the HR name, so any change to them gives a fresh render.
+    """
+    user = application.user
+    position = application.position
+    documents = [
+        [document.pk, document.name, document.document_type, document.updated_at.isoformat()]
+        for document in (application.resume, application.cover_letter) if document
+    ]
+    parts = [
+        [email_template_version(name) for _, name in HR_APPLICATION_EMAIL_TEMPLATES],
+        application.pk, str(application.salary_expectation), application.created_at.isoformat(),
+        user.first_name, user.last_name, user.email,
+        position.title, position.job_url, position.company.name,
+        documents, custom_message or '',
+    ]
+    digest = hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+    return f'jobs:hr_email:{digest}'
+
+
+def render_hr_application_email(application, custom_message=None, hr_name=None):
+    """
+    Render the text and HTML bodies of the HR application email
+    
+    The bodies are rendered once and cached for EMAIL_RENDER_CACHE_TIMEOUT
+    seconds, so the preview and the send that follows (or a send to
+    several HR contacts) share one render; only the HR name is filled in
+    per call.
+    
+    Args:
+        application: JobApplication instance
+        custom_message: Custom message to include in email
+        hr_name: HR person's name for personalization
+    
+    Returns:
+        dict: text and html bodies
+    """
+    # Browsers submit textarea line breaks as CRLF but preview requests send LF
+    custom_message = (custom_message or '').replace('\r\n', '\n').strip()
+    key = hr_application_email_cache_key(application, custom_message)
+    bodies = cache.get(key)
+    if bodies is None:
+        context = {
+            'user': application.user,
+            'application': application,
+            'position': application.position,
+            'hr_name': HR_NAME_PLACEHOLDER,
+            'custom_message': custom_message,
+        }
+        bodies = {kind: render_to_string(name, context) for kind, name in HR_APPLICATION_EMAIL_TEMPLATES}
+        cache.set(key, bodies, getattr(settings, 'EMAIL_RENDER_CACHE_TIMEOUT', 3600))
+    
+    # The templates autoescape the name, in the text version too
+    name = escape(hr_name) if hr_name else DEFAULT_HR_NAME
+    return {kind: body.replace(HR_NAME_PLACEHOLDER, name) for kind, body in bodies.items()}
+
+
+def build_hr_application_email_content(application, sender_email=None, custom_message=None, hr_name=None):
+    """
+    Render the professional HR application email
+    
+    Args:
+        application: JobApplication instance
+        sender_email: UserEmail instance to send from (optional)
+        custom_message: Custom message to include in email
+        hr_name: HR person's name for personalization
+    
+    Returns:
+        dict: subject, text, html and from_email of the email
+    """
+    user = application.user
+    position = application.position
+    bodies = render_hr_application_email(application, custom_message=custom_message, hr_name=hr_name)
+    
+    # Determine from_email
+    if sender_email:
+        # Use the sender email with label if available
+        from_name = sender_email.label or user.get_full_name() or user.username
+        from_email_address = f"{from_name} <{sender_email.email}>"
+    else:
+        from_email_address = settings.DEFAULT_FROM_EMAIL
+    
+    return {
+        'subject': f"Application for {position.title} - {user.get_full_name() or user.username}",
+        'text': bodies['text'],
+        'html': bodies['html'],
+        'from_email': from_email_address,
+    }
 
 
 def send_application_email(application, subject, message, to_email, cc_email=None, 
@@ -32,18 +384,11 @@ def send_application_email(application, subject, message, to_email, cc_email=Non
             cc=[cc_email] if cc_email else [],
         )
         
-        # Attach resume if requested and available
-        if attach_resume and application.resume and application.resume.file:
-            if os.path.exists(application.resume.file.path):
-                email.attach_file(application.resume.file.path)
-        
-        # Attach cover letter if requested and available
-        if attach_cover_letter and application.cover_letter and application.cover_letter.file:
-            if os.path.exists(application.cover_letter.file.path):
-                email.attach_file(application.cover_letter.file.path)
+        # Attach resume and cover letter if requested and available
+        attach_documents(email, application_documents(application, attach_resume, attach_cover_letter))
         
         # Send email
-        email.send()
+        get_connection_pool().send(email)
         
         # Mark application as sent
         application.mark_as_sent()
@@ -74,57 +419,27 @@ def send_hr_application_email(application, to_email, sender_email=None, cc_email
         bool: True if email sent successfully, False otherwise
     """
     try:
-        user = application.user
-        position = application.position
-        
-        # Create subject
-        subject = f"Application for {position.title} - {user.get_full_name() or user.username}"
-        
-        # Prepare context for templates
-        context = {
-            'user': user,
-            'application': application,
-            'position': position,
-            'hr_name': hr_name,
-            'custom_message': custom_message,
-        }
-        
-        # Render HTML and text content
-        html_content = render_to_string('jobs/emails/hr_application_email.html', context)
-        text_content = render_to_string('jobs/emails/hr_application_email.txt', context)
-        
-        # Determine from_email
-        if sender_email:
-            # Use the sender email with label if available
-            from_name = sender_email.label or application.user.get_full_name() or application.user.username
-            from_email_address = f"{from_name} <{sender_email.email}>"
-        else:
-            from_email_address = settings.DEFAULT_FROM_EMAIL
+        content = build_hr_application_email_content(
+            application, sender_email=sender_email, custom_message=custom_message, hr_name=hr_name
+        )
         
         # Create email with both HTML and text versions
         email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=from_email_address,
+            subject=content['subject'],
+            body=content['text'],
+            from_email=content['from_email'],
             to=[to_email],
             cc=[cc_email] if cc_email else [],
         )
         
         # Attach HTML version
-        email.attach_alternative(html_content, "text/html")
-        
-        # Attach resume if requested and available
-        if attach_resume and application.resume and application.resume.file:
-            if os.path.exists(application.resume.file.path):
-                email.attach_file(application.resume.file.path)
+        email.attach_alternative(content['html'], "text/html")
         
-        # Attach cover letter if requested and available
-        if attach_cover_letter and application.cover_letter and application.cover_letter.file:
-            if os.path.exists(application.cover_letter.file.path):
-                email.attach_file(application.cover_letter.file.path)
+        # Attach resume and cover letter if requested and available
+        attach_documents(email, application_documents(application, attach_resume, attach_cover_letter))
         
         # Send email
-        email.send()
+        get_connection_pool().send(email)
         
         # Mark application as sent
         application.mark_as_sent()
@@ -136,6 +451,41 @@ def send_hr_application_email(application, to_email, sender_email=None, cc_email
         return False
 
 
+def build_interview_reminder_email(interview_round):
+    """
+    Build an interview reminder email for the application's owner
+    
+    Args:
+        interview_round: InterviewRound instance
+    
+    Returns:
+        EmailMessage: Message ready to send, or None if the user has no email address
+    """
+    application = interview_round.application
+    user = application.user
+    
+    if not user.email:
+        return None
+    
+    subject = f"Interview Reminder: {application.position.title} at {application.position.company.name}"
+    
+    # Create email content
+    context = {
+        'user': user,
+        'application': application,
+        'interview_round': interview_round,
+    }
+    
+    message = render_to_string('jobs/emails/interview_reminder.txt', context)
+    
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
 def send_interview_reminder_email(interview_round):
     """
     Send an interview reminder email
@@ -147,29 +497,12 @@ def send_interview_reminder_email(interview_round):
         bool: True if email sent successfully, False otherwise
     """
     try:
-        application = interview_round.application
-        user = application.user
-        
-        subject = f"Interview Reminder: {application.position.title} at {application.position.company.name}"
-        
-        # Create email content
-        context = {
-            'user': user,
-            'application': application,
-            'interview_round': interview_round,
-        }
-        
-        message = render_to_string('jobs/emails/interview_reminder.txt', context)
+        email = build_interview_reminder_email(interview_round)
+        if email is None:
+            return False
         
         # Send email to user
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email],
-        )
-        
-        email.send()
+        get_connection_pool().send(email)
         return True
         
     except Exception as e:
@@ -177,6 +510,44 @@ def send_interview_reminder_email(interview_round):
         return False
 
 
+def build_status_update_email(application, old_status, new_status):
+    """
+    Build a status change notification for the application's owner
+    
+    Args:
+        application: JobApplication instance
+        old_status: Previous status
+        new_status: New status
+    
+    Returns:
+        EmailMessage: Message ready to send, or None if the user has no email address
+    """
+    user = application.user
+    
+    if not user.email:
+        return None
+        
+    subject = f"Status Update: {application.position.title} at {application.position.company.name}"
+    
+    # Create email content, with the statuses as displayed
+    status_labels = dict(application.STATUS_CHOICES)
+    context = {
+        'user': user,
+        'application': application,
+        'old_status': status_labels.get(old_status, old_status),
+        'new_status': status_labels.get(new_status, new_status),
+    }
+    
+    message = render_to_string('jobs/emails/status_update.txt', context)
+    
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
 def send_status_update_notification(application, old_status, new_status):
     """
     Send notification when application status changes
@@ -190,32 +561,12 @@ def send_status_update_notification(application, old_status, new_status):
         bool: True if email sent successfully, False otherwise
     """
     try:
-        user = application.user
-        
-        if not user.email:
+        email = build_status_update_email(application, old_status, new_status)
+        if email is None:
             return False
-            
-        subject = f"Status Update: {application.position.title} at {application.position.company.name}"
-        
-        # Create email content
-        context = {
-            'user': user,
-            'application': application,
-            'old_status': old_status,
-            'new_status': new_status,
-        }
-        
-        message = render_to_string('jobs/emails/status_update.txt', context)
         
         # Send email to user
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email],
-        )
-        
-        email.send()
+        get_connection_pool().send(email)
         return True
         
     except Exception as e:
@@ -223,51 +574,64 @@ def send_status_update_notification(application, old_status, new_status):
         return False
 
 
+def build_deadline_reminder_email(application):
+    """
+    Build a deadline reminder email for the application's owner
+    
+    Args:
+        application: JobApplication instance with an approaching deadline
+    
+    Returns:
+        EmailMessage: Message ready to send, or None if the user has no email address
+    """
+    user = application.user
+    
+    if not user.email:
+        return None
+        
+    subject = f"Application Deadline Reminder: {application.position.title}"
+    
+    # Create email content
+    context = {
+        'user': user,
+        'application': application,
+    }
+    
+    message = render_to_string('jobs/emails/deadline_reminder.txt', context)
+    
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
 def send_deadline_reminder_email(applications):
     """
     Send deadline reminder emails for applications
     
+    All messages go out over pooled connections instead of one SMTP
+    handshake per application.
+    
     Args:
         applications: List of JobApplication instances with approaching deadlines
     
     Returns:
         int: Number of emails sent successfully
     """
-    sent_count = 0
+    emails = []
     
     for application in applications:
         try:
-            user = application.user
-            
-            if not user.email:
-                continue
-                
-            subject = f"Application Deadline Reminder: {application.position.title}"
-            
-            # Create email content
-            context = {
-                'user': user,
-                'application': application,
-            }
-            
-            message = render_to_string('jobs/emails/deadline_reminder.txt', context)
-            
-            # Send email to user
-            email = EmailMessage(
-                subject=subject,
-                body=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email],
-            )
-            
-            email.send()
-            sent_count += 1
-            
+            email = build_deadline_reminder_email(application)
         except Exception as e:
             print(f"Error sending deadline reminder to {application.user.username}: {str(e)}")
             continue
+        if email is not None:
+            emails.append(email)
     
-    return sent_count
+    return get_connection_pool().send_messages(emails)
 
 
 def validate_email_settings():
@@ -310,4 +674,186 @@ def get_email_template_context(application):
         'company_name': application.position.company.name,
         'position_title': application.position.title,
         'current_date': timezone.now().date(),
-    }
\ No newline at end of file
+    }
+
+def queue_application_email(application, subject, message, to_email, cc_email=None,
+                            attach_resume=True, attach_cover_letter=True):
+    """
+    Queue a job application email for the send_queued_emails worker
+    
+    Takes the same arguments as send_application_email. The application is
+    marked as sent by the worker once delivery is confirmed.
+    
+    Returns:
+        OutboundEmail: The queued message
+    """
+    documents = application_documents(application, attach_resume, attach_cover_letter)
+    return OutboundEmail.objects.create(
+        user=application.user,
+        application=application,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[to_email],
+        cc=[cc_email] if cc_email else [],
+        subject=subject,
+        body=message,
+        attachment_ids=[document.pk for document in documents],
+        mark_application_sent=True,
+    )
+
+
+def queue_hr_application_email(application, to_email, sender_email=None, cc_email=None, custom_message=None,
+                               hr_name=None, attach_resume=True, attach_cover_letter=True):
+    """
+    Queue a professional HR application email for the send_queued_emails worker
+    
+    Takes the same arguments as send_hr_application_email. The templates are
+    rendered now, so the message reflects the application as it was queued.
+    
+    Returns:
+        OutboundEmail: The queued message
+    """
+    content = build_hr_application_email_content(
+        application, sender_email=sender_email, custom_message=custom_message, hr_name=hr_name
+    )
+    documents = application_documents(application, attach_resume, attach_cover_letter)
+    return OutboundEmail.objects.create(
+        user=application.user,
+        application=application,
+        from_email=content['from_email'],
+        to=[to_email],
+        cc=[cc_email] if cc_email else [],
+        subject=content['subject'],
+        body=content['text'],
+        html_body=content['html'],
+        attachment_ids=[document.pk for document in documents],
+        mark_application_sent=True,
+    )
+
+
+def build_outbound_message(outbound, connection=None):
+    """
+    Build the email message of a queued OutboundEmail
+    
+    Attachments are read from the documents at send time; documents that
+    were deleted in the meantime are skipped.
+    
+    Args:
+        outbound: OutboundEmail instance
+        connection: Email backend connection to send with (optional)
+    
+    Returns:
+        EmailMultiAlternatives: Message ready to send
+    """
+    email = EmailMultiAlternatives(
+        subject=outbound.subject,
+        body=outbound.body,
+        from_email=outbound.from_email,
+        to=outbound.to,
+        cc=outbound.cc,
+        connection=connection,
+    )
+    if outbound.html_body:
+        email.attach_alternative(outbound.html_body, "text/html")
+    if outbound.attachment_ids:
+        documents = Document.objects.in_bulk(outbound.attachment_ids)
+        attach_documents(email, [
+            documents[pk] for pk in outbound.attachment_ids
+            if pk in documents and documents[pk].file
+        ])
+    return email
+
+
+def claim_outbound_emails(limit, now=None):
+    """
+    Claim up to limit due pending messages for sending
+    
+    Each message is moved from PENDING to SENDING with a conditional UPDATE,
+    so concurrent workers never send the same message twice.
+    
+    Returns:
+        list: Claimed OutboundEmail instances
+    """
+    now = now or timezone.now()
+    candidate_ids = list(
+        OutboundEmail.objects.filter(status='PENDING', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed_ids = [
+        pk for pk in candidate_ids
+        if OutboundEmail.objects.filter(pk=pk, status='PENDING').update(
+            status='SENDING', attempts=F('attempts') + 1, updated_at=now
+        )
+    ]
+    return list(OutboundEmail.objects.filter(pk__in=claimed_ids).select_related('application').order_by('pk'))
+
+
+def requeue_stale_emails(older_than):
+    """
+    Put messages stuck in SENDING (e.g. after a worker crash) back in the queue
+    
+    Args:
+        older_than: timedelta after which a SENDING message is considered stuck
+    
+    Returns:
+        int: Number of requeued messages
+    """
+    now = timezone.now()
+    return OutboundEmail.objects.filter(status='SENDING', updated_at__lt=now - older_than).update(
+        status='PENDING', next_attempt_at=now, updated_at=now
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff between delivery attempts: 1, 2, 4... minutes, capped at an hour"""
+    return timedelta(minutes=min(2 ** max(attempts - 1, 0), 60))
+
+
+def deliver_outbound_email(outbound, pool=None, max_attempts=5):
+    """
+    Send a claimed OutboundEmail and record the outcome
+    
+    On success the message is marked SENT and, if requested, its application
+    is marked as sent. On failure it goes back to PENDING with an exponential
+    backoff, or to FAILED once max_attempts is reached.
+    
+    Args:
+        outbound: OutboundEmail instance in SENDING state
+        pool: EmailConnectionPool to send with (default: the process-wide pool)
+        max_attempts: Attempts before the message is given up on
+    
+    Returns:
+        bool: True if the email was delivered, False otherwise
+    """
+    now = timezone.now()
+    try:
+        (pool or get_connection_pool()).send(build_outbound_message(outbound))
+    except Exception as e:
+        outbound.last_error = str(e)
+        if outbound.attempts >= max_attempts:
+            outbound.status = 'FAILED'
+        else:
+            outbound.status = 'PENDING'
+            outbound.next_attempt_at = now + retry_delay(outbound.attempts)
+        outbound.save(update_fields=['status', 'last_error', 'next_attempt_at', 'updated_at'])
+        return False
+    
+    outbound.status = 'SENT'
+    outbound.sent_at = now
+    outbound.last_error = ''
+    outbound.save(update_fields=['status', 'sent_at', 'last_error', 'updated_at'])
+    
+    if outbound.mark_application_sent and outbound.application_id is not None:
+        try:
+            # Reloaded: the user may have edited the application while the message was queued
+            application = JobApplication.objects.filter(pk=outbound.application_id).first()
+            if application is not None:
+                application.mark_as_sent()
+        except Exception:
+            # The message is out and recorded as SENT; failing here would only stop the worker
+            logger.exception(
+                'Email %s was sent but application %s could not be marked as sent',
+                outbound.pk, outbound.application_id
+            )
+    
+    return True
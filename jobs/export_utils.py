@@ -0,0 +1,262 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import ApplicationNote, InterviewRound, JobApplication
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+CSV = 'csv'
+JSONL = 'jsonl'
+PARQUET = 'parquet'
+CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    JSONL: 'application/x-ndjson',
+    PARQUET: 'application/vnd.apache.parquet',
+}
+
+# Text is handed to the response in pieces of about this size rather than row by row
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Column names match the import, so an export can be imported again
+COLUMNS = [
+    'id', 'company', 'company_website', 'company_location', 'company_industry',
+    'title', 'employment_type', 'job_location', 'remote_allowed', 'salary_min', 'salary_max', 'job_url',
+    'status', 'priority', 'application_platform', 'platform_url',
+    'hr_email', 'hr_name', 'hr_phone', 'recruiter_email', 'recruiter_name',
+    'applied_date', 'deadline', 'notes', 'salary_expectation', 'email_sent', 'email_sent_date',
+    'created_at', 'updated_at', 'interview_rounds', 'application_notes',
+]
+# Nested lists, written as JSON text in the flat formats
+NESTED_COLUMNS = ['interview_rounds', 'application_notes']
+INTERVIEW_FIELDS = [
+    'round_number', 'interview_type', 'interviewer_name', 'interviewer_email', 'scheduled_date',
+    'duration_minutes', 'location', 'status', 'feedback', 'notes',
+]
+
+
+def export_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_formats():
+    """Formats available here; Parquet needs pyarrow"""
+    formats = [CSV, JSONL]
+    if pyarrow is not None:
+        formats.append(PARQUET)
+    return formats
+
+
+def export_queryset(user):
+    """A user's applications with everything an export row needs, in stable order"""
+    return JobApplication.objects.filter(user=user).select_related('position__company').prefetch_related(
+        Prefetch('interview_rounds', queryset=InterviewRound.objects.order_by('round_number')),
+        Prefetch('application_notes', queryset=ApplicationNote.objects.order_by('created_at', 'pk')),
+    ).order_by('pk')
+
+
+def application_record(application):
+    """Export row of an application, its position, company, interviews and notes"""
+    position = application.position
+    company = position.company
+    return {
+        'id': application.pk,
+        'company': company.name,
+        'company_website': company.website,
+        'company_location': company.location,
+        'company_industry': company.industry,
+        'title': position.title,
+        'employment_type': position.employment_type,
+        'job_location': position.location,
+        'remote_allowed': position.remote_allowed,
+        'salary_min': position.salary_min,
+        'salary_max': position.salary_max,
+        'job_url': position.job_url,
+        'status': application.status,
+        'priority': application.priority,
+        'application_platform': application.application_platform,
+        'platform_url': application.platform_url,
+        'hr_email': application.hr_email,
+        'hr_name': application.hr_name,
+        'hr_phone': application.hr_phone,
+        'recruiter_email': application.recruiter_email,
+        'recruiter_name': application.recruiter_name,
+        'applied_date': application.applied_date,
+        'deadline': application.deadline,
+        'notes': application.notes,
+        'salary_expectation': application.salary_expectation,
+        'email_sent': application.email_sent,
+        'email_sent_date': application.email_sent_date,
+        'created_at': application.created_at,
+        'updated_at': application.updated_at,
+        'interview_rounds': [
+            {field: getattr(interview, field) for field in INTERVIEW_FIELDS}
+            for interview in application.interview_rounds.all()
+        ],
+        'application_notes': [
+            {'note': note.note, 'created_at': note.created_at}
+            for note in application.application_notes.all()
+        ],
+    }
+
+
+def application_records(user, chunk_size=None):
+    """
+    Export rows of all of a user's applications
+
+    Rows are fetched chunk_size at a time, interviews and notes with two
+    prefetch queries per chunk, so memory stays flat however many
+    applications there are.
+    """
+    for application in export_queryset(user).iterator(chunk_size=chunk_size or export_chunk_size()):
+        yield application_record(application)
+
+
+def _blocks(pieces):
+    """Join small strings into blocks of about STREAM_BLOCK_SIZE"""
+    block = []
+    size = 0
+    for piece in pieces:
+        block.append(piece)
+        size += len(piece)
+        if size >= STREAM_BLOCK_SIZE:
+            yield ''.join(block)
+            block = []
+            size = 0
+    if block:
+        yield ''.join(block)
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(records):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(COLUMNS)
+        for record in records:
+            yield writer.writerow([_csv_value(record[column]) for column in COLUMNS])
+
+    yield from _blocks(lines())
+
+
+def stream_jsonl(records):
+    yield from _blocks(json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records)
+
+
+class _ParquetSink:
+    """Write-only file collecting what the Parquet writer produces until drained"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_schema():
+    decimal = pyarrow.decimal128(10, 2)
+    timestamp = pyarrow.timestamp('us', tz='UTC')
+    types = {
+        'id': pyarrow.int64(),
+        'remote_allowed': pyarrow.bool_(),
+        'email_sent': pyarrow.bool_(),
+        'salary_min': decimal,
+        'salary_max': decimal,
+        'salary_expectation': decimal,
+        'applied_date': pyarrow.date32(),
+        'deadline': pyarrow.date32(),
+        'email_sent_date': timestamp,
+        'created_at': timestamp,
+        'updated_at': timestamp,
+    }
+    return pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in COLUMNS])
+
+
+def stream_parquet(records, row_group_size=None):
+    """
+    Parquet file of the records, one row group per row_group_size records
+
+    Each row group is sent as soon as it is written, so only one group is
+    held in memory. Interviews and notes are JSON text columns.
+    """
+    row_group_size = row_group_size or export_chunk_size()
+    schema = parquet_schema()
+    sink = _ParquetSink()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode='w'), schema)
+
+    def write(rows):
+        columns = {column: [row[column] for row in rows] for column in COLUMNS}
+        for column in NESTED_COLUMNS:
+            columns[column] = [json.dumps(value, cls=DjangoJSONEncoder) for value in columns[column]]
+        writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+
+    rows = []
+    for record in records:
+        rows.append(record)
+        if len(rows) >= row_group_size:
+            write(rows)
+            rows = []
+            yield sink.drain()
+    if rows:
+        write(rows)
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(user, export_format, chunk_size=None):
+    """
+    Iterator over the bytes of a user's export in the given format
+
+    Raises:
+        ValueError: If the format is unknown or not available here
+    """
+    if export_format not in export_formats():
+        raise ValueError(f'Unsupported export format: {export_format}')
+    records = application_records(user, chunk_size)
+    if export_format == PARQUET:
+        return stream_parquet(records, chunk_size)
+    if export_format == CSV:
+        return (block.encode() for block in stream_csv(records))
+    return (block.encode() for block in stream_jsonl(records))
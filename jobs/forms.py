@@ -1,6 +1,100 @@
 from django import forms
 from django.contrib.auth.models import User
-from .models import Company, JobPosition, JobApplication, Document, InterviewRound, ApplicationNote, UserEmail
+from django.forms.models import ModelChoiceIterator
+from django.template.defaultfilters import filesizeformat
+from django.urls import reverse_lazy
+from .choice_utils import FormChoices
+from .models import Company, JobPosition, JobApplication, Document, DocumentUpload, InterviewRound, ApplicationNote, UserEmail
+from .upload_utils import max_upload_size
+
+
+class LoadedModelChoiceIterator(ModelChoiceIterator):
+    """Choices from the rows given to a LoadedModelChoiceField, without querying"""
+
+    def __iter__(self):
+        if self.field.objects is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.objects:
+            yield self.choice(obj)
+
+    def __len__(self):
+        if self.field.objects is None:
+            return super().__len__()
+        return len(self.field.objects) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        if self.field.objects is None:
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(self.field.objects)
+
+
+class LoadedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField offering rows that were loaded beforehand
+    
+    Once objects is set, the widget renders them and submitted values are
+    looked up among them. Values not found there are still checked against
+    the queryset, so objects may be a bounded subset of it.
+    """
+    iterator = LoadedModelChoiceIterator
+    _objects = None
+
+    @property
+    def objects(self):
+        return self._objects
+
+    @objects.setter
+    def objects(self, objects):
+        self._objects = list(objects)
+        self.widget.choices = self.choices
+
+    def to_python(self, value):
+        if self._objects is not None and value not in self.empty_values:
+            key = self.to_field_name or 'pk'
+            for obj in self._objects:
+                if str(getattr(obj, key)) == str(getattr(value, key, value)):
+                    return obj
+        return super().to_python(value)
+
+
+class AutocompleteSelect(forms.Select):
+    """Select of the chosen option only; app.js fetches the others from url as the user types"""
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = str(self.url)
+        return attrs
+
+
+class AutocompleteInput(forms.TextInput):
+    """Text input whose suggestions app.js fetches from url as the user types"""
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs.update({'data-autocomplete-url': str(self.url), 'autocomplete': 'off'})
+        return attrs
+
+
+def _use_loaded_choices(form, choices):
+    """Feed the sender email and document selects of an application form from a FormChoices"""
+    form.fields['sender_email'].queryset = UserEmail.objects.filter(user=form.user, is_active=True)
+    form.fields['sender_email'].objects = choices.emails
+    form.fields['sender_email'].initial = choices.default_email
+    for name, document_type in (('resume', 'RESUME'), ('cover_letter', 'COVER_LETTER')):
+        form.fields[name].queryset = Document.objects.filter(user=form.user, document_type=document_type)
+        form.fields[name].objects = choices.documents_of_type(document_type)
+        form.fields[name].initial = choices.default_document(document_type)
 
 
 class UserEmailForm(forms.ModelForm):
@@ -46,8 +140,14 @@ class JobApplicationForm(forms.ModelForm):
         fields = ['position', 'sender_email', 'status', 'priority', 'application_platform', 'platform_url',
                  'hr_email', 'hr_name', 'hr_phone', 'recruiter_email', 'recruiter_name', 
                  'applied_date', 'deadline', 'resume', 'cover_letter', 'notes', 'salary_expectation']
+        field_classes = {
+            'position': LoadedModelChoiceField,
+            'sender_email': LoadedModelChoiceField,
+            'resume': LoadedModelChoiceField,
+            'cover_letter': LoadedModelChoiceField,
+        }
         widgets = {
-            'position': forms.Select(attrs={'class': 'form-control'}),
+            'position': AutocompleteSelect(reverse_lazy('jobs:position_autocomplete'), attrs={'class': 'form-control'}),
             'sender_email': forms.Select(attrs={'class': 'form-control'}),
             'status': forms.Select(attrs={'class': 'form-control'}),
             'priority': forms.Select(attrs={'class': 'form-control'}),
@@ -68,45 +168,32 @@ class JobApplicationForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
+        choices = kwargs.pop('choices', None) or FormChoices(self.user)
         super().__init__(*args, **kwargs)
         
         if self.user:
-            # Set up sender email choices
-            user_emails = UserEmail.objects.filter(user=self.user, is_active=True)
-            self.fields['sender_email'].queryset = user_emails
-            
-            # Set primary email as initial
-            primary_email = user_emails.filter(is_primary=True).first()
-            if primary_email:
-                self.fields['sender_email'].initial = primary_email
-            elif user_emails.exists():
-                self.fields['sender_email'].initial = user_emails.first()
-            
-            # Filter documents to only show user's documents
-            self.fields['resume'].queryset = Document.objects.filter(
-                user=self.user, document_type='RESUME'
-            ).order_by('-is_default', '-updated_at')
-            self.fields['cover_letter'].queryset = Document.objects.filter(
-                user=self.user, document_type='COVER_LETTER'
-            ).order_by('-is_default', '-updated_at')
-            
-            # Set default documents if available
-            default_resume = Document.objects.filter(
-                user=self.user, document_type='RESUME', is_default=True
-            ).first()
-            if default_resume:
-                self.fields['resume'].initial = default_resume
-            
-            default_cover_letter = Document.objects.filter(
-                user=self.user, document_type='COVER_LETTER', is_default=True
-            ).first()
-            if default_cover_letter:
-                self.fields['cover_letter'].initial = default_cover_letter
+            # Sender emails and documents, with the primary email and default documents preselected
+            _use_loaded_choices(self, choices)
+        
+        # Only the selected position is rendered, the others come from the autocomplete endpoint
+        self.fields['position'].objects = choices.positions(self._selected_position_id())
         
         self.fields['sender_email'].empty_label = "Select sender email"
         self.fields['resume'].empty_label = "Select a resume"
         self.fields['cover_letter'].empty_label = "Select a cover letter"
 
+    @property
+    def has_positions(self):
+        """Whether there is any position to apply to yet"""
+        return bool(self.fields['position'].objects) or JobPosition.objects.exists()
+
+    def _selected_position_id(self):
+        value = self['position'].value()
+        try:
+            return int(getattr(value, 'pk', value))
+        except (TypeError, ValueError):
+            return None
+
     def save(self, commit=True):
         application = super().save(commit=False)
         if self.user:
@@ -137,8 +224,8 @@ class JobPositionForm(forms.ModelForm):
         position = super().save(commit=False)
         
         # Create or get a default "Unknown Company" for positions without company
-        unknown_company, created = Company.objects.get_or_create(
-            name='Unknown Company',
+        unknown_company, created = Company.objects.lookup_or_create(
+            'Unknown Company',
             defaults={
                 'description': 'Default company for positions without specified company',
                 'website': '',
@@ -169,6 +256,12 @@ class DocumentForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
 
+    def clean_file(self):
+        file = self.cleaned_data.get('file')
+        if file and file.size > max_upload_size():
+            raise forms.ValidationError(f'File size must be less than {filesizeformat(max_upload_size())}.')
+        return file
+
     def save(self, commit=True):
         document = super().save(commit=False)
         if self.user:
@@ -178,6 +271,19 @@ class DocumentForm(forms.ModelForm):
         return document
 
 
+class DocumentUploadForm(forms.ModelForm):
+    """Starts a resumable chunked upload; the file itself is sent in chunks afterwards"""
+    class Meta:
+        model = DocumentUpload
+        fields = ['filename', 'size', 'name', 'document_type', 'description', 'is_default']
+
+    def clean_size(self):
+        size = self.cleaned_data['size']
+        if size > max_upload_size():
+            raise forms.ValidationError(f'File size must be less than {filesizeformat(max_upload_size())}.')
+        return size
+
+
 class JobApplicationWithInlineCompanyForm(forms.ModelForm):
     """Extended job application form with inline company creation"""
     
@@ -185,7 +291,9 @@ class JobApplicationWithInlineCompanyForm(forms.ModelForm):
     company_name = forms.CharField(
         max_length=200,
         required=False,
-        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Company Name'}),
+        widget=AutocompleteInput(
+            reverse_lazy('jobs:company_autocomplete'), attrs={'class': 'form-control', 'placeholder': 'Company Name'}
+        ),
         label='Company Name'
     )
     company_website = forms.URLField(
@@ -264,6 +372,11 @@ class JobApplicationWithInlineCompanyForm(forms.ModelForm):
         fields = ['sender_email', 'status', 'priority', 'hr_email', 'hr_name', 'hr_phone',
                  'recruiter_email', 'recruiter_name', 'applied_date', 'deadline',
                  'resume', 'cover_letter', 'notes', 'salary_expectation']
+        field_classes = {
+            'sender_email': LoadedModelChoiceField,
+            'resume': LoadedModelChoiceField,
+            'cover_letter': LoadedModelChoiceField,
+        }
         widgets = {
             'sender_email': forms.Select(attrs={'class': 'form-control'}),
             'status': forms.Select(attrs={'class': 'form-control'}),
@@ -283,41 +396,12 @@ class JobApplicationWithInlineCompanyForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
+        choices = kwargs.pop('choices', None)
         super().__init__(*args, **kwargs)
         
         if self.user:
-            # Filter user emails
-            user_emails = UserEmail.objects.filter(user=self.user, is_active=True)
-            self.fields['sender_email'].queryset = user_emails
-            
-            # Set primary email as initial if exists
-            primary_email = user_emails.filter(is_primary=True).first()
-            if primary_email:
-                self.fields['sender_email'].initial = primary_email
-            elif user_emails.exists():
-                # If no primary email, set first active email as initial
-                self.fields['sender_email'].initial = user_emails.first()
-            
-            # Filter documents by user and document type
-            self.fields['resume'].queryset = Document.objects.filter(
-                user=self.user, document_type='RESUME'
-            ).order_by('-is_default', '-created_at')
-            self.fields['cover_letter'].queryset = Document.objects.filter(
-                user=self.user, document_type='COVER_LETTER'
-            ).order_by('-is_default', '-created_at')
-            
-            # Set default resume and cover letter if they exist
-            default_resume = Document.objects.filter(
-                user=self.user, document_type='RESUME', is_default=True
-            ).first()
-            if default_resume:
-                self.fields['resume'].initial = default_resume
-                
-            default_cover_letter = Document.objects.filter(
-                user=self.user, document_type='COVER_LETTER', is_default=True
-            ).first()
-            if default_cover_letter:
-                self.fields['cover_letter'].initial = default_cover_letter
+            # Sender emails and documents, with the primary email and default documents preselected
+            _use_loaded_choices(self, choices or FormChoices(self.user))
 
         # Add empty option to document and email fields
         self.fields['sender_email'].empty_label = "Select an email"
@@ -343,13 +427,15 @@ class JobApplicationWithInlineCompanyForm(forms.ModelForm):
         if self.user:
             application.user = self.user
         
-        # Always create company - this form is specifically for creating applications with new companies
-        company = Company.objects.create(
-            name=self.cleaned_data['company_name'],
-            website=self.cleaned_data.get('company_website', ''),
-            location=self.cleaned_data.get('company_location', ''),
-            industry=self.cleaned_data.get('company_industry', ''),
-            description=self.cleaned_data.get('company_description', '')
+        # Reuse the company if it is already known under this name or a variant of it
+        company, created = Company.objects.lookup_or_create(
+            self.cleaned_data['company_name'],
+            defaults={
+                'website': self.cleaned_data.get('company_website', ''),
+                'location': self.cleaned_data.get('company_location', ''),
+                'industry': self.cleaned_data.get('company_industry', ''),
+                'description': self.cleaned_data.get('company_description', '')
+            }
         )
         
         # Create job position
@@ -562,4 +648,86 @@ class HREmailForm(forms.Form):
                 'You must attach at least one document (resume or cover letter) to send the email.'
             )
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class ApplicationImportForm(forms.Form):
+    """Upload of a CSV, JSON or JSON Lines file of applications"""
+    FORMAT_CHOICES = [
+        ('', 'Detect from file name'),
+        ('csv', 'CSV'),
+        ('json', 'JSON / JSON Lines'),
+    ]
+
+    file = forms.FileField(
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.json,.jsonl,.ndjson'}),
+        help_text='One application per row; company and title are required'
+    )
+    format = forms.ChoiceField(
+        choices=FORMAT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+
+class ApplicationImportRowForm(forms.Form):
+    """Validates one row of a bulk application import"""
+    # Company
+    company = forms.CharField(max_length=200)
+    company_website = forms.URLField(required=False)
+    company_location = forms.CharField(max_length=200, required=False)
+    company_industry = forms.CharField(max_length=100, required=False)
+
+    # Position
+    title = forms.CharField(max_length=200)
+    employment_type = forms.ChoiceField(choices=JobPosition.EMPLOYMENT_TYPE_CHOICES, required=False)
+    job_location = forms.CharField(max_length=200, required=False)
+    remote_allowed = forms.BooleanField(required=False)
+    salary_min = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+    salary_max = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+    job_url = forms.URLField(required=False)
+
+    # Application
+    status = forms.ChoiceField(choices=JobApplication.STATUS_CHOICES, required=False)
+    priority = forms.ChoiceField(choices=JobApplication.PRIORITY_CHOICES, required=False)
+    application_platform = forms.ChoiceField(choices=JobApplication.PLATFORM_CHOICES, required=False)
+    platform_url = forms.URLField(required=False)
+    hr_email = forms.EmailField(required=False)
+    hr_name = forms.CharField(max_length=200, required=False)
+    hr_phone = forms.CharField(max_length=20, required=False)
+    recruiter_email = forms.EmailField(required=False)
+    recruiter_name = forms.CharField(max_length=200, required=False)
+    applied_date = forms.DateField(required=False)
+    deadline = forms.DateField(required=False)
+    notes = forms.CharField(required=False)
+    salary_expectation = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    # Choice labels and loose spellings ("phone screen") are accepted as well as codes
+    CHOICE_LOOKUPS = {
+        name: {
+            key.upper().replace(' ', '_'): code
+            for code, label in choices
+            for key in (code, label)
+        }
+        for name, choices in [
+            ('employment_type', JobPosition.EMPLOYMENT_TYPE_CHOICES),
+            ('status', JobApplication.STATUS_CHOICES),
+            ('priority', JobApplication.PRIORITY_CHOICES),
+            ('application_platform', JobApplication.PLATFORM_CHOICES),
+        ]
+    }
+
+    def __init__(self, data, *args, **kwargs):
+        data = {key: value.strip() if isinstance(value, str) else value for key, value in data.items()}
+        for name, lookup in self.CHOICE_LOOKUPS.items():
+            if isinstance(data.get(name), str):
+                data[name] = lookup.get(data[name].upper().replace(' ', '_'), data[name])
+        super().__init__(data, *args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        salary_min = cleaned_data.get('salary_min')
+        salary_max = cleaned_data.get('salary_max')
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            raise forms.ValidationError('salary_min is greater than salary_max.')
+        return cleaned_data
@@ -0,0 +1,77 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Parts of an application whose saves change a cached fragment of its detail page
+APPLICATION = 'application'
+INTERVIEWS = 'interviews'
+NOTES = 'notes'
+FRAGMENT_PARTS = (APPLICATION, INTERVIEWS, NOTES)
+
+
+def fragment_cache_timeout():
+    """Seconds the application detail fragments are cached"""
+    return getattr(settings, 'APPLICATION_FRAGMENT_CACHE_TIMEOUT', 3600)
+
+
+def version_key(part, application_id):
+    return f'jobs:fragment_version:{part}:{application_id}'
+
+
+def _new_version():
+    # Random rather than a counter: a stamp evicted from the cache and
+    # recreated can never match the one stale fragments were cached under
+    return uuid.uuid4().hex[:12]
+
+
+def bump_fragment_version(part, application_id):
+    """Give one part of an application a new stamp, retiring its cached fragments"""
+    cache.set(version_key(part, application_id), _new_version(), None)
+
+
+def fragment_versions(application_id):
+    """
+    Current version stamps of an application's parts, in one cache round trip
+
+    Returns:
+        dict: Part -> stamp; missing stamps are created
+    """
+    keys = {part: version_key(part, application_id) for part in FRAGMENT_PARTS}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for part, key in keys.items():
+        if key not in found:
+            # add() keeps a stamp another request created meanwhile
+            cache.add(key, _new_version(), None)
+            found[key] = cache.get(key)
+        versions[part] = found[key]
+    return versions
+
+
+def application_fragment_versions(application):
+    """
+    Cache vary-on values of the header, interview and notes fragments
+
+    The header also shows the position and company, which are loaded with
+    the application anyway: their ids and update times are part of its
+    version instead of being stamped on every save.
+
+    Args:
+        application: JobApplication with position__company loaded
+
+    Returns:
+        dict: Fragment name -> version string
+    """
+    stamps = fragment_versions(application.pk)
+    position = application.position
+    company = position.company
+    return {
+        'header': (
+            f'{stamps[APPLICATION]}:{position.pk}.{position.updated_at.timestamp()}:'
+            f'{company.pk}.{company.updated_at.timestamp()}'
+        ),
+        'interviews': stamps[INTERVIEWS],
+        'notes': f'{stamps[APPLICATION]}:{stamps[NOTES]}',
+    }
@@ -0,0 +1,361 @@
+import codecs
+import csv
+import json
+import os
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .autocomplete_utils import invalidate_autocomplete
+from .company_utils import normalize_company_name
+from .counter_utils import refresh_company_counts
+from .dashboard_utils import invalidate_dashboard
+from .forms import ApplicationImportRowForm
+from .models import Company, JobApplication, JobPosition
+from .search_utils import index_applications, index_companies
+from .stats_utils import rebuild_snapshots
+
+
+CSV = 'csv'
+JSON = 'json'
+FORMAT_EXTENSIONS = {'.csv': CSV, '.json': JSON, '.jsonl': JSON, '.ndjson': JSON}
+REQUIRED_COLUMNS = ['company', 'title']
+READ_CHUNK_SIZE = 64 * 1024
+
+# Only the first errors are kept for the report; all of them are counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFileError(ValueError):
+    """The file can't be read as an import at all (as opposed to a bad row)"""
+
+
+def import_batch_size():
+    return getattr(settings, 'IMPORT_BATCH_SIZE', 1000)
+
+
+def detect_format(filename):
+    """Import format from a file name's extension, or None"""
+    _, extension = os.path.splitext(filename.lower())
+    return FORMAT_EXTENSIONS.get(extension)
+
+
+def _text_chunks(stream):
+    """Decode a binary stream as UTF-8 (BOM tolerated) chunk by chunk"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for data in iter(lambda: stream.read(READ_CHUNK_SIZE), b''):
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def _text_lines(stream):
+    buffer = ''
+    for text in _text_chunks(stream):
+        # The last piece may continue in the next chunk
+        *lines, buffer = (buffer + text).split('\n')
+        for line in lines:
+            yield line + '\n'
+    if buffer:
+        yield buffer
+
+
+def iter_csv_records(stream):
+    """Rows of a CSV file with a header line, as dicts"""
+    reader = csv.DictReader(_text_lines(stream))
+    try:
+        columns = reader.fieldnames or []
+    except csv.Error as exc:
+        raise ImportFileError(f'Invalid CSV: {exc}')
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+    try:
+        for row in reader:
+            # Cells past the header end up under None
+            row.pop(None, None)
+            yield row
+    except csv.Error as exc:
+        raise ImportFileError(f'Invalid CSV on line {reader.line_num}: {exc}')
+
+
+def iter_json_records(stream):
+    """
+    Records of a JSON array or of JSON Lines, decoded incrementally
+
+    Only the record being decoded is held in memory, not the whole document.
+    """
+    decoder = json.JSONDecoder()
+    chunks = _text_chunks(stream)
+    buffer = ''
+    started = eof = False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,')
+        if buffer and not started:
+            started = True
+            if buffer[0] == '[':
+                buffer = buffer[1:]
+                continue
+        if buffer.startswith(']'):
+            return
+        if buffer:
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ImportFileError(f'Invalid JSON: {exc.msg}')
+            else:
+                yield record
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+        text = next(chunks, None)
+        eof = text is None
+        buffer += text or ''
+
+
+def iter_records(stream, file_format):
+    if file_format == CSV:
+        return iter_csv_records(stream)
+    if file_format == JSON:
+        return iter_json_records(stream)
+    raise ImportFileError(f'Unsupported import format: {file_format}')
+
+
+def _name_key(name):
+    """Case and whitespace insensitive key positions are deduplicated on"""
+    return ' '.join(name.split()).lower()
+
+
+class ImportResult:
+    """Outcome of an import: counts and per-row errors"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.companies_created = 0
+        self.positions_created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'companies_created': self.companies_created,
+            'positions_created': self.positions_created,
+            'errors': self.error_count,
+        }
+
+
+class CompanyLookup:
+    """
+    In-memory table of the companies and positions an import refers to
+
+    Each batch resolves the names it hasn't seen yet with one query per
+    model and creates the missing ones with bulk_create, so repeated
+    companies and positions cost nothing after their first row.
+    """
+
+    def __init__(self):
+        self.companies = {}
+        self.positions = {}
+        self.new_company_ids = []
+
+    def clear(self):
+        """Forget everything, e.g. after a batch was rolled back"""
+        self.companies.clear()
+        self.positions.clear()
+        self.new_company_ids.clear()
+
+    def resolve(self, rows):
+        """
+        Company and position ids of validated rows, creating missing ones
+
+        Returns:
+            tuple: (position ids in row order, companies created, positions created)
+        """
+        company_rows = {}
+        for data in rows:
+            key = normalize_company_name(data['company'])
+            if key not in self.companies:
+                company_rows.setdefault(key, data)
+        if company_rows:
+            existing = Company.objects.filter(normalized_name__in=list(company_rows)).values_list('normalized_name', 'pk')
+            self.companies.update(existing)
+        new_companies = {
+            key: Company(
+                name=' '.join(data['company'].split()),
+                normalized_name=key,
+                website=data['company_website'] or None,
+                location=data['company_location'] or None,
+                industry=data['company_industry'] or None,
+            )
+            for key, data in company_rows.items() if key not in self.companies
+        }
+        for key, company in zip(new_companies, Company.objects.bulk_create(new_companies.values())):
+            self.companies[key] = company.pk
+            self.new_company_ids.append(company.pk)
+
+        position_rows = {}
+        for data in rows:
+            key = (self.companies[normalize_company_name(data['company'])], _name_key(data['title']))
+            if key not in self.positions:
+                position_rows.setdefault(key, data)
+        if position_rows:
+            # Stored titles may have runs of whitespace the database can't collapse
+            # portably, so they are keyed in Python the same way as the rows
+            existing = JobPosition.objects.filter(
+                company_id__in={company_id for company_id, _ in position_rows},
+            ).order_by('pk').values_list('company_id', 'title', 'pk')
+            for company_id, title, pk in existing.iterator():
+                key = (company_id, _name_key(title))
+                if key in position_rows:
+                    self.positions.setdefault(key, pk)
+        new_positions = {
+            key: JobPosition(
+                company_id=key[0],
+                title=' '.join(data['title'].split()),
+                employment_type=data['employment_type'] or 'FULL_TIME',
+                location=data['job_location'] or None,
+                remote_allowed=data['remote_allowed'],
+                salary_min=data['salary_min'],
+                salary_max=data['salary_max'],
+                job_url=data['job_url'] or None,
+            )
+            for key, data in position_rows.items() if key not in self.positions
+        }
+        for key, position in zip(new_positions, JobPosition.objects.bulk_create(new_positions.values())):
+            self.positions[key] = position.pk
+
+        position_ids = [
+            self.positions[(self.companies[normalize_company_name(data['company'])], _name_key(data['title']))]
+            for data in rows
+        ]
+        return position_ids, len(new_companies), len(new_positions)
+
+
+def _validated_rows(records, result):
+    """Cleaned rows as (row number, data); invalid rows are reported and skipped"""
+    for row_number, record in enumerate(records, start=1):
+        result.rows += 1
+        if not isinstance(record, dict):
+            result.add_error(row_number, 'Expected an object with application fields.')
+            continue
+        form = ApplicationImportRowForm(record)
+        if not form.is_valid():
+            messages = [
+                f'{field}: {" ".join(errors)}' if field != '__all__' else ' '.join(errors)
+                for field, errors in form.errors.items()
+            ]
+            result.add_error(row_number, '; '.join(messages))
+            continue
+        yield row_number, form.cleaned_data
+
+
+def _import_batch(user, batch, lookup, result):
+    with transaction.atomic():
+        position_ids, companies_created, positions_created = lookup.resolve([data for _, data in batch])
+        existing = set(
+            JobApplication.objects.filter(user=user, position_id__in=position_ids).values_list('position_id', flat=True)
+        )
+        applications = []
+        for (row_number, data), position_id in zip(batch, position_ids):
+            if position_id in existing:
+                result.add_error(row_number, 'You already have an application for this position.')
+                continue
+            existing.add(position_id)
+            applications.append(JobApplication(
+                user=user,
+                position_id=position_id,
+                status=data['status'] or 'DRAFT',
+                priority=data['priority'] or 'MEDIUM',
+                application_platform=data['application_platform'] or None,
+                platform_url=data['platform_url'] or None,
+                hr_email=data['hr_email'] or None,
+                hr_name=data['hr_name'] or None,
+                hr_phone=data['hr_phone'] or None,
+                recruiter_email=data['recruiter_email'] or None,
+                recruiter_name=data['recruiter_name'] or None,
+                applied_date=data['applied_date'],
+                deadline=data['deadline'],
+                notes=data['notes'] or None,
+                salary_expectation=data['salary_expectation'],
+            ))
+        created = JobApplication.objects.bulk_create(applications)
+        # bulk_create skips the signals maintaining Company.application_count
+        if created:
+            refresh_company_counts(
+                JobPosition.objects.filter(pk__in={application.position_id for application in created})
+                .values('company_id')
+            )
+
+    result.created += len(created)
+    result.companies_created += companies_created
+    result.positions_created += positions_created
+    return [application.pk for application in created]
+
+
+def _import_and_index(user, batch, lookup, result):
+    try:
+        application_ids = _import_batch(user, batch, lookup, result)
+    except DatabaseError as exc:
+        # Rolled back: companies and positions created by the batch are gone too
+        lookup.clear()
+        for row_number, _ in batch:
+            result.add_error(row_number, f'Could not be saved: {exc}')
+        return
+    index_applications(application_ids)
+    index_companies(lookup.new_company_ids)
+    lookup.new_company_ids.clear()
+
+
+def import_applications(user, records, batch_size=None):
+    """
+    Import applications for a user from an iterable of row dicts
+
+    Rows are validated one by one and written with bulk_create, one
+    transaction per batch of batch_size rows. Invalid rows and rows for a
+    position the user already applied to are reported in the result and
+    skipped; the rest of the import carries on. Signals don't fire for
+    bulk_create, so the statistics snapshot, search index and dashboard
+    cache are brought up to date here.
+
+    Args:
+        user: User the applications belong to
+        records: Iterable of dicts, e.g. from iter_records
+        batch_size: Rows per transaction (default: IMPORT_BATCH_SIZE)
+
+    Returns:
+        ImportResult
+
+    Raises:
+        ImportFileError: If the file itself is malformed; batches imported
+            before the error are kept
+    """
+    result = ImportResult()
+    lookup = CompanyLookup()
+    batch_size = batch_size or import_batch_size()
+    try:
+        batch = []
+        for row in _validated_rows(records, result):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _import_and_index(user, batch, lookup, result)
+                batch = []
+        if batch:
+            _import_and_index(user, batch, lookup, result)
+    finally:
+        # Rows failing validation are reported before rows of their batch
+        result.errors.sort()
+        if result.created:
+            rebuild_snapshots(user_ids=[user.pk])
+            invalidate_dashboard(user.pk)
+        if result.companies_created or result.positions_created:
+            invalidate_autocomplete('companies', 'positions')
+    return result
@@ -0,0 +1,134 @@
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from jobs.bench_utils import analyze_database, run_concurrent_workload, seed_dataset
+from jobs.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and measure throughput and latencies of concurrent reads '
+        'and writes under the configured DATABASE_PROFILE; run it once per profile and compare the JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,4,8',
+                            help='Comma-separated numbers of concurrent workers to run (default: 1,4,8)')
+        parser.add_argument('--operations', type=int, default=200,
+                            help='Operations per worker (default: 200)')
+        parser.add_argument('--write-ratio', type=float, default=0.2,
+                            help='Fraction of operations that write (default: 0.2)')
+        parser.add_argument('--users', type=int, default=20,
+                            help='Number of users to seed (default: 20)')
+        parser.add_argument('--companies', type=int, default=200,
+                            help='Number of companies to seed (default: 200)')
+        parser.add_argument('--applications', type=int, default=10_000,
+                            help='Number of applications to seed (default: 10,000)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed of the dataset and the operation mix (default: 0)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database, and reuse its data if already seeded')
+        parser.add_argument('--output', help='Also write the results as JSON to this file ("-" for stdout)')
+        parser.add_argument('--compare', help='JSON results of an earlier run (e.g. another profile) to compare against')
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(count) for count in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError('--workers must be comma-separated integers') from None
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+            # The default in-memory test database has no journal to tune and no file to lock
+            connection.settings_dict['TEST']['NAME'] = os.path.join(settings.BASE_DIR, 'benchmark.sqlite3')
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with override_settings(DEBUG=False):
+                results = self.run_benchmark(options, worker_counts)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.report(results)
+            if options['output']:
+                with open(options['output'], 'w') as output:
+                    json.dump(results, output, indent=2)
+                self.stdout.write(f"Results written to {options['output']}")
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                self.compare(json.load(baseline), results)
+
+    def run_benchmark(self, options, worker_counts):
+        progress = self.stderr if options['output'] == '-' else self.stdout
+        if not JobApplication.objects.exists():
+            counts = seed_dataset(
+                users=options['users'],
+                companies=options['companies'],
+                applications=options['applications'],
+                seed=options['seed'],
+                stdout=progress,
+            )
+            progress.write(f'Seeded: {counts}')
+        analyze_database()
+        users = list(User.objects.filter(username__startswith='bench_user_').order_by('pk'))
+        # Worker threads open their own connections; this one would only hold locks
+        connection.close()
+        runs = {}
+        for workers in worker_counts:
+            progress.write(f'Running {workers} workers...')
+            runs[str(workers)] = run_concurrent_workload(
+                users, workers=workers, operations=options['operations'],
+                write_ratio=options['write_ratio'], seed=options['seed'],
+            )
+        return {
+            'profile': os.environ.get('DATABASE_PROFILE') or 'sqlite',
+            'vendor': connection.vendor,
+            'options': {
+                name: value for name, value in connection.settings_dict['OPTIONS'].items() if name != 'pool'
+            },
+            'pool': bool(connection.settings_dict['OPTIONS'].get('pool')),
+            'operations': options['operations'],
+            'write_ratio': options['write_ratio'],
+            'runs': runs,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f"\n{results['profile']} profile ({results['vendor']}), {results['operations']} operations per worker, "
+            f"{results['write_ratio']:.0%} writes\n"
+        )
+        for workers, run in results['runs'].items():
+            self.stdout.write(
+                f"  {workers:>3} workers  {run['ops_per_second']:>9.1f} ops/s  "
+                f"read {run['read']['median_ms']} ms (p95 {run['read']['p95_ms']})  "
+                f"write {run['write']['median_ms']} ms (p95 {run['write']['p95_ms']})  "
+                f"{run['errors']} errors"
+            )
+
+    def compare(self, baseline, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{results['profile']} against {baseline.get('profile', 'the baseline')}"
+        ))
+        for workers, run in results['runs'].items():
+            before = baseline.get('runs', {}).get(workers)
+            if before is None:
+                self.stdout.write(f'  {workers} workers: new')
+                continue
+            change = (
+                (run['ops_per_second'] - before['ops_per_second']) / before['ops_per_second']
+                if before['ops_per_second'] else 0
+            )
+            line = (
+                f"  {workers} workers: {before['ops_per_second']} -> {run['ops_per_second']} ops/s "
+                f"({change:+.0%}), {before['errors']} -> {run['errors']} errors"
+            )
+            if run['errors'] > before['errors'] or change < 0:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,119 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from jobs.bench_utils import analyze_database, seed_dataset, time_call
+from jobs.models import InterviewRound, JobApplication
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and compare query plans and timings of the hot '
+        'application/interview queries with and without the composite indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applications', type=int, default=1_000_000,
+                            help='Number of applications to seed (default: 1,000,000)')
+        parser.add_argument('--users', type=int, default=100,
+                            help='Number of users the applications are spread over (default: 100)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per query; the median is reported (default: 5)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database, and reuse its data if already seeded')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        # Everything happens in the test database, never in the real one
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run_benchmark(self, options):
+        if not JobApplication.objects.exists():
+            users = options['users']
+            positions_needed = -(-options['applications'] // users)
+            counts = seed_dataset(
+                users=users,
+                companies=max(positions_needed // 10, 1),
+                positions_per_company=10,
+                applications=options['applications'],
+                stdout=self.stdout,
+            )
+            self.stdout.write(f'Seeded: {counts}')
+
+        user = User.objects.filter(username__startswith='bench_user_').order_by('pk').first()
+        now = timezone.now()
+        queries = {
+            'application_list_page': lambda: JobApplication.objects.filter(
+                user=user).order_by('-created_at', '-id')[:11],
+            'application_list_by_status': lambda: JobApplication.objects.filter(
+                user=user, status='APPLIED').order_by('-created_at', '-id')[:11],
+            'application_list_by_priority': lambda: JobApplication.objects.filter(
+                user=user, priority='HIGH').order_by('-created_at', '-id')[:11],
+            'status_counts': lambda: JobApplication.objects.filter(
+                user=user).order_by().values('status').annotate(count=Count('id')),
+            'upcoming_interviews': lambda: InterviewRound.objects.filter(
+                application__user=user, scheduled_date__gte=now, status='SCHEDULED'
+            ).order_by('scheduled_date')[:10],
+            'scheduled_interviews_window': lambda: InterviewRound.objects.filter(
+                status='SCHEDULED', scheduled_date__gte=now, scheduled_date__lt=now + timedelta(days=1)
+            ).order_by('scheduled_date', 'id')[:500],
+        }
+
+        indexes = [(JobApplication, index) for index in JobApplication._meta.indexes]
+        indexes += [(InterviewRound, index) for index in InterviewRound._meta.indexes]
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        analyze_database()
+        before = self.measure(queries, options['repeat'])
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        analyze_database()
+        after = self.measure(queries, options['repeat'])
+
+        results = {
+            'vendor': connection.vendor,
+            'applications': JobApplication.objects.count(),
+            'queries': {
+                name: {'before': before[name], 'after': after[name]}
+                for name in queries
+            },
+        }
+        self.report(results)
+        return results
+
+    def measure(self, queries, repeat):
+        measurements = {}
+        for name, build in queries.items():
+            measurements[name] = {
+                'plan': build().explain(),
+                **time_call(lambda: list(build()), repeat=repeat),
+            }
+        return measurements
+
+    def report(self, results):
+        self.stdout.write(f"\n{results['applications']} applications on {results['vendor']}\n")
+        for name, result in results['queries'].items():
+            before, after = result['before'], result['after']
+            speedup = before['median_ms'] / after['median_ms'] if after['median_ms'] else float('inf')
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f"  before: {before['median_ms']:.2f} ms\n    {before['plan'].replace(chr(10), chr(10) + '    ')}")
+            self.stdout.write(f"  after:  {after['median_ms']:.2f} ms\n    {after['plan'].replace(chr(10), chr(10) + '    ')}")
+            self.stdout.write(f'  speedup: {speedup:.1f}x\n')
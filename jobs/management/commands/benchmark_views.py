@@ -0,0 +1,130 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from jobs.bench_utils import analyze_database, benchmark_emails, benchmark_views, seed_dataset
+from jobs.models import JobApplication
+from jobs.search_utils import rebuild_index
+from jobs.stats_utils import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and measure the queries and timings of the hot views '
+        'and the email renders, as JSON that can be compared between commits'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20,
+                            help='Number of users to seed (default: 20)')
+        parser.add_argument('--companies', type=int, default=500,
+                            help='Number of companies to seed (default: 500)')
+        parser.add_argument('--positions-per-company', type=int, default=10,
+                            help='Number of positions per company (default: 10)')
+        parser.add_argument('--applications', type=int, default=50_000,
+                            help='Number of applications to seed (default: 50,000)')
+        parser.add_argument('--interview-ratio', type=float, default=0.3,
+                            help='Fraction of applications with interview rounds (default: 0.3)')
+        parser.add_argument('--note-ratio', type=float, default=0.2,
+                            help='Fraction of applications with notes (default: 0.2)')
+        parser.add_argument('--documents-per-user', type=int, default=4,
+                            help='Number of documents per user (default: 4)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed of the dataset (default: 0)')
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='Timed runs per view or email; the median is reported (default: 10)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database, and reuse its data if already seeded')
+        parser.add_argument('--output', help='Also write the results as JSON to this file ("-" for stdout)')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+
+    def handle(self, *args, **options):
+        # Everything happens in the test database, never in the real one
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            # The test client talks to "testserver"; DEBUG would keep every query in memory
+            with override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False):
+                results = self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.report(results)
+            if options['output']:
+                with open(options['output'], 'w') as output:
+                    json.dump(results, output, indent=2)
+                self.stdout.write(f"Results written to {options['output']}")
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                self.compare(json.load(baseline), results)
+
+    def run_benchmark(self, options):
+        # Progress goes to stderr when stdout carries the JSON
+        progress = self.stderr if options['output'] == '-' else self.stdout
+        if not JobApplication.objects.exists():
+            counts = seed_dataset(
+                users=options['users'],
+                companies=options['companies'],
+                positions_per_company=options['positions_per_company'],
+                applications=options['applications'],
+                interview_ratio=options['interview_ratio'],
+                note_ratio=options['note_ratio'],
+                documents_per_user=options['documents_per_user'],
+                seed=options['seed'],
+                stdout=progress,
+            )
+            progress.write(f'Seeded: {counts}')
+            # bulk_create skipped the signals maintaining snapshots and the search index
+            rebuild_snapshots()
+            rebuild_index()
+        analyze_database()
+
+        user = User.objects.filter(username__startswith='bench_user_').order_by('pk').first()
+        return {
+            'vendor': connection.vendor,
+            'dataset': {
+                'users': User.objects.count(),
+                'applications': JobApplication.objects.count(),
+                'user_applications': user.applications.count(),
+            },
+            'repeat': options['repeat'],
+            'views': benchmark_views(Client(), user, repeat=options['repeat']),
+            'emails': benchmark_emails(user, repeat=options['repeat']),
+        }
+
+    def report(self, results):
+        dataset = results['dataset']
+        self.stdout.write(
+            f"\n{dataset['applications']} applications on {results['vendor']}, "
+            f"{dataset['user_applications']} for the benchmarked user\n"
+        )
+        for section in ('views', 'emails'):
+            self.stdout.write(self.style.MIGRATE_HEADING(section))
+            for name, result in results[section].items():
+                self.stdout.write(
+                    f"  {name:<32} {result['median_ms']:>9.2f} ms  (first {result['first_ms']:.2f} ms, "
+                    f"{result['queries']} queries)"
+                )
+
+    def compare(self, baseline, results):
+        self.stdout.write(self.style.MIGRATE_HEADING('\nChange against the baseline'))
+        for section in ('views', 'emails'):
+            for name, result in results[section].items():
+                before = baseline.get(section, {}).get(name)
+                if before is None:
+                    self.stdout.write(f'  {section}.{name}: new')
+                    continue
+                change = (result['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0
+                line = (
+                    f"  {section}.{name}: {before['median_ms']:.2f} -> {result['median_ms']:.2f} ms "
+                    f"({change:+.0%}), {before['queries']} -> {result['queries']} queries"
+                )
+                if result['queries'] > before['queries']:
+                    line = self.style.WARNING(line)
+                self.stdout.write(line)
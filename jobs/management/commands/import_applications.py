@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.import_utils import CSV, JSON, ImportFileError, detect_format, import_applications, iter_records
+
+
+class Command(BaseCommand):
+    help = 'Import applications for a user from a CSV, JSON or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User the applications are imported for')
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format', choices=[CSV, JSON],
+            help='File format (default: detected from the file extension)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Rows written per transaction (default: IMPORT_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        file_format = options['format'] or detect_format(options['path'])
+        if not file_format:
+            raise CommandError('Could not tell the format from the file name, pass --format')
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                result = import_applications(user, iter_records(stream, file_format), options['batch_size'])
+        except OSError as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+        except ImportFileError as exc:
+            raise CommandError(str(exc))
+
+        for row_number, message in result.errors:
+            self.stderr.write(f'Row {row_number}: {message}')
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... and {result.error_count - len(result.errors)} more')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} of {result.rows} application(s) '
+            f'({result.companies_created} new companies, {result.positions_created} new positions, '
+            f'{result.error_count} row(s) skipped).'
+        ))
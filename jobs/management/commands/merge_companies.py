@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs.merge_utils import MERGE_BATCH_SIZE, merge_duplicate_companies
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute company name keys and merge companies whose names normalize to the same key, '
+        'repointing their positions to the oldest one'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=MERGE_BATCH_SIZE,
+            help=f'Duplicates merged per transaction (default: {MERGE_BATCH_SIZE})'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be merged')
+
+    def handle(self, *args, **options):
+        counts = merge_duplicate_companies(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        prefix = 'Would merge' if options['dry_run'] else 'Merged'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {counts['merged']} duplicate companies ({counts['positions']} positions repointed, "
+            f"{counts['rekeyed']} companies re-keyed)."
+        ))
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.upload_utils import default_stale_upload_age, delete_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable document uploads that were abandoned, and their partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int,
+            help='Delete uploads idle for this many hours (default: DOCUMENT_UPLOAD_EXPIRY_HOURS)'
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options['hours']) if options['hours'] is not None else default_stale_upload_age()
+        deleted = delete_stale_uploads(older_than)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} abandoned upload(s).'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs.counter_utils import COUNTER_BATCH_SIZE, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the interview round, note and last activity counters of applications and the '
+        'application counts of companies, fixing the rows that drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=COUNTER_BATCH_SIZE,
+            help=f'Rows compared and repaired per query (default: {COUNTER_BATCH_SIZE})'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report the rows that drifted')
+
+    def handle(self, *args, **options):
+        counts = rebuild_counters(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        prefix = 'Would repair' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} the counters of {counts['applications']} applications and "
+            f"{counts['companies']} companies."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search_utils import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for applications, notes and companies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of objects indexed per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Indexed {applications} application(s), {notes} note(s) and {companies} company(ies).'.format(**counts)
+        ))
@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.stats_utils import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user application statistics snapshots and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', metavar='USERNAME',
+            help='Only rebuild the snapshot of this user (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of users processed per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only check snapshots for drift; exit with an error if any have drifted"
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(User.objects.filter(username__in=options['usernames']).values_list('pk', flat=True))
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError('One or more users do not exist.')
+
+        created, drifted = rebuild_snapshots(
+            user_ids=user_ids,
+            batch_size=options['batch_size'],
+            dry_run=options['check'],
+        )
+
+        if options['check']:
+            if drifted:
+                raise CommandError(
+                    f"{len(drifted)} snapshot(s) have drifted: user ids {', '.join(map(str, drifted))}"
+                )
+            self.stdout.write(self.style.SUCCESS(f'No drift found ({created} snapshot(s) missing).'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} snapshot(s), repaired {len(drifted)} drifted snapshot(s).'
+        ))
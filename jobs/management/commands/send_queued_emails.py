@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from jobs.email_utils import (
+    claim_outbound_emails, deliver_outbound_email, get_connection_pool, requeue_stale_emails
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=getattr(settings, 'EMAIL_QUEUE_CONCURRENCY', 4),
+            help='Number of emails sent in parallel (default: EMAIL_QUEUE_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Number of emails claimed per batch (default: 50)'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5),
+            help='Attempts before an email is marked as failed (default: EMAIL_QUEUE_MAX_ATTEMPTS)'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting once it is drained'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait between polls of an empty queue with --loop (default: 5)'
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help='Seconds after which an email stuck in SENDING is requeued (default: 600)'
+        )
+
+    def handle(self, *args, **options):
+        sent = failed = errors = 0
+        executor = ThreadPoolExecutor(max_workers=options['concurrency']) if options['concurrency'] > 1 else None
+
+        def deliver(outbound):
+            return self.deliver(outbound, options['max_attempts'])
+
+        try:
+            while True:
+                requeued = requeue_stale_emails(timedelta(seconds=options['stale_after']))
+                if requeued:
+                    self.stdout.write(f'Requeued {requeued} stale email(s).')
+
+                batch = claim_outbound_emails(options['batch_size'])
+                if batch:
+                    if executor is None:
+                        results = [deliver(outbound) for outbound in batch]
+                    else:
+                        results = list(executor.map(deliver, batch))
+                    sent += results.count(True)
+                    failed += results.count(False)
+                    errors += results.count(None)
+                    continue
+
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                self.close_worker_connections(executor, options['concurrency'])
+                executor.shutdown(wait=True)
+            get_connection_pool().close()
+
+        summary = f'Sent {sent} email(s), {failed} failed attempt(s).'
+        if errors:
+            summary += f' {errors} email(s) hit an unexpected error and will be retried once stale.'
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def deliver(self, outbound, max_attempts):
+        """Deliver one email; an unexpected error is logged and returns None instead of stopping the worker"""
+        try:
+            return deliver_outbound_email(outbound, max_attempts=max_attempts)
+        except Exception:
+            logger.exception('Delivering email %s failed', outbound.pk)
+            return None
+
+    def close_worker_connections(self, executor, workers):
+        """
+        Close the database connection and SMTP sessions of every worker thread
+
+        Both are thread-local and reused across batches while the worker runs.
+        One finaliser per thread is submitted; each waits for the others, so
+        no thread can take two of them and leave another thread's open.
+        """
+        barrier = threading.Barrier(workers)
+
+        def close():
+            try:
+                get_connection_pool().close()
+                connection.close()
+            finally:
+                try:
+                    barrier.wait(timeout=30)
+                except threading.BrokenBarrierError:
+                    pass
+
+        for future in [executor.submit(close) for _ in range(workers)]:
+            future.exception()
@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.reminder_utils import DEADLINE, INTERVIEW, REMINDER_BATCH_SIZE, queue_due_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        'Queue reminder emails for upcoming interviews and application deadlines; '
+        'send_queued_emails delivers them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=REMINDER_BATCH_SIZE,
+            help=f'Number of due rows processed per batch (default: {REMINDER_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--interview-lead-hours', type=int,
+            help='Remind of interviews starting within this many hours (default: REMINDER_INTERVIEW_LEAD_HOURS)'
+        )
+        parser.add_argument(
+            '--deadline-lead-days', type=int,
+            help='Remind of deadlines within this many days (default: REMINDER_DEADLINE_LEAD_DAYS)'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running, checking for due reminders every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Seconds between runs with --loop (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        interview_lead_time = None
+        if options['interview_lead_hours'] is not None:
+            interview_lead_time = timedelta(hours=options['interview_lead_hours'])
+
+        try:
+            while True:
+                counts = queue_due_reminders(
+                    batch_size=options['batch_size'],
+                    interview_lead_time=interview_lead_time,
+                    deadline_days=options['deadline_lead_days'],
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f'Queued {counts[INTERVIEW]} interview and {counts[DEADLINE]} deadline reminder(s).'
+                ))
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
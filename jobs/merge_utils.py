@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .autocomplete_utils import invalidate_autocomplete
+from .company_utils import normalize_company_name
+from .counter_utils import refresh_company_counts
+from .dashboard_utils import invalidate_dashboard
+from .models import Company, JobApplication, JobPosition
+from .search_utils import index_applications
+from .stats_utils import rebuild_snapshots
+
+
+MERGE_BATCH_SIZE = 500
+
+
+def find_duplicate_companies(batch_size=MERGE_BATCH_SIZE):
+    """
+    Recompute every company's key and find the companies whose keys collide
+
+    The oldest company of each key is kept. Only ids and keys are held in
+    memory while the table is read in chunks of batch_size.
+
+    Returns:
+        tuple: (dict of duplicate id -> id of the company it merges into,
+        list of (company id, new key) for kept companies whose key changed)
+    """
+    canonical = {}
+    merged = {}
+    rekeyed = []
+    companies = Company.objects.order_by('pk').values_list('pk', 'name', 'normalized_name')
+    for pk, name, current_key in companies.iterator(chunk_size=batch_size):
+        key = normalize_company_name(name)
+        if key in canonical:
+            merged[pk] = canonical[key]
+        else:
+            canonical[key] = pk
+            if key != current_key:
+                rekeyed.append((pk, key))
+    return merged, rekeyed
+
+
+def _merge_batch(merged, batch):
+    """Repoint the positions of a batch of duplicates in one UPDATE, then delete them"""
+    with transaction.atomic():
+        positions = JobPosition.objects.filter(company_id__in=batch).update(
+            company_id=Case(*[When(company_id=pk, then=Value(merged[pk])) for pk in batch])
+        )
+        # Deleting through the queryset sends post_delete, which unindexes them
+        Company.objects.filter(pk__in=batch).delete()
+    return positions
+
+
+def _rekey(rekeyed, batch_size):
+    """
+    Store new keys without tripping the unique constraint midway
+
+    Keys are first moved to placeholders no name can normalize to ("#<id>"),
+    so a company may take over a key another one is giving up.
+    """
+    companies = [Company(pk=pk, normalized_name=f'#{pk}') for pk, _ in rekeyed]
+    with transaction.atomic():
+        Company.objects.bulk_update(companies, ['normalized_name'], batch_size=batch_size)
+        for company, (_, key) in zip(companies, rekeyed):
+            company.normalized_name = key
+        Company.objects.bulk_update(companies, ['normalized_name'], batch_size=batch_size)
+
+
+def merge_duplicate_companies(batch_size=MERGE_BATCH_SIZE, dry_run=False):
+    """
+    Merge companies that normalize to the same key into the oldest one
+
+    Needed whenever normalize_company_name changes (e.g. a new legal
+    suffix), since stored keys don't follow on their own. Positions of the
+    duplicates are repointed with one UPDATE per batch of batch_size
+    duplicates; the statistics snapshots, dashboards and search entries of
+    the affected applications are refreshed afterwards.
+
+    Args:
+        batch_size: Duplicates merged per transaction
+        dry_run: Only count, don't change anything
+
+    Returns:
+        dict: Number of duplicates merged, positions repointed and companies re-keyed
+    """
+    merged, rekeyed = find_duplicate_companies(batch_size)
+    counts = {'merged': len(merged), 'positions': 0, 'rekeyed': len(rekeyed)}
+    if dry_run:
+        counts['positions'] = JobPosition.objects.filter(company_id__in=list(merged)).count()
+        return counts
+
+    duplicate_ids = list(merged)
+    for start in range(0, len(duplicate_ids), batch_size):
+        counts['positions'] += _merge_batch(merged, duplicate_ids[start:start + batch_size])
+    if rekeyed:
+        _rekey(rekeyed, batch_size)
+    if merged or rekeyed:
+        invalidate_autocomplete('companies', 'positions')
+
+    if merged:
+        refresh_company_counts(set(merged.values()))
+        applications = JobApplication.objects.filter(position__company_id__in=set(merged.values()))
+        user_ids = list(applications.order_by().values_list('user_id', flat=True).distinct())
+        rebuild_snapshots(user_ids=user_ids)
+        for user_id in user_ids:
+            invalidate_dashboard(user_id)
+        application_ids = list(applications.values_list('pk', flat=True))
+        for start in range(0, len(application_ids), batch_size):
+            index_applications(application_ids[start:start + batch_size])
+    return counts
@@ -0,0 +1,54 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .profiling_utils import profile_queries
+
+
+logger = logging.getLogger('jobs.profiler')
+
+
+class QueryProfilerMiddleware:
+    """
+    Opt-in per-request profiler, enabled by QUERY_PROFILER_ENABLED
+
+    Records the number and time of SQL queries, exact duplicates, repeated
+    query shapes (N+1 patterns) and template render time. They are sent
+    back in a Server-Timing header and logged as one JSON line on the
+    jobs.profiler logger; requests with repeated shapes or over their
+    view's @query_budget are logged as warnings. Put it first in
+    MIDDLEWARE so the session and auth queries are counted too.
+    Queries run while a streaming response is consumed are not included.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profile_queries() as profile:
+            response = self.get_response(request)
+
+        timing = profile.server_timing()
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        match = request.resolver_match
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            **profile.summary(),
+        }
+        budget = getattr(match.func, 'query_budget', None) if match else None
+        if budget is not None:
+            summary['budget'] = budget
+        over_budget = budget is not None and profile.query_count > budget
+        level = logging.WARNING if summary['similar'] or over_budget else logging.INFO
+        logger.log(level, json.dumps(summary), extra={'profile': summary})
+        return response
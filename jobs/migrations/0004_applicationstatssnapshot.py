@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_jobapplication_application_platform_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('status_counts', models.JSONField(default=dict, help_text='Status code -> count')),
+                ('monthly_counts', models.JSONField(default=dict, help_text="'YYYY-MM' of creation -> count")),
+                ('industry_counts', models.JSONField(default=dict, help_text='Company industry -> count')),
+                ('company_counts', models.JSONField(default=dict, help_text='Company id -> count')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,86 @@
+from itertools import islice
+
+from django.db import migrations
+
+
+# Rows read and inserted at a time, as in jobs.search_utils.rebuild_index
+BATCH_SIZE = 1000
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_search_index USING fts5("
+            "body, kind UNINDEXED, object_id UNINDEXED, user_id UNINDEXED, application_id UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS jobs_search_index ("
+            "id bigint PRIMARY KEY, "
+            "kind smallint NOT NULL, "
+            "object_id bigint NOT NULL, "
+            "user_id integer NULL, "
+            "application_id bigint NULL, "
+            "body text NOT NULL, "
+            "document tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_search_index_document ON jobs_search_index USING GIN (document)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_search_index_user ON jobs_search_index (user_id, kind)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_search_index")
+
+
+def populate_search_index(apps, schema_editor):
+    """Index the rows that existed before the index did"""
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    ApplicationNote = apps.get_model('jobs', 'ApplicationNote')
+    Company = apps.get_model('jobs', 'Company')
+
+    def join(*parts):
+        return ' '.join(part for part in parts if part)
+
+    def rows():
+        # Row ids follow jobs.search_utils: object_id * 4 + kind
+        for pk, user_id, title, company_name, notes in JobApplication.objects.order_by('pk').values_list(
+                'pk', 'user_id', 'position__title', 'position__company__name', 'notes').iterator(chunk_size=BATCH_SIZE):
+            yield pk * 4 + 1, join(title, company_name, notes), 1, pk, user_id, pk
+        for pk, user_id, application_id, note in ApplicationNote.objects.order_by('pk').values_list(
+                'pk', 'application__user_id', 'application_id', 'note').iterator(chunk_size=BATCH_SIZE):
+            yield pk * 4 + 2, note, 2, pk, user_id, application_id
+        for pk, name, industry, location in Company.objects.order_by('pk').values_list(
+                'pk', 'name', 'industry', 'location').iterator(chunk_size=BATCH_SIZE):
+            yield pk * 4 + 3, join(name, industry, location), 3, pk, None, None
+
+    id_column = 'rowid' if vendor == 'sqlite' else 'id'
+    sql = (
+        'INSERT INTO jobs_search_index ({}, body, kind, object_id, user_id, application_id) '
+        'VALUES (%s, %s, %s, %s, %s, %s)'.format(id_column)
+    )
+    pending = rows()
+    with schema_editor.connection.cursor() as cursor:
+        while batch := list(islice(pending, BATCH_SIZE)):
+            cursor.executemany(sql, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_applicationstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
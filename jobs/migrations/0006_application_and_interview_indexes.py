@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewround',
+            index=models.Index(condition=models.Q(('status', 'SCHEDULED')), fields=['scheduled_date'], name='jobs_interview_scheduled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='jobs_app_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'status', '-created_at', '-id'], name='jobs_app_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'priority', '-created_at', '-id'], name='jobs_app_user_priority_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_outboundemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('INTERVIEW', 'Interview'), ('DEADLINE', 'Deadline')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(help_text='Id of the InterviewRound or JobApplication')),
+                ('due_at', models.DateTimeField(help_text='Interview date or deadline the reminder was sent for')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(condition=models.Q(('deadline__isnull', False), ('status', 'DRAFT')), fields=['deadline', 'id'], name='jobs_app_draft_deadline_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminderlog',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderlog',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'due_at'), name='jobs_reminder_unique'),
+        ),
+    ]
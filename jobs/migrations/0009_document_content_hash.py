@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:56
+
+import jobs.storage_utils
+from django.db import migrations, models
+
+
+def hash_existing_documents(apps, schema_editor):
+    """Hash files uploaded before content addressing; they stay at their old path"""
+    Document = apps.get_model('jobs', 'Document')
+    for document in Document.objects.filter(sha256='').exclude(file='').iterator():
+        try:
+            with document.file.open('rb'):
+                document.sha256 = jobs.storage_utils.file_sha256(document.file)
+        except FileNotFoundError:
+            continue
+        document.save(update_fields=['sha256'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_reminderlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(storage=jobs.storage_utils.get_document_storage, upload_to=jobs.storage_utils.document_upload_to),
+        ),
+        migrations.RunPython(hash_existing_documents, migrations.RunPython.noop),
+    ]
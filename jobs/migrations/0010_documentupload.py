@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_document_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField(help_text='Total size of the file in bytes')),
+                ('received', models.PositiveBigIntegerField(default=0, help_text='Bytes received so far')),
+                ('name', models.CharField(max_length=200)),
+                ('document_type', models.CharField(choices=[('RESUME', 'Resume'), ('COVER_LETTER', 'Cover Letter'), ('PORTFOLIO', 'Portfolio'), ('OTHER', 'Other')], max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:14
+
+import jobs.company_utils
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+
+MERGE_BATCH_SIZE = 500
+
+
+def merge_duplicate_companies(apps, schema_editor):
+    """Key existing companies and fold duplicates into the oldest company with the same key"""
+    Company = apps.get_model('jobs', 'Company')
+    JobPosition = apps.get_model('jobs', 'JobPosition')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    ApplicationStatsSnapshot = apps.get_model('jobs', 'ApplicationStatsSnapshot')
+
+    canonical = {}
+    merged = {}
+    keyed = []
+    for company in Company.objects.order_by('pk').only('pk', 'name').iterator():
+        key = jobs.company_utils.normalize_company_name(company.name)
+        if key in canonical:
+            merged[company.pk] = canonical[key]
+        else:
+            canonical[key] = company.pk
+            company.normalized_name = key
+            keyed.append(company)
+
+    duplicate_ids = list(merged)
+    for start in range(0, len(duplicate_ids), MERGE_BATCH_SIZE):
+        batch = duplicate_ids[start:start + MERGE_BATCH_SIZE]
+        JobPosition.objects.filter(company_id__in=batch).update(
+            company_id=Case(*[When(company_id=pk, then=Value(merged[pk])) for pk in batch])
+        )
+        Company.objects.filter(pk__in=batch).delete()
+    Company.objects.bulk_update(keyed, ['normalized_name'], batch_size=MERGE_BATCH_SIZE)
+
+    if duplicate_ids:
+        # Snapshots count applications per company id; they are rebuilt on next use
+        users = JobApplication.objects.filter(
+            position__company_id__in=set(merged.values())
+        ).values('user_id')
+        ApplicationStatsSnapshot.objects.filter(user_id__in=users).delete()
+        if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+            # Row ids follow jobs.search_utils: object_id * 4 + kind, kind 3 for companies
+            id_column = 'rowid' if schema_editor.connection.vendor == 'sqlite' else 'id'
+            with schema_editor.connection.cursor() as cursor:
+                cursor.executemany(
+                    f'DELETE FROM jobs_search_index WHERE {id_column} = %s',
+                    [(pk * 4 + 3,) for pk in duplicate_ids]
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_documentupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='normalized_name',
+            field=models.CharField(default='', editable=False, max_length=200),
+            preserve_default=False,
+        ),
+        migrations.RunPython(merge_duplicate_companies, migrations.RunPython.noop),
+    ]
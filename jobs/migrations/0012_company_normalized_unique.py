@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0011 so the constraint isn't added in the transaction that
+    # repointed positions (PostgreSQL refuses while deferred FK checks are pending)
+
+    dependencies = [
+        ('jobs', '0011_company_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='company',
+            constraint=models.UniqueConstraint(fields=('normalized_name',), name='jobs_company_normalized_unique'),
+        ),
+    ]
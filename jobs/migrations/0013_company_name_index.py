@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_company_normalized_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['name', 'id'], name='jobs_company_name_idx'),
+        ),
+    ]
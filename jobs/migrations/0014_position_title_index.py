@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:26
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_company_name_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposition',
+            index=models.Index(django.db.models.functions.text.Lower('title'), models.F('id'), name='jobs_position_title_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def count_children(apps, schema_editor):
+    """Fill the new counters with one set-based UPDATE per table"""
+    Company = apps.get_model('jobs', 'Company')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    InterviewRound = apps.get_model('jobs', 'InterviewRound')
+    ApplicationNote = apps.get_model('jobs', 'ApplicationNote')
+
+    def children(model, outer_field):
+        return model.objects.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field)
+
+    def count(model, outer_field):
+        return Coalesce(Subquery(children(model, outer_field).annotate(count=Count('pk')).values('count')), Value(0))
+
+    def latest_update(model):
+        return Coalesce(
+            Subquery(children(model, 'application').annotate(latest=Max('updated_at')).values('latest')),
+            F('updated_at'),
+        )
+
+    JobApplication.objects.update(
+        interview_round_count=count(InterviewRound, 'application'),
+        note_count=count(ApplicationNote, 'application'),
+        last_activity_at=Greatest(F('updated_at'), latest_update(InterviewRound), latest_update(ApplicationNote)),
+    )
+    Company.objects.update(application_count=count(JobApplication, 'position__company'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_position_title_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='interview_round_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='note_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Last change to the application, its interview rounds or notes'),
+        ),
+        migrations.RunPython(count_children, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:58
+
+from django.db import migrations
+from django.db.models import Exists, OuterRef, Q
+
+
+def keep_latest_flag(apps, schema_editor):
+    """Leave one primary email per user and one default document per user and type: the latest updated"""
+    for model_name, flag, scope in (
+        ('UserEmail', 'is_primary', ['user']),
+        ('Document', 'is_default', ['user', 'document_type']),
+    ):
+        model = apps.get_model('jobs', model_name)
+        flagged = model.objects.filter(**{flag: True})
+        newer = flagged.filter(
+            Q(updated_at__gt=OuterRef('updated_at')) | Q(updated_at=OuterRef('updated_at'), pk__gt=OuterRef('pk')),
+            **{name: OuterRef(name) for name in scope},
+        )
+        # Materialized first: not every backend updates a table filtered on a subquery of itself
+        stale = list(flagged.filter(Exists(newer)).values_list('pk', flat=True))
+        model.objects.filter(pk__in=stale).update(**{flag: False})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_flag, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0016 so the constraints aren't added in the transaction that
+    # cleared the extra flags (PostgreSQL refuses while trigger events are pending)
+
+    dependencies = [
+        ('jobs', '0016_single_flag_cleanup'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='useremail',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('is_primary', True)), fields=('user',), name='jobs_useremail_one_primary'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='document',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('is_default', True)), fields=('user', 'document_type'),
+                name='jobs_document_one_default',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_single_flag_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['-application_count', 'name', 'id'], name='jobs_company_applications_idx'),
+        ),
+    ]
@@ -1,7 +1,77 @@
-from django.db import models
+import os
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import DEFERRED
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .company_utils import NORMALIZED_NAME_MAX_LENGTH, normalize_company_name
+from .storage_utils import document_upload_to, file_sha256, get_document_storage
+
+
+def _claims_flag(instance, flag, scope, update_fields=None):
+    """
+    Whether saving instance turns flag on within scope, so other rows of the scope must drop it
+
+    Rows loaded with the flag already on, in the same scope, don't: ordinary
+    edits then skip the UPDATE of the other rows.
+
+    Args:
+        instance: Model instance being saved, with _loaded_values when loaded from the database
+        flag: Name of the boolean field only one row per scope may have on
+        scope: Attribute names of the fields grouping the rows, e.g. ['user_id']
+        update_fields: update_fields of the save, if any
+    """
+    if not getattr(instance, flag):
+        return False
+    if update_fields is not None and flag not in update_fields and not set(scope) & set(update_fields):
+        return False
+    loaded = getattr(instance, '_loaded_values', None)
+    if instance._state.adding or loaded is None:
+        return True
+    return any(loaded.get(name, DEFERRED) != getattr(instance, name) for name in (flag, *scope))
+
+
+def _save_with_flag(instance, save, flag, scope, *args, **kwargs):
+    """
+    Save instance, first clearing flag on the other rows of its scope if it claims it
+
+    Both statements run in one transaction, so the partial unique constraint
+    on the flag holds at every point and a concurrent claim fails instead of
+    leaving two rows flagged.
+    """
+    with transaction.atomic(using=kwargs.get('using')):
+        if _claims_flag(instance, flag, scope, kwargs.get('update_fields')):
+            type(instance)._default_manager.filter(
+                **{name: getattr(instance, name) for name in scope}, **{flag: True}
+            ).exclude(pk=instance.pk).update(**{flag: False})
+        save(*args, **kwargs)
+    instance._loaded_values = {
+        **(getattr(instance, '_loaded_values', None) or {}),
+        **{name: getattr(instance, name) for name in (flag, *scope)},
+    }
+
+
+def _without_counters(instance, counters, kwargs):
+    """
+    Keyword arguments of a save that leaves the counter columns alone
+
+    Counters are maintained with F() updates (see jobs/counter_utils.py); a
+    full save of an instance loaded before one of them would write the old
+    value back. Saves of stored rows without update_fields therefore write
+    every other concrete field. Inserts and explicit update_fields are left
+    as they are.
+    """
+    if instance._state.adding or kwargs.get('force_insert') or kwargs.get('update_fields') is not None:
+        return kwargs
+    return {**kwargs, 'update_fields': [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counters
+    ]}
+
 
 class UserEmail(models.Model):
     """Model to store multiple email addresses for a user"""
@@ -24,34 +94,98 @@ class UserEmail(models.Model):
     class Meta:
         ordering = ['-is_primary', 'email_type', 'label']
         unique_together = ['user', 'email']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'], condition=models.Q(is_primary=True), name='jobs_useremail_one_primary'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.label} ({self.email})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so saves can tell whether the primary flag changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def validate_constraints(self, exclude=None):
+        # Claiming the flag isn't an error: save() takes it over from the current primary email
+        super().validate_constraints(exclude={*(exclude or ()), 'is_primary'})
+
     def save(self, *args, **kwargs):
-        # If this is set as primary, unset other primary emails for this user
-        if self.is_primary:
-            UserEmail.objects.filter(user=self.user, is_primary=True).exclude(pk=self.pk).update(is_primary=False)
-        super().save(*args, **kwargs)
+        # Becoming primary unsets the user's other primary email in the same transaction
+        _save_with_flag(self, super().save, 'is_primary', ['user_id'], *args, **kwargs)
+
+
+class CompanyQuerySet(models.QuerySet):
+    def lookup(self, name):
+        """The company known under name or a variant of it ("Google LLC" for "google"), or None"""
+        return self.filter(normalized_name=normalize_company_name(name)).first()
+
+    def lookup_or_create(self, name, defaults=None):
+        """
+        Company known under name or a variant of it, created if there is none
+
+        Returns:
+            tuple: (Company, created)
+        """
+        return self.get_or_create(
+            normalized_name=normalize_company_name(name), defaults={'name': name, **(defaults or {})}
+        )
 
 
 class Company(models.Model):
     """Model to store company information"""
     name = models.CharField(max_length=200)
+    # Deduplication key derived from name, see normalize_company_name
+    normalized_name = models.CharField(max_length=NORMALIZED_NAME_MAX_LENGTH, editable=False)
     website = models.URLField(blank=True, null=True)
     location = models.CharField(max_length=200, blank=True, null=True)
     industry = models.CharField(max_length=100, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
+    # Applications to the company's positions, all users together; see jobs/counter_utils.py
+    application_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CompanyQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Companies"
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['normalized_name'], name='jobs_company_normalized_unique'),
+        ]
+        indexes = [
+            # Keyset pagination of the company list, by name or busiest first
+            models.Index(fields=['name', 'id'], name='jobs_company_name_idx'),
+            models.Index(fields=['-application_count', 'name', 'id'], name='jobs_company_applications_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so saves can tell whether the industry changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def clean(self):
+        existing = Company.objects.exclude(pk=self.pk).lookup(self.name)
+        if existing:
+            raise ValidationError({'name': f'This company already exists as "{existing.name}".'})
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_company_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **_without_counters(self, ['application_count'], kwargs))
+
 
 class JobPosition(models.Model):
     """Model to store job position details"""
@@ -82,10 +216,21 @@ class JobPosition(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Case-insensitive title prefix search of the position autocomplete
+            models.Index(Lower('title'), 'id', name='jobs_position_title_lower_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so saves can tell whether the company changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Document(models.Model):
     """Model to store resumes and cover letters"""
@@ -99,7 +244,8 @@ class Document(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='documents')
     name = models.CharField(max_length=200)
     document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPE_CHOICES)
-    file = models.FileField(upload_to='documents/%Y/%m/')
+    file = models.FileField(upload_to=document_upload_to, storage=get_document_storage)
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
     description = models.TextField(blank=True, null=True)
     is_default = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -107,19 +253,71 @@ class Document(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'document_type'], condition=models.Q(is_default=True),
+                name='jobs_document_one_default',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_document_type_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so saves can tell whether the default flag changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def validate_constraints(self, exclude=None):
+        # Claiming the flag isn't an error: save() takes it over from the current default document
+        super().validate_constraints(exclude={*(exclude or ()), 'is_default'})
+
+    @property
+    def filename(self):
+        """Name the file is attached as: the document name with the file's extension"""
+        extension = os.path.splitext(self.file.name)[1]
+        if self.name.lower().endswith(extension.lower()):
+            return self.name
+        return f"{self.name}{extension}"
+
     def save(self, *args, **kwargs):
-        # If this document is set as default, unset other defaults of the same type
-        if self.is_default:
-            Document.objects.filter(
-                user=self.user, 
-                document_type=self.document_type, 
-                is_default=True
-            ).exclude(pk=self.pk).update(is_default=False)
-        super().save(*args, **kwargs)
+        # New uploads are stored under their content hash; an identical file
+        # that is already stored is reused instead of written again
+        if self.file and not self.file._committed:
+            # Streamed uploads were hashed while they were received
+            self.sha256 = getattr(self.file.file, 'sha256', None) or file_sha256(self.file)
+        # Becoming the default unsets the other default of the same type in the same transaction
+        _save_with_flag(self, super().save, 'is_default', ['user_id', 'document_type'], *args, **kwargs)
+
+
+class DocumentUpload(models.Model):
+    """Resumable chunked upload of a document that is still in progress"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='document_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Total size of the file in bytes")
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far")
+
+    # Fields of the Document created once the upload is complete
+    name = models.CharField(max_length=200)
+    document_type = models.CharField(max_length=20, choices=Document.DOCUMENT_TYPE_CHOICES)
+    description = models.TextField(blank=True, null=True)
+    is_default = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.received >= self.size
 
 
 class JobApplication(models.Model):
@@ -218,6 +416,14 @@ class JobApplication(models.Model):
     email_sent = models.BooleanField(default=False)
     email_sent_date = models.DateTimeField(blank=True, null=True)
     
+    # Counters kept up to date on child saves and deletes, see jobs/counter_utils.py
+    interview_round_count = models.PositiveIntegerField(default=0, editable=False)
+    note_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(
+        default=timezone.now, editable=False,
+        help_text="Last change to the application, its interview rounds or notes"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -225,18 +431,46 @@ class JobApplication(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['user', 'position']
+        indexes = [
+            # Application list (newest first, keyset-paginated on created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='jobs_app_user_created_idx'),
+            # Status/priority filtered lists in the same order; the status
+            # index also covers the per-status counts
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='jobs_app_user_status_idx'),
+            models.Index(fields=['user', 'priority', '-created_at', '-id'], name='jobs_app_user_priority_idx'),
+            # Deadline reminders only look at drafts that have a deadline
+            models.Index(
+                fields=['deadline', 'id'],
+                condition=models.Q(status='DRAFT', deadline__isnull=False),
+                name='jobs_app_draft_deadline_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.position.title} at {self.position.company.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so saves can tell what actually changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.last_activity_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'last_activity_at'}
+        super().save(*args, **_without_counters(self, ['interview_round_count', 'note_count'], kwargs))
+
     def mark_as_sent(self):
-        """Mark the application as sent via email"""
+        """Mark the application as sent via email, writing only the fields that changes"""
         self.email_sent = True
         self.email_sent_date = timezone.now()
         if self.status == 'DRAFT':
             self.status = 'APPLIED'
             self.applied_date = timezone.now().date()
-        self.save()
+        self.save(update_fields=['email_sent', 'email_sent_date', 'status', 'applied_date', 'updated_at'])
 
 
 class InterviewRound(models.Model):
@@ -276,6 +510,14 @@ class InterviewRound(models.Model):
     class Meta:
         ordering = ['application', 'round_number']
         unique_together = ['application', 'round_number']
+        indexes = [
+            # Upcoming interviews: only scheduled rounds are ever looked up by date
+            models.Index(
+                fields=['scheduled_date'],
+                condition=models.Q(status='SCHEDULED'),
+                name='jobs_interview_scheduled_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Round {self.round_number} - {self.get_interview_type_display()} for {self.application}"
@@ -293,3 +535,99 @@ class ApplicationNote(models.Model):
 
     def __str__(self):
         return f"Note for {self.application} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+class ApplicationStatsSnapshot(models.Model):
+    """Running per-user tallies of job applications, kept up to date on every save/delete"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats_snapshot')
+    total = models.PositiveIntegerField(default=0)
+    status_counts = models.JSONField(default=dict, help_text="Status code -> count")
+    monthly_counts = models.JSONField(default=dict, help_text="'YYYY-MM' of creation -> count")
+    industry_counts = models.JSONField(default=dict, help_text="Company industry -> count")
+    company_counts = models.JSONField(default=dict, help_text="Company id -> count")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Statistics snapshot for {self.user.username}"
+
+    def tallies(self):
+        """Return the tallies as a dict, for comparing snapshots"""
+        return {
+            'total': self.total,
+            'status_counts': self.status_counts,
+            'monthly_counts': self.monthly_counts,
+            'industry_counts': self.industry_counts,
+            'company_counts': self.company_counts,
+        }
+
+
+class OutboundEmail(models.Model):
+    """Outgoing email waiting in the queue drained by the send_queued_emails worker"""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='outbound_emails')
+    application = models.ForeignKey(
+        JobApplication,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='outbound_emails'
+    )
+    from_email = models.CharField(max_length=320)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    subject = models.CharField(max_length=500)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    attachment_ids = models.JSONField(default=list, blank=True, help_text="Ids of the Documents to attach")
+    mark_application_sent = models.BooleanField(
+        default=False,
+        help_text="Mark the application as sent once delivery is confirmed"
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The worker polls for due pending messages
+            models.Index(fields=['status', 'next_attempt_at'], name='jobs_outbound_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.get_status_display()})"
+
+
+class ReminderLog(models.Model):
+    """Record of a reminder handed to the mail queue, so it is never sent twice"""
+    KIND_CHOICES = [
+        ('INTERVIEW', 'Interview'),
+        ('DEADLINE', 'Deadline'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="Id of the InterviewRound or JobApplication")
+    due_at = models.DateTimeField(help_text="Interview date or deadline the reminder was sent for")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reminder_logs')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # A rescheduled interview or moved deadline gets a new reminder
+            models.UniqueConstraint(fields=['kind', 'object_id', 'due_at'], name='jobs_reminder_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for #{self.object_id} due {self.due_at}"
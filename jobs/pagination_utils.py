@@ -0,0 +1,254 @@
+import datetime
+import decimal
+import hashlib
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import QueryDict
+
+
+CURSOR_PARAM = 'cursor'
+CURSOR_SALT = 'jobs.pagination.cursor'
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated queryset
+
+    Behaves like a Paginator page for iteration, length and truth tests, so
+    list templates can loop over it unchanged.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor,
+                 approximate_count=None, querydict=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approximate_count = approximate_count
+        self._querydict = querydict
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _querystring(self, cursor):
+        params = self._querydict.copy() if self._querydict is not None else QueryDict(mutable=True)
+        params.pop('page', None)
+        params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        """Current query string (filters included) pointing at the next page"""
+        return self._querystring(self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_querystring(self):
+        """Current query string (filters included) pointing at the previous page"""
+        return self._querystring(self.previous_cursor) if self.has_previous else ''
+
+
+class CursorPaginator:
+    """
+    Keyset (cursor) paginator
+
+    Pages are selected with a WHERE clause on the ordering columns instead
+    of OFFSET, and no COUNT(*) is needed to know whether there is another
+    page, so every page costs the same however deep the user goes. The
+    ordering must end with a unique, non-null column (usually the primary
+    key) so every row has a distinct position.
+
+    Cursors are opaque signed tokens; a missing or tampered cursor gives
+    the first page.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _encode(self, direction, obj):
+        values = [getattr(obj, field) for field in self.fields]
+        return signing.dumps([direction, values], salt=CURSOR_SALT, serializer=_CursorSerializer)
+
+    def _decode(self, cursor):
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+            values = [self._to_python(field, value) for field, value in zip(self.fields, values)]
+        except (signing.BadSignature, ValueError, TypeError, LookupError):
+            return None, None
+        if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+            return None, None
+        return direction, values
+
+    def _to_python(self, field, value):
+        try:
+            return self.queryset.model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            # An annotation such as a count, already a plain JSON value
+            return value
+
+    def get_page(self, cursor=None, approximate_count=None, querydict=None):
+        """
+        Return the page a cursor points at
+
+        Args:
+            cursor: Token from a previous page's next/previous cursor
+            approximate_count: Optional callable returning the total number of rows
+            querydict: Current request.GET, used to build next/previous query strings
+
+        Returns:
+            CursorPage
+        """
+        direction, values = self._decode(cursor) if cursor else (None, None)
+        queryset = self.queryset
+
+        if direction == PREVIOUS:
+            reverse_ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+            rows = list(
+                queryset.filter(keyset_filter(self.ordering, values, forward=False)).order_by(*reverse_ordering)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            if direction == NEXT:
+                queryset = queryset.filter(keyset_filter(self.ordering, values, forward=True))
+            rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            object_list = rows[:self.per_page]
+            has_previous = direction == NEXT
+
+        if not object_list:
+            has_next = has_previous = False
+
+        return CursorPage(
+            object_list,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self._encode(NEXT, object_list[-1]) if has_next else None,
+            previous_cursor=self._encode(PREVIOUS, object_list[0]) if has_previous else None,
+            approximate_count=approximate_count() if approximate_count else None,
+            querydict=querydict,
+        )
+
+
+def keyset_filter(ordering, values, forward=True):
+    """
+    Build the row-value comparison "(a, b, id) after (x, y, z)" as
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z), with
+    each comparison flipped for descending columns and when paging backwards
+    """
+    condition = Q()
+    equal = {}
+    for name, value in zip(ordering, values):
+        field = name.lstrip('-')
+        descending = name.startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= Q(**equal, **{f'{field}__{lookup}': value})
+        equal[field] = value
+    return condition
+
+
+def keyset_batches(queryset, ordering, batch_size):
+    """
+    Iterate over a queryset in keyset-paginated batches
+
+    Each batch is fetched with a WHERE clause on the ordering columns after
+    the last row of the previous one, so only one batch is in memory and
+    rows stay correctly ordered even if earlier rows change meanwhile.
+
+    Args:
+        queryset: Queryset to iterate over
+        ordering: Ordering ending with a unique column, e.g. ['scheduled_date', 'id']
+        batch_size: Number of rows per batch
+
+    Yields:
+        list: Model instances
+    """
+    fields = [name.lstrip('-') for name in ordering]
+    values = None
+    while True:
+        batch_queryset = queryset if values is None else queryset.filter(keyset_filter(ordering, values))
+        batch = list(batch_queryset.order_by(*ordering)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        values = [getattr(batch[-1], field) for field in fields]
+
+
+def _encode_value(value):
+    # Unlike DjangoJSONEncoder, keep full microsecond precision: a truncated
+    # timestamp would make the keyset comparison skip or repeat rows
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+class _CursorSerializer:
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), default=_encode_value).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8'))
+
+
+def cached_count(queryset):
+    """
+    Approximate row count of a queryset
+
+    The exact count is cached for PAGINATION_COUNT_CACHE_TIMEOUT seconds
+    under a key derived from the SQL, so repeated page loads with the same
+    filters don't run COUNT(*) again.
+    """
+    sql, params = queryset.query.sql_with_params()
+    key = 'jobs:count:' + hashlib.sha256(f'{sql}|{params!r}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+    return count
+
+
+def cursor_paginate(request, queryset, ordering, per_page, approximate_count=None):
+    """
+    Keyset-paginate a queryset from the request's cursor parameter
+
+    Args:
+        request: Current request; its GET parameters are carried over to the page links
+        queryset: Filtered queryset to paginate
+        ordering: Ordering ending with a unique column, e.g. ['-created_at', '-id']
+        per_page: Number of rows per page
+        approximate_count: Optional callable returning an approximate total
+
+    Returns:
+        CursorPage
+    """
+    paginator = CursorPaginator(queryset, ordering, per_page)
+    return paginator.get_page(
+        request.GET.get(CURSOR_PARAM),
+        approximate_count=approximate_count,
+        querydict=request.GET,
+    )
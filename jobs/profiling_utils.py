@@ -0,0 +1,207 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+
+# Literal lists and numbers that vary between otherwise identical queries
+IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)')
+NUMBER_RE = re.compile(r'(?<![\w"])\d+(?![\w"])')
+
+_active_profile = ContextVar('jobs_request_profile', default=None)
+# Template._render before instrument_templates wrapped it, and the number of
+# blocks currently using the wrapper
+_original_render = None
+_instrumented_blocks = 0
+_instrument_lock = threading.Lock()
+
+
+def similar_query_threshold():
+    """Repeats of one query shape that count as an N+1 pattern"""
+    return getattr(settings, 'QUERY_PROFILER_SIMILAR_THRESHOLD', 3)
+
+
+def fingerprint(sql):
+    """Query shape: the SQL with parameters, IN lists and numbers folded"""
+    return NUMBER_RE.sub('N', IN_LIST_RE.sub('IN (...)', sql))
+
+
+class RequestProfile:
+    """
+    Queries and template time of one request (or any block of code)
+
+    Used as a database execute wrapper: every query run while it is
+    installed is timed and remembered with its parameters.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, repr(params), time.perf_counter() - start))
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    @property
+    def total_time(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def duplicate_count(self):
+        """Queries run again with exactly the same SQL and parameters"""
+        return len(self.queries) - len({(sql, params) for sql, params, _ in self.queries})
+
+    def similar_queries(self, threshold=None):
+        """
+        Query shapes run at least threshold times, the usual sign of an N+1
+
+        Returns:
+            list: (fingerprint, count) tuples, most repeated first
+        """
+        threshold = threshold or similar_query_threshold()
+        counts = Counter(fingerprint(sql) for sql, _, _ in self.queries)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    def summary(self):
+        """Plain dict of the measurements, for logs and JSON output"""
+        return {
+            'queries': self.query_count,
+            'duplicates': self.duplicate_count(),
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+            'similar': [{'sql': shape, 'count': count} for shape, count in self.similar_queries()],
+        }
+
+    def server_timing(self):
+        """Value of a Server-Timing header describing the profile"""
+        metrics = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries, {self.duplicate_count()} duplicates"',
+            f'tpl;dur={self.template_time * 1000:.2f};desc="Templates"',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ]
+        similar = self.similar_queries()
+        if similar:
+            metrics.append(f'nplusone;desc="{len(similar)} repeated query shapes"')
+        return ', '.join(metrics)
+
+
+def _timed_render(original_render):
+    def timed_render(self, context):
+        profile = _active_profile.get()
+        if profile is None:
+            return original_render(self, context)
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - start
+
+    return timed_render
+
+
+@contextmanager
+def instrument_templates():
+    """
+    Time template rendering for the active profile while the block runs
+
+    Only the outermost render is timed, so included and extended templates
+    aren't counted twice. Template._render is wrapped when the first
+    profiled block starts and restored when the last one ends, so nothing
+    is patched unless something is being profiled.
+    """
+    global _original_render, _instrumented_blocks
+    with _instrument_lock:
+        if not _instrumented_blocks:
+            _original_render = Template._render
+            Template._render = _timed_render(_original_render)
+        _instrumented_blocks += 1
+    try:
+        yield
+    finally:
+        with _instrument_lock:
+            _instrumented_blocks -= 1
+            if not _instrumented_blocks:
+                Template._render = _original_render
+                _original_render = None
+
+
+@contextmanager
+def profile_queries():
+    """
+    Profile the queries (on every database) and template renders of a block
+
+    Yields:
+        RequestProfile
+    """
+    profile = RequestProfile()
+    token = _active_profile.set(profile)
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(instrument_templates())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            yield profile
+    finally:
+        profile.finished = time.perf_counter()
+        _active_profile.reset(token)
+
+
+def query_budget(budget):
+    """Declare the most queries a view may run; checked by QueryBudgetTestMixin and logged by the profiler"""
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin failing a test when a block runs more queries than allowed"""
+
+    def format_profile(self, profile):
+        lines = [f'{profile.query_count} queries ({profile.duplicate_count()} duplicates)']
+        lines += [f'  {count}x {shape}' for shape, count in profile.similar_queries(threshold=2)]
+        return '\n'.join(lines)
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        with profile_queries() as profile:
+            yield profile
+        if profile.query_count > budget:
+            self.fail(f'Query budget of {budget} exceeded: {self.format_profile(profile)}')
+
+    def assertWithinQueryBudget(self, url, **kwargs):
+        """GET url with the test client and check the view against its declared @query_budget"""
+        with profile_queries() as profile:
+            response = self.client.get(url, **kwargs)
+        budget = getattr(response.resolver_match.func, 'query_budget', None)
+        if budget is None:
+            self.fail(f'{response.resolver_match.view_name} declares no query budget')
+        if profile.query_count > budget:
+            self.fail(
+                f'{response.resolver_match.view_name} exceeded its query budget of {budget}: '
+                f'{self.format_profile(profile)}'
+            )
+        return response
@@ -0,0 +1,128 @@
+import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .email_utils import build_deadline_reminder_email, build_interview_reminder_email
+from .models import InterviewRound, JobApplication, OutboundEmail, ReminderLog
+from .pagination_utils import keyset_batches
+
+
+INTERVIEW = 'INTERVIEW'
+DEADLINE = 'DEADLINE'
+
+# Deadline reminders are for applications that haven't been sent yet
+DEADLINE_REMINDER_STATUS = 'DRAFT'
+
+REMINDER_BATCH_SIZE = 1000
+
+
+def interview_lead():
+    return timedelta(hours=getattr(settings, 'REMINDER_INTERVIEW_LEAD_HOURS', 24))
+
+
+def deadline_lead_days():
+    return getattr(settings, 'REMINDER_DEADLINE_LEAD_DAYS', 3)
+
+
+def deadline_due_at(deadline):
+    """Start of the deadline day, the due_at a deadline reminder is logged with"""
+    return timezone.make_aware(datetime.datetime.combine(deadline, datetime.time.min))
+
+
+def due_interviews(now=None, lead=None):
+    """
+    Scheduled interviews starting within lead that have no reminder yet
+
+    The range is served by the partial index on scheduled interviews. A
+    rescheduled interview has a new date, so it gets a new reminder.
+    """
+    now = now or timezone.now()
+    lead = interview_lead() if lead is None else lead
+    already_sent = ReminderLog.objects.filter(
+        kind=INTERVIEW, object_id=OuterRef('pk'), due_at=OuterRef('scheduled_date')
+    )
+    return InterviewRound.objects.filter(
+        status='SCHEDULED', scheduled_date__gte=now, scheduled_date__lt=now + lead
+    ).exclude(Exists(already_sent)).select_related('application__user', 'application__position__company')
+
+
+def due_deadlines(today=None, lead_days=None):
+    """Draft applications whose deadline is within lead_days that have no reminder yet"""
+    today = today or timezone.localdate()
+    lead_days = deadline_lead_days() if lead_days is None else lead_days
+    already_sent = ReminderLog.objects.filter(
+        kind=DEADLINE, object_id=OuterRef('pk'), due_at__date=OuterRef('deadline')
+    )
+    return JobApplication.objects.filter(
+        status=DEADLINE_REMINDER_STATUS, deadline__gte=today, deadline__lte=today + timedelta(days=lead_days)
+    ).exclude(Exists(already_sent)).select_related('user', 'position__company')
+
+
+def queue_reminders(kind, objects):
+    """
+    Queue reminder emails for a batch and log them, in one transaction
+
+    Users without an email address are logged too, so they are not looked
+    at again. If another scheduler already logged one of the reminders the
+    whole batch is rolled back and left to it.
+
+    Args:
+        kind: INTERVIEW or DEADLINE
+        objects: InterviewRound or JobApplication instances
+
+    Returns:
+        int: Number of emails queued
+    """
+    emails = []
+    logs = []
+    for obj in objects:
+        if kind == INTERVIEW:
+            application, due_at = obj.application, obj.scheduled_date
+            email = build_interview_reminder_email(obj)
+        else:
+            application, due_at = obj, deadline_due_at(obj.deadline)
+            email = build_deadline_reminder_email(obj)
+        logs.append(ReminderLog(kind=kind, object_id=obj.pk, due_at=due_at, user_id=application.user_id))
+        if email is not None:
+            emails.append(OutboundEmail(
+                user_id=application.user_id,
+                application=application,
+                from_email=email.from_email,
+                to=email.to,
+                subject=email.subject,
+                body=email.body,
+            ))
+
+    try:
+        with transaction.atomic():
+            ReminderLog.objects.bulk_create(logs)
+            OutboundEmail.objects.bulk_create(emails)
+    except IntegrityError:
+        return 0
+    return len(emails)
+
+
+def queue_due_reminders(now=None, batch_size=REMINDER_BATCH_SIZE, interview_lead_time=None, deadline_days=None):
+    """
+    Queue every due interview and deadline reminder
+
+    Due rows are walked in keyset batches of batch_size, so memory stays
+    flat however many reminders are due. The emails are delivered by the
+    send_queued_emails worker.
+
+    Returns:
+        dict: Number of emails queued per kind
+    """
+    now = now or timezone.now()
+    counts = {INTERVIEW: 0, DEADLINE: 0}
+    for kind, queryset, ordering in (
+        (INTERVIEW, due_interviews(now, interview_lead_time), ['scheduled_date', 'id']),
+        (DEADLINE, due_deadlines(timezone.localdate(now), deadline_days), ['deadline', 'id']),
+    ):
+        for batch in keyset_batches(queryset, ordering, batch_size):
+            counts[kind] += queue_reminders(kind, batch)
+    return counts
@@ -0,0 +1,336 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import ApplicationNote, Company, JobApplication
+
+
+SEARCH_TABLE = 'jobs_search_index'
+
+# Kinds of indexed objects. The row id of an index entry is
+# object_id * KIND_COUNT + kind, so entries can be replaced or removed by
+# primary key without a secondary index.
+KIND_APPLICATION = 1
+KIND_NOTE = 2
+KIND_COMPANY = 3
+KIND_COUNT = 4
+
+SearchDocument = namedtuple('SearchDocument', ['kind', 'object_id', 'user_id', 'application_id', 'body'])
+
+
+def _row_id(kind, object_id):
+    return object_id * KIND_COUNT + kind
+
+
+def _tokens(query):
+    return re.findall(r'\w+', query or '')
+
+
+def _join(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+class SQLiteSearchBackend:
+    """Search backend using an SQLite FTS5 virtual table, ranked with bm25"""
+
+    def _where(self, tokens, kinds, user_id):
+        # Quoted prefix terms, implicitly AND-ed together
+        match = ' '.join('"{}"*'.format(token) for token in tokens)
+        where = ['{} MATCH %s'.format(SEARCH_TABLE), 'kind IN ({})'.format(', '.join(str(kind) for kind in kinds))]
+        params = [match]
+        if user_id is not None:
+            where.append('user_id = %s')
+            params.append(user_id)
+        return ' AND '.join(where), params
+
+    def search(self, query, kinds, group_by='object_id', user_id=None, limit=None):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        where, params = self._where(tokens, kinds, user_id)
+        params.append(limit or -1)
+        sql = (
+            'SELECT {group}, MIN(rank) AS best FROM ('
+            'SELECT {group}, rank FROM {table} WHERE {where}'
+            ') GROUP BY {group} ORDER BY best LIMIT %s'
+        ).format(group=group_by, table=SEARCH_TABLE, where=where)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, query, kinds, group_by='object_id', user_id=None):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        where, params = self._where(tokens, kinds, user_id)
+        return RawSQL('SELECT {} FROM {} WHERE {}'.format(group_by, SEARCH_TABLE, where), params)
+
+    def index(self, documents):
+        rows = [
+            (_row_id(doc.kind, doc.object_id), doc.body, doc.kind, doc.object_id, doc.user_id, doc.application_id)
+            for doc in documents
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT OR REPLACE INTO {} (rowid, body, kind, object_id, user_id, application_id) '
+                'VALUES (%s, %s, %s, %s, %s, %s)'.format(SEARCH_TABLE),
+                rows
+            )
+
+    def remove(self, kind, object_ids):
+        if not object_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'DELETE FROM {} WHERE rowid = %s'.format(SEARCH_TABLE),
+                [(_row_id(kind, object_id),) for object_id in object_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {}'.format(SEARCH_TABLE))
+
+
+class PostgresSearchBackend:
+    """Search backend using a tsvector column with a GIN index, ranked with ts_rank"""
+
+    def _where(self, tsquery, kinds, user_id):
+        where = ["document @@ to_tsquery('simple', %s)", 'kind = ANY(%s)']
+        params = [tsquery, list(kinds)]
+        if user_id is not None:
+            where.append('user_id = %s')
+            params.append(user_id)
+        return ' AND '.join(where), params
+
+    def _tsquery(self, query):
+        # Prefix terms, AND-ed together
+        return ' & '.join('{}:*'.format(token) for token in _tokens(query))
+
+    def search(self, query, kinds, group_by='object_id', user_id=None, limit=None):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return []
+        where, params = self._where(tsquery, kinds, user_id)
+        params.insert(0, tsquery)
+        sql = (
+            "SELECT {group}, MAX(ts_rank(document, to_tsquery('simple', %s))) AS best "
+            'FROM {table} WHERE {where} GROUP BY {group} ORDER BY best DESC'
+        ).format(group=group_by, table=SEARCH_TABLE, where=where)
+        if limit:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, query, kinds, group_by='object_id', user_id=None):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return []
+        where, params = self._where(tsquery, kinds, user_id)
+        return RawSQL('SELECT {} FROM {} WHERE {}'.format(group_by, SEARCH_TABLE, where), params)
+
+    def index(self, documents):
+        rows = [
+            (_row_id(doc.kind, doc.object_id), doc.body, doc.kind, doc.object_id, doc.user_id, doc.application_id)
+            for doc in documents
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO {} (id, body, kind, object_id, user_id, application_id) '
+                'VALUES (%s, %s, %s, %s, %s, %s) '
+                'ON CONFLICT (id) DO UPDATE SET body = EXCLUDED.body, user_id = EXCLUDED.user_id, '
+                'application_id = EXCLUDED.application_id'.format(SEARCH_TABLE),
+                rows
+            )
+
+    def remove(self, kind, object_ids):
+        if not object_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {} WHERE id = ANY(%s)'.format(SEARCH_TABLE),
+                [[_row_id(kind, object_id) for object_id in object_ids]]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('TRUNCATE {}'.format(SEARCH_TABLE))
+
+
+class FallbackSearchBackend:
+    """
+    Unranked icontains search for database engines without a full-text index
+
+    There is nothing to keep in sync, so indexing is a no-op.
+    """
+
+    def search(self, query, kinds, group_by='object_id', user_id=None, limit=None):
+        if not query:
+            return []
+        results = self.matches(query, kinds, group_by, user_id)
+        return list(results[:limit] if limit else results)
+
+    def matches(self, query, kinds, group_by='object_id', user_id=None):
+        if not query:
+            return []
+        if KIND_COMPANY in kinds:
+            results = Company.objects.filter(
+                Q(name__icontains=query) | Q(industry__icontains=query) | Q(location__icontains=query)
+            )
+        else:
+            results = JobApplication.objects.filter(
+                Q(position__title__icontains=query) |
+                Q(position__company__name__icontains=query) |
+                Q(notes__icontains=query) |
+                Q(application_notes__note__icontains=query)
+            ).distinct()
+            if user_id is not None:
+                results = results.filter(user_id=user_id)
+        return results.order_by().values_list('pk', flat=True)
+
+    def index(self, documents):
+        pass
+
+    def remove(self, kind, object_ids):
+        pass
+
+    def clear(self):
+        pass
+
+
+def get_search_backend():
+    """Return the search backend matching the default database engine"""
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
+
+
+def _search_limit():
+    return getattr(settings, 'SEARCH_RESULT_LIMIT', 1000)
+
+
+def search_applications(user, query, limit=None):
+    """
+    Full-text search over a user's applications and their notes
+
+    Matches the position title, company name, application notes and
+    timestamped notes. Every search term is matched as a prefix.
+
+    Args:
+        user: Owner of the applications
+        query: Search text
+        limit: Maximum number of results (default: SEARCH_RESULT_LIMIT)
+
+    Returns:
+        list: Application ids, best match first
+    """
+    return get_search_backend().search(
+        query, [KIND_APPLICATION, KIND_NOTE], group_by='application_id',
+        user_id=user.pk, limit=limit or _search_limit()
+    )
+
+
+def matching_applications(user, query):
+    """
+    Every one of the user's applications matching query, for filtering with pk__in
+
+    Unlike search_applications, nothing is ranked or capped: a list
+    ordered some other way needs all the matches, and the subquery keeps
+    them in the database instead of passing their ids through Python.
+
+    Returns:
+        Subquery of application ids (or an empty list for an empty query)
+    """
+    return get_search_backend().matches(
+        query, [KIND_APPLICATION, KIND_NOTE], group_by='application_id', user_id=user.pk
+    )
+
+
+def matching_companies(query):
+    """Every company matching query, unranked and uncapped, for filtering with pk__in"""
+    return get_search_backend().matches(query, [KIND_COMPANY])
+
+
+def search_companies(query, limit=None):
+    """
+    Full-text search over company names, industries and locations
+
+    Returns:
+        list: Company ids, best match first
+    """
+    return get_search_backend().search(query, [KIND_COMPANY], limit=limit or _search_limit())
+
+
+def index_applications(application_ids):
+    """(Re)index applications by id"""
+    rows = JobApplication.objects.filter(pk__in=application_ids).values_list(
+        'pk', 'user_id', 'position__title', 'position__company__name', 'notes'
+    )
+    get_search_backend().index([
+        SearchDocument(KIND_APPLICATION, pk, user_id, pk, _join(title, company_name, notes))
+        for pk, user_id, title, company_name, notes in rows
+    ])
+
+
+def index_notes(note_ids):
+    """(Re)index application notes by id"""
+    rows = ApplicationNote.objects.filter(pk__in=note_ids).values_list(
+        'pk', 'application__user_id', 'application_id', 'note'
+    )
+    get_search_backend().index([
+        SearchDocument(KIND_NOTE, pk, user_id, application_id, note)
+        for pk, user_id, application_id, note in rows
+    ])
+
+
+def index_companies(company_ids):
+    """(Re)index companies by id"""
+    rows = Company.objects.filter(pk__in=company_ids).values_list('pk', 'name', 'industry', 'location')
+    get_search_backend().index([
+        SearchDocument(KIND_COMPANY, pk, None, None, _join(name, industry, location))
+        for pk, name, industry, location in rows
+    ])
+
+
+def remove_from_index(kind, object_ids):
+    """Remove index entries of the given kind"""
+    get_search_backend().remove(kind, object_ids)
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Rebuild the whole search index
+
+    Returns:
+        dict: Number of indexed objects per kind
+    """
+    get_search_backend().clear()
+    counts = {}
+    for name, model, indexer in (
+        ('applications', JobApplication, index_applications),
+        ('notes', ApplicationNote, index_notes),
+        ('companies', Company, index_companies),
+    ):
+        counts[name] = 0
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                indexer(batch)
+                counts[name] += len(batch)
+                batch = []
+        if batch:
+            indexer(batch)
+            counts[name] += len(batch)
+    return counts
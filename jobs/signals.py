@@ -0,0 +1,202 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete_utils import invalidate_autocomplete
+from .counter_utils import (adjust_company_applications, record_child_added, record_child_changed,
+                            record_child_deleted, refresh_company_counts)
+from .dashboard_utils import invalidate_dashboard
+from .fragment_utils import APPLICATION, INTERVIEWS, NOTES, bump_fragment_version
+from .models import ApplicationNote, Company, InterviewRound, JobApplication, JobPosition
+from .search_utils import (KIND_APPLICATION, KIND_COMPANY, KIND_NOTE, index_applications,
+                           index_companies, index_notes, remove_from_index)
+from .stats_utils import invalidate_snapshots_of, record_application_deleted, record_application_saved
+
+
+def _deleted_by(origin):
+    """Model whose delete() removed the instance: origin is an instance or a queryset"""
+    return getattr(origin, 'model', type(origin))
+
+
+# Connected before the statistics receiver, which replaces _loaded_values
+@receiver(post_save, sender=JobApplication)
+def count_application_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the application_count of the companies the application moved between"""
+    if raw:
+        return
+    if created:
+        adjust_company_applications(instance.position_id, 1)
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    previous_position_id = loaded.get('position_id', DEFERRED)
+    if previous_position_id is DEFERRED:
+        # The previous position is unknown, recount the current company
+        refresh_company_counts(JobPosition.objects.filter(pk=instance.position_id).values('company_id'))
+    elif previous_position_id != instance.position_id:
+        adjust_company_applications(previous_position_id, -1)
+        adjust_company_applications(instance.position_id, 1)
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_application_delete(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted application, unless its company is being deleted too"""
+    if _deleted_by(origin) is not Company:
+        adjust_company_applications(instance.position_id, -1)
+
+
+@receiver(post_save, sender=InterviewRound)
+@receiver(post_save, sender=ApplicationNote)
+def count_child_save(sender, instance, created, raw=False, **kwargs):
+    """Count new interview rounds and notes, and mark the application's activity"""
+    if raw:
+        return
+    if created:
+        record_child_added(instance)
+    else:
+        record_child_changed(instance)
+
+
+@receiver(post_delete, sender=InterviewRound)
+@receiver(post_delete, sender=ApplicationNote)
+def count_child_delete(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted interview round or note, unless its application went with it"""
+    if _deleted_by(origin) is sender:
+        record_child_deleted(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_stats_on_application_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the owner's statistics snapshot in step with the saved application"""
+    if raw:
+        return
+    record_application_saved(instance, created)
+
+
+@receiver(post_delete, sender=JobApplication)
+def update_stats_on_application_delete(sender, instance, **kwargs):
+    """Remove a deleted application from the owner's statistics snapshot"""
+    record_application_deleted(instance)
+
+
+def _changed(instance, attname):
+    """Whether a saved instance's attname differs from the loaded value; unknown counts as changed"""
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    previous = loaded.get(attname, DEFERRED)
+    instance._loaded_values = {**loaded, attname: getattr(instance, attname)}
+    return previous is DEFERRED or previous != getattr(instance, attname)
+
+
+@receiver(post_save, sender=Company)
+def update_stats_on_industry_change(sender, instance, created, raw=False, **kwargs):
+    """Snapshots tally industries, so drop those of users who applied to the company"""
+    if not raw and not created and _changed(instance, 'industry'):
+        invalidate_snapshots_of(JobApplication.objects.filter(position__company=instance))
+
+
+@receiver(post_save, sender=JobPosition)
+def update_stats_on_position_move(sender, instance, created, raw=False, **kwargs):
+    """A position moved to another company changes the company and industry of its applications"""
+    if not raw and not created and _changed(instance, 'company_id'):
+        invalidate_snapshots_of(JobApplication.objects.filter(position=instance))
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_dashboard_on_application_change(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when an application changes"""
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=InterviewRound)
+@receiver(post_delete, sender=InterviewRound)
+def invalidate_dashboard_on_interview_change(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when an interview round changes"""
+    if InterviewRound.application.is_cached(instance):
+        user_id = instance.application.user_id
+    else:
+        user_id = JobApplication.objects.filter(pk=instance.application_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_dashboard(user_id)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def bump_application_fragments(sender, instance, **kwargs):
+    """Retire the cached detail page fragments showing the application"""
+    bump_fragment_version(APPLICATION, instance.pk)
+
+
+@receiver(post_save, sender=InterviewRound)
+@receiver(post_delete, sender=InterviewRound)
+def bump_interview_fragments(sender, instance, **kwargs):
+    """Retire the cached interview timeline of the round's application"""
+    bump_fragment_version(INTERVIEWS, instance.application_id)
+
+
+@receiver(post_save, sender=ApplicationNote)
+@receiver(post_delete, sender=ApplicationNote)
+def bump_note_fragments(sender, instance, **kwargs):
+    """Retire the cached notes of the note's application"""
+    bump_fragment_version(NOTES, instance.application_id)
+
+
+@receiver(post_save, sender=JobApplication)
+def index_application(sender, instance, raw=False, **kwargs):
+    """Keep the search index entry of an application up to date"""
+    if not raw:
+        index_applications([instance.pk])
+
+
+@receiver(post_delete, sender=JobApplication)
+def unindex_application(sender, instance, **kwargs):
+    remove_from_index(KIND_APPLICATION, [instance.pk])
+
+
+@receiver(post_save, sender=ApplicationNote)
+def index_note(sender, instance, raw=False, **kwargs):
+    """Keep the search index entry of an application note up to date"""
+    if not raw:
+        index_notes([instance.pk])
+
+
+@receiver(post_delete, sender=ApplicationNote)
+def unindex_note(sender, instance, **kwargs):
+    remove_from_index(KIND_NOTE, [instance.pk])
+
+
+@receiver(post_save, sender=JobPosition)
+def reindex_position_applications(sender, instance, created, raw=False, **kwargs):
+    """Position titles are part of the application entries"""
+    if not raw and not created:
+        index_applications(instance.applications.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Company)
+def index_company(sender, instance, created, raw=False, **kwargs):
+    """Keep the company entry, and the entries of its applications, up to date"""
+    if raw:
+        return
+    index_companies([instance.pk])
+    if not created:
+        index_applications(
+            JobApplication.objects.filter(position__company=instance).values_list('pk', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Company)
+def unindex_company(sender, instance, **kwargs):
+    remove_from_index(KIND_COMPANY, [instance.pk])
+
+
+@receiver(post_save, sender=JobPosition)
+@receiver(post_delete, sender=JobPosition)
+def invalidate_position_autocomplete(sender, instance, **kwargs):
+    """New and renamed positions show up in autocomplete at once"""
+    invalidate_autocomplete('positions')
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_autocomplete(sender, instance, **kwargs):
+    """Position results carry the company name too"""
+    invalidate_autocomplete('companies', 'positions')
@@ -0,0 +1,425 @@
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import DEFERRED, Count, FilteredRelation, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import ApplicationStatsSnapshot, Company, JobApplication, JobPosition
+
+
+INTERVIEW_STATUSES = ['PHONE_SCREEN', 'TECHNICAL_INTERVIEW', 'ONSITE_INTERVIEW', 'FINAL_INTERVIEW']
+OFFER_STATUSES = ['OFFER_RECEIVED', 'ACCEPTED']
+PENDING_STATUSES = ['DRAFT', 'APPLIED']
+# Applications still in progress: not accepted, rejected or withdrawn
+ACTIVE_STATUSES = PENDING_STATUSES + INTERVIEW_STATUSES + ['OFFER_RECEIVED']
+
+TOP_LIMIT = 5
+TIMELINE_MONTHS = 6
+RECENT_LIMIT = 6
+
+# Number of queries get_application_statistics() issues once the user's
+# snapshot exists, whatever the data size
+STATISTICS_QUERY_BUDGET = 3
+
+# Snapshot key used for companies without an industry (JSON keys can't be null)
+NO_INDUSTRY = ''
+
+SNAPSHOT_FIELDS = ['total', 'status_counts', 'monthly_counts', 'industry_counts', 'company_counts']
+
+
+def _rate(count, total):
+    return round((count / total * 100) if total > 0 else 0, 1)
+
+
+def month_key(value):
+    """Snapshot key ('YYYY-MM') of the month a datetime falls in"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.strftime('%Y-%m')
+
+
+def _recent_months(now):
+    """First day of each of the last TIMELINE_MONTHS months, oldest first"""
+    months = []
+    for offset in range(TIMELINE_MONTHS - 1, -1, -1):
+        month_index = now.year * 12 + now.month - 1 - offset
+        months.append(datetime(month_index // 12, month_index % 12 + 1, 1))
+    return months
+
+
+def _adjust(counts, key, delta):
+    key = str(key)
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def _position_info(position_id, application=None):
+    """Return (company_id, industry) for a position, reusing cached objects when possible"""
+    if (application is not None and JobApplication.position.is_cached(application)
+            and application.position.pk == position_id
+            and JobPosition.company.is_cached(application.position)):
+        company = application.position.company
+        return company.pk, company.industry
+    return JobPosition.objects.filter(pk=position_id).values_list(
+        'company_id', 'company__industry'
+    ).first() or (None, None)
+
+
+def _apply_changes(user_id, changes):
+    """
+    Apply count adjustments to a user's snapshot
+
+    Snapshots are created lazily on first read, so users without one are
+    skipped: their snapshot will be built from the current rows anyway.
+
+    Args:
+        user_id: Owner of the snapshot
+        changes: List of (field name, key, delta) tuples
+    """
+    with transaction.atomic():
+        snapshot = ApplicationStatsSnapshot.objects.select_for_update().filter(user_id=user_id).first()
+        if snapshot is None:
+            return
+        for field, key, delta in changes:
+            if field == 'total':
+                snapshot.total = max(snapshot.total + delta, 0)
+            else:
+                _adjust(getattr(snapshot, field), key, delta)
+        snapshot.save()
+
+
+def _application_changes(application, values, delta):
+    company_id, industry = _position_info(values['position_id'], application)
+    return [
+        ('total', None, delta),
+        ('status_counts', values['status'], delta),
+        ('monthly_counts', month_key(values['created_at']), delta),
+        ('industry_counts', industry or NO_INDUSTRY, delta),
+        ('company_counts', company_id, delta),
+    ]
+
+
+def _tracked_values(application):
+    return {
+        'user_id': application.user_id,
+        'position_id': application.position_id,
+        'status': application.status,
+        'created_at': application.created_at,
+    }
+
+
+def record_application_saved(application, created):
+    """Bring the owner's snapshot in line with a saved application"""
+    current = _tracked_values(application)
+    loaded = getattr(application, '_loaded_values', None)
+    application._loaded_values = {
+        field.attname: getattr(application, field.attname)
+        for field in application._meta.concrete_fields
+    }
+
+    if created:
+        _apply_changes(application.user_id, _application_changes(application, current, 1))
+        return
+
+    if loaded is None or any(loaded.get(name, DEFERRED) is DEFERRED for name in current):
+        # We don't know what the row looked like before, so start over
+        invalidate_snapshot(application.user_id)
+        return
+
+    previous = {name: loaded[name] for name in current}
+    if previous == current:
+        return
+
+    if previous['user_id'] != current['user_id'] or previous['position_id'] != current['position_id']:
+        _apply_changes(previous['user_id'], _application_changes(None, previous, -1))
+        _apply_changes(current['user_id'], _application_changes(application, current, 1))
+    else:
+        # Status transition: only the status tally moves
+        _apply_changes(current['user_id'], [
+            ('status_counts', previous['status'], -1),
+            ('status_counts', current['status'], 1),
+        ])
+
+
+def record_application_deleted(application):
+    """Remove a deleted application from its owner's snapshot"""
+    loaded = getattr(application, '_loaded_values', None) or {}
+    values = {name: loaded.get(name, value) for name, value in _tracked_values(application).items()}
+    if any(value is DEFERRED for value in values.values()):
+        invalidate_snapshot(application.user_id)
+        return
+    _apply_changes(values['user_id'], _application_changes(None, values, -1))
+
+
+def invalidate_snapshot(user_id):
+    """Drop a user's snapshot so the next read rebuilds it"""
+    ApplicationStatsSnapshot.objects.filter(user_id=user_id).delete()
+
+
+def invalidate_snapshots_of(applications):
+    """
+    Drop the snapshots of the owners of these applications, e.g. after their company's industry changed
+
+    Snapshots tally industries and companies as they were when each
+    application was saved, so changes to those can't be applied as deltas.
+    """
+    ApplicationStatsSnapshot.objects.filter(
+        user_id__in=applications.order_by().values('user_id')
+    ).delete()
+
+
+def compute_snapshot_tallies(user_ids):
+    """
+    Compute snapshot tallies from JobApplication rows with grouped queries
+
+    Args:
+        user_ids: Users to compute tallies for
+
+    Returns:
+        dict: user id -> tallies dict (see ApplicationStatsSnapshot.tallies)
+    """
+    tallies = {
+        user_id: {
+            'total': 0,
+            'status_counts': {},
+            'monthly_counts': {},
+            'industry_counts': {},
+            'company_counts': {},
+        }
+        for user_id in user_ids
+    }
+    applications = JobApplication.objects.filter(user_id__in=user_ids).order_by()
+
+    for row in applications.values('user_id', 'status').annotate(count=Count('id')):
+        tallies[row['user_id']]['status_counts'][row['status']] = row['count']
+        tallies[row['user_id']]['total'] += row['count']
+
+    monthly_rows = applications.annotate(
+        month=TruncMonth('created_at')
+    ).values('user_id', 'month').annotate(count=Count('id'))
+    for row in monthly_rows:
+        tallies[row['user_id']]['monthly_counts'][month_key(row['month'])] = row['count']
+
+    for row in applications.values('user_id', 'position__company__industry').annotate(count=Count('id')):
+        industry = row['position__company__industry'] or NO_INDUSTRY
+        counts = tallies[row['user_id']]['industry_counts']
+        counts[industry] = counts.get(industry, 0) + row['count']
+
+    for row in applications.values('user_id', 'position__company_id').annotate(count=Count('id')):
+        tallies[row['user_id']]['company_counts'][str(row['position__company_id'])] = row['count']
+
+    return tallies
+
+
+def rebuild_snapshots(user_ids=None, batch_size=500, dry_run=False):
+    """
+    Recompute snapshots in bulk and report the ones that had drifted
+
+    Users are processed in batches of batch_size, four grouped queries per
+    batch, so memory stays bounded however many users there are.
+
+    Args:
+        user_ids: Restrict the rebuild to these users (default: all users)
+        batch_size: Number of users per batch
+        dry_run: Only report drift, don't write anything
+
+    Returns:
+        tuple: (number of snapshots created, list of user ids whose snapshot had drifted)
+    """
+    users = User.objects.order_by('pk')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+
+    created_count = 0
+    drifted = []
+    batch = []
+    for user_id in users.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            created, batch_drifted = _rebuild_batch(batch, dry_run)
+            created_count += created
+            drifted.extend(batch_drifted)
+            batch = []
+    if batch:
+        created, batch_drifted = _rebuild_batch(batch, dry_run)
+        created_count += created
+        drifted.extend(batch_drifted)
+    return created_count, drifted
+
+
+def _rebuild_batch(user_ids, dry_run):
+    expected = compute_snapshot_tallies(user_ids)
+
+    with transaction.atomic():
+        existing = {
+            snapshot.user_id: snapshot
+            for snapshot in ApplicationStatsSnapshot.objects.select_for_update().filter(user_id__in=user_ids)
+        }
+        drifted = []
+        for user_id, snapshot in existing.items():
+            if snapshot.tallies() != expected[user_id]:
+                drifted.append(snapshot)
+                for field in SNAPSHOT_FIELDS:
+                    setattr(snapshot, field, expected[user_id][field])
+
+        missing = [
+            ApplicationStatsSnapshot(user_id=user_id, **tallies)
+            for user_id, tallies in expected.items()
+            if user_id not in existing
+        ]
+        if not dry_run:
+            if drifted:
+                now = timezone.now()
+                for snapshot in drifted:
+                    snapshot.updated_at = now
+                ApplicationStatsSnapshot.objects.bulk_update(drifted, SNAPSHOT_FIELDS + ['updated_at'])
+            ApplicationStatsSnapshot.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing), [snapshot.user_id for snapshot in drifted]
+
+
+def get_snapshot(user):
+    """Return the user's statistics snapshot, building it on first use"""
+    snapshot = ApplicationStatsSnapshot.objects.filter(user=user).first()
+    if snapshot is None:
+        tallies = compute_snapshot_tallies([user.pk])[user.pk]
+        snapshot, _ = ApplicationStatsSnapshot.objects.get_or_create(user=user, defaults=tallies)
+    return snapshot
+
+
+def summarize_status_counts(status_counts):
+    """Derive the headline counters from a status -> count mapping"""
+    return {
+        'total_applications': sum(status_counts.get(code, 0) for code, _ in JobApplication.STATUS_CHOICES),
+        'pending_applications': sum(status_counts.get(code, 0) for code in PENDING_STATUSES),
+        'interview_count': sum(status_counts.get(code, 0) for code in INTERVIEW_STATUSES),
+        'offer_count': sum(status_counts.get(code, 0) for code in OFFER_STATUSES),
+        'rejection_count': status_counts.get('REJECTED', 0),
+    }
+
+
+def build_statistics(status_counts, applications_this_month, top_industries,
+                     top_companies, monthly_counts, recent_applications):
+    """
+    Turn raw tallies into the context used by the statistics page
+
+    Args:
+        status_counts: dict of status code -> count
+        applications_this_month: Number of applications created this month
+        top_industries: List of (industry, count) tuples
+        top_companies: List of (Company, count) tuples
+        monthly_counts: List of (month datetime, count) tuples, oldest first
+        recent_applications: Iterable of recent JobApplication instances
+
+    Returns:
+        dict: Template context
+    """
+    summary = summarize_status_counts(status_counts)
+    total_applications = summary['total_applications']
+
+    status_stats = []
+    for status_code, status_name in JobApplication.STATUS_CHOICES:
+        status_count = status_counts.get(status_code, 0)
+        status_stats.append((status_code, status_count, _rate(status_count, total_applications)))
+
+    # Timeline bars are scaled against the busiest month
+    max_count = max([count for _, count in monthly_counts], default=0) or 1
+    timeline_data = [
+        {
+            'month': month.strftime('%b'),
+            'count': count,
+            'percentage': _rate(count, max_count),
+        }
+        for month, count in monthly_counts
+    ]
+
+    return {
+        **summary,
+        'status_stats': status_stats,
+        'applications_this_month': applications_this_month,
+        'response_rate': _rate(summary['interview_count'], total_applications),
+        'interview_rate': _rate(summary['interview_count'], total_applications),
+        'offer_rate': _rate(summary['offer_count'], total_applications),
+        'rejection_rate': _rate(summary['rejection_count'], total_applications),
+        'top_industries': top_industries,
+        'top_companies': top_companies,
+        'timeline_data': timeline_data,
+        'recent_applications': recent_applications,
+    }
+
+
+def annotate_company_counts(companies, user):
+    """
+    Annotate companies with the user's user_application_count, user_active_count and user_offer_count
+
+    The user's applications are joined on (user, position), which the
+    unique constraint on JobApplication indexes, so the counts come with
+    the list query instead of one query per company and don't scan other
+    users' applications. Don't order by these counts: no index holds them,
+    so every company would be aggregated before the page could be cut.
+    """
+    return companies.annotate(
+        user_applications=FilteredRelation(
+            'positions__applications', condition=Q(positions__applications__user=user)
+        ),
+    ).annotate(
+        user_application_count=Count('user_applications'),
+        user_active_count=Count('user_applications', filter=Q(user_applications__status__in=ACTIVE_STATUSES)),
+        user_offer_count=Count('user_applications', filter=Q(user_applications__status__in=OFFER_STATUSES)),
+    )
+
+
+def get_application_statistics(user):
+    """
+    Compute every figure shown on the statistics page for a user
+
+    All tallies come from the user's ApplicationStatsSnapshot, so the page
+    costs STATISTICS_QUERY_BUDGET queries no matter how many applications
+    the user has: the snapshot row, the top companies and the recent
+    applications.
+
+    Args:
+        user: User instance
+
+    Returns:
+        dict: Template context for jobs/statistics.html
+    """
+    snapshot = get_snapshot(user)
+    now = timezone.now()
+
+    top_industries = [
+        (industry or 'Not Specified', count)
+        for industry, count in sorted(
+            snapshot.industry_counts.items(), key=lambda item: (-item[1], item[0])
+        )[:TOP_LIMIT]
+    ]
+
+    top_company_counts = sorted(
+        snapshot.company_counts.items(), key=lambda item: (-item[1], item[0])
+    )[:TOP_LIMIT]
+    companies = Company.objects.in_bulk([int(company_id) for company_id, _ in top_company_counts])
+    top_companies = [
+        (companies[int(company_id)], count)
+        for company_id, count in top_company_counts
+        if int(company_id) in companies
+    ]
+
+    monthly_counts = [
+        (month, snapshot.monthly_counts.get(month_key(month), 0))
+        for month in _recent_months(timezone.localtime(now))
+    ]
+
+    recent_applications = list(
+        JobApplication.objects.filter(user=user).select_related(
+            'position__company'
+        ).order_by('-created_at')[:RECENT_LIMIT]
+    )
+
+    return build_statistics(
+        snapshot.status_counts, snapshot.monthly_counts.get(month_key(now), 0),
+        top_industries, top_companies, monthly_counts, recent_applications
+    )
@@ -0,0 +1,54 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+
+DOCUMENT_HASH_DIR = 'documents/sha256'
+
+
+def file_sha256(file):
+    """SHA-256 hex digest of a Django File, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_path(sha256, filename):
+    """Storage path of a file with the given content hash, keeping the original extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{DOCUMENT_HASH_DIR}/{sha256[:2]}/{sha256}{extension}'
+
+
+def document_upload_to(instance, filename):
+    """upload_to of Document.file: files are stored under their content hash"""
+    return content_path(instance.sha256, filename)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage for content-addressed names
+
+    A name identifies its content, so saving a file whose name already
+    exists is a no-op: identical uploads share one file on disk. Files are
+    never renamed to avoid a clash, and two processes saving the same
+    content at once simply write the same bytes.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+_document_storage = ContentAddressedStorage()
+
+
+def get_document_storage():
+    """Storage of Document.file (a callable, so migrations don't serialize the instance)"""
+    return _document_storage
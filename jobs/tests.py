@@ -1,3 +1,1258 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from smtplib import SMTPException, SMTPServerDisconnected
+from unittest import mock
 
-# Create your tests here.
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.template.base import Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from interview_tracker.database import database_config
+
+from .bench_utils import benchmark_emails, benchmark_views, seed_dataset
+from .counter_utils import rebuild_counters
+from .dashboard_utils import get_dashboard_data
+from . import email_utils
+from .export_utils import stream_export
+from .forms import CompanyForm
+from .import_utils import import_applications, iter_csv_records, iter_json_records
+from .email_utils import (
+    EmailConnectionPool, attach_documents, claim_outbound_emails, deliver_outbound_email,
+    queue_application_email, queue_hr_application_email,
+)
+from .pagination_utils import CursorPaginator
+from .profiling_utils import QueryBudgetTestMixin, fingerprint, profile_queries
+from .models import (
+    ApplicationNote, ApplicationStatsSnapshot, Company, Document, DocumentUpload, InterviewRound, JobPosition, JobApplication, OutboundEmail,
+    ReminderLog, UserEmail,
+)
+from .reminder_utils import queue_due_reminders
+from .storage_utils import ContentAddressedStorage
+from .search_utils import rebuild_index, search_applications, search_companies
+from .stats_utils import STATISTICS_QUERY_BUDGET, get_application_statistics, get_snapshot, rebuild_snapshots
+
+
+def create_application(user, company_name='Acme', title='Engineer', industry='Technology', **kwargs):
+    company, _ = Company.objects.get_or_create(name=company_name, defaults={'industry': industry})
+    position = JobPosition.objects.create(company=company, title=title)
+    return JobApplication.objects.create(user=user, position=position, **kwargs)
+
+
+class StatisticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        statuses = ['APPLIED', 'APPLIED', 'PHONE_SCREEN', 'OFFER_RECEIVED', 'REJECTED', 'DRAFT']
+        for index, status in enumerate(statuses):
+            create_application(
+                self.user,
+                company_name='Acme' if index % 2 else 'Globex',
+                industry='Technology' if index % 2 else 'Finance',
+                title=f'Role {index}',
+                status=status,
+            )
+        other = User.objects.create_user('bob', password='secret')
+        create_application(other, company_name='Initech', title='Other role', status='APPLIED')
+
+    def test_status_breakdown_and_rates(self):
+        stats = get_application_statistics(self.user)
+        counts = {code: count for code, count, _ in stats['status_stats']}
+        self.assertEqual(stats['total_applications'], 6)
+        self.assertEqual(counts['APPLIED'], 2)
+        self.assertEqual(stats['interview_count'], 1)
+        self.assertEqual(stats['offer_rate'], 16.7)
+        self.assertEqual(stats['rejection_rate'], 16.7)
+        self.assertEqual(stats['applications_this_month'], 6)
+
+    def test_top_companies_are_company_objects(self):
+        stats = get_application_statistics(self.user)
+        companies = {company.name: count for company, count in stats['top_companies']}
+        self.assertEqual(companies, {'Acme': 3, 'Globex': 3})
+        self.assertIn(('Finance', 3), stats['top_industries'])
+
+    def test_query_budget_does_not_grow_with_data(self):
+        get_application_statistics(self.user)
+        for index in range(20):
+            create_application(self.user, company_name=f'Company {index}', title=f'Extra {index}')
+        with self.assertNumQueries(STATISTICS_QUERY_BUDGET):
+            get_application_statistics(self.user)
+
+    def test_statistics_view_renders(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_applications'], 6)
+
+
+class StatsSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('carol', password='secret')
+        self.application = create_application(self.user, status='DRAFT')
+        get_snapshot(self.user)
+
+    def assertNoDrift(self):
+        self.assertEqual(rebuild_snapshots(dry_run=True), (0, []))
+
+    def test_incremental_updates_match_rebuild(self):
+        create_application(self.user, company_name='Globex', industry='Finance', title='Analyst')
+        self.application.mark_as_sent()
+        other = create_application(self.user, company_name='Initech', title='Tester')
+        other.delete()
+
+        snapshot = ApplicationStatsSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.total, 2)
+        self.assertEqual(snapshot.status_counts, {'APPLIED': 1, 'DRAFT': 1})
+        self.assertEqual(snapshot.industry_counts, {'Technology': 1, 'Finance': 1})
+        self.assertNoDrift()
+
+    def test_position_change_moves_company_tally(self):
+        application = JobApplication.objects.get(pk=self.application.pk)
+        new_company = Company.objects.create(name='Hooli', industry='Technology')
+        application.position = JobPosition.objects.create(company=new_company, title='Engineer')
+        application.save()
+        snapshot = ApplicationStatsSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.company_counts, {str(new_company.pk): 1})
+        self.assertNoDrift()
+
+    def test_company_industry_and_position_moves_refresh_tallies(self):
+        company = Company.objects.get(pk=self.application.position.company_id)
+        company.location = 'Berlin'
+        company.save()
+        self.assertTrue(ApplicationStatsSnapshot.objects.filter(user=self.user).exists())
+
+        company.industry = 'Finance'
+        company.save()
+        self.assertEqual(get_snapshot(self.user).industry_counts, {'Finance': 1})
+        self.assertNoDrift()
+
+        hooli = Company.objects.create(name='Hooli', industry='Technology')
+        position = JobPosition.objects.get(pk=self.application.position_id)
+        position.company = hooli
+        position.save()
+        snapshot = get_snapshot(self.user)
+        self.assertEqual((snapshot.industry_counts, snapshot.company_counts), ({'Technology': 1}, {str(hooli.pk): 1}))
+        self.assertNoDrift()
+
+    def test_check_command_reports_and_repairs_drift(self):
+        JobApplication.objects.filter(pk=self.application.pk).update(status='REJECTED')
+        with self.assertRaises(CommandError):
+            call_command('rebuild_stats_snapshots', '--check', stdout=StringIO())
+        call_command('rebuild_stats_snapshots', stdout=StringIO())
+        self.assertEqual(get_snapshot(self.user).status_counts, {'REJECTED': 1})
+        call_command('rebuild_stats_snapshots', '--check', stdout=StringIO())
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('dave', password='secret')
+        for index in range(3):
+            application = create_application(self.user, company_name=f'Company {index}', title=f'Role {index}', status='APPLIED')
+        self.application = application
+
+    def test_dashboard_is_cached_until_data_changes(self):
+        data = get_dashboard_data(self.user)
+        self.assertEqual(data['total_applications'], 3)
+        with self.assertNumQueries(0):
+            data = get_dashboard_data(self.user)
+            [application.position.company.name for application in data['recent_applications']]
+
+        InterviewRound.objects.create(
+            application=self.application, round_number=1, interview_type='PHONE',
+            scheduled_date=timezone.now() + timedelta(days=1)
+        )
+        data = get_dashboard_data(self.user)
+        self.assertEqual(len(data['upcoming_interviews']), 1)
+        with self.assertNumQueries(0):
+            data['upcoming_interviews'][0].application.position.company.name
+
+    def test_home_renders_dashboard(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Company 1')
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('erin', password='secret')
+        self.backend_app = create_application(self.user, company_name='Globex', title='Backend Developer')
+        self.data_app = create_application(self.user, company_name='Initech', title='Data Analyst', notes='Remote friendly')
+        other = User.objects.create_user('frank', password='secret')
+        create_application(other, company_name='Globex Labs', title='Backend Engineer')
+
+    def test_prefix_search_is_scoped_to_user(self):
+        self.assertEqual(search_applications(self.user, 'back dev'), [self.backend_app.pk])
+        self.assertEqual(search_applications(self.user, 'glob'), [self.backend_app.pk])
+        self.assertEqual(search_applications(self.user, 'remote'), [self.data_app.pk])
+
+    def test_index_follows_notes_and_company_changes(self):
+        note = ApplicationNote.objects.create(application=self.data_app, note='Recruiter mentioned kubernetes')
+        self.assertEqual(search_applications(self.user, 'kubern'), [self.data_app.pk])
+        note.delete()
+        self.assertEqual(search_applications(self.user, 'kubern'), [])
+
+        company = self.backend_app.position.company
+        company.name = 'Umbrella'
+        company.save()
+        self.assertEqual(search_applications(self.user, 'umbrel'), [self.backend_app.pk])
+        self.assertEqual(search_companies('umbrel'), [company.pk])
+
+    def test_rebuild_index(self):
+        counts = rebuild_index(batch_size=2)
+        self.assertEqual(counts, {'applications': 3, 'notes': 0, 'companies': 3})
+        self.assertEqual(search_applications(self.user, 'analyst'), [self.data_app.pk])
+
+    def test_application_list_search(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:application_list'), {'search': 'analy'})
+        self.assertEqual(list(response.context['page_obj']), [self.data_app])
+
+    @override_settings(SEARCH_RESULT_LIMIT=1)
+    def test_list_searches_are_not_capped(self):
+        architect_app = create_application(self.user, company_name='Globex', title='Backend Architect')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:application_list'), {'search': 'back'})
+        self.assertEqual(list(response.context['page_obj']), [architect_app, self.backend_app])
+        response = self.client.get(reverse('jobs:company_list'), {'search': 'glob'})
+        self.assertEqual([company.name for company in response.context['page_obj']], ['Globex', 'Globex Labs'])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('grace', password='secret')
+        for index in range(25):
+            create_application(self.user, company_name=f'Company {index:02}', title=f'Role {index}')
+        # Ties on created_at must be broken by id
+        JobApplication.objects.filter(pk__in=JobApplication.objects.order_by('pk').values('pk')[5:15]).update(
+            created_at=timezone.now()
+        )
+        self.expected = list(JobApplication.objects.order_by('-created_at', '-id'))
+
+    def test_walk_forward_and_back(self):
+        paginator = CursorPaginator(JobApplication.objects.all(), ['-created_at', '-id'], 10)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([application for page in pages for application in page], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        previous = paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), list(pages[-2]))
+        self.assertEqual(paginator.get_page('tampered').object_list, pages[0].object_list)
+
+    def test_application_list_keeps_filters(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:application_list'), {'status': 'DRAFT'})
+        page = response.context['page_obj']
+        self.assertEqual(page.approximate_count, 25)
+        self.assertIn('status=DRAFT', page.next_querystring)
+
+        response = self.client.get(reverse('jobs:application_list') + '?' + page.next_querystring)
+        self.assertEqual(list(response.context['page_obj']), self.expected[10:20])
+
+    def test_company_and_document_lists_render(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:company_list'), {'industry': 'Technology'})
+        self.assertEqual(len(response.context['page_obj']), 12)
+        self.assertTrue(response.context['page_obj'].has_next)
+        response = self.client.get(reverse('jobs:document_list'))
+        self.assertEqual(response.status_code, 200)
+
+
+class OutboundEmailQueueTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        self.user = User.objects.create_user('heidi', password='secret')
+        resume = Document.objects.create(
+            user=self.user, name='CV', document_type='RESUME',
+            file=SimpleUploadedFile('cv.pdf', b'%PDF-1.4 resume')
+        )
+        self.application = create_application(self.user, status='DRAFT', resume=resume)
+
+    def queue(self):
+        return queue_application_email(self.application, 'Hello', 'Body', 'hr@example.com', cc_email='me@example.com')
+
+    def test_worker_sends_and_marks_application_sent(self):
+        outbound = self.queue()
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.email_sent)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_queued_emails', '--concurrency', '1', stdout=StringIO())
+        outbound.refresh_from_db()
+        self.application.refresh_from_db()
+        self.assertEqual(outbound.status, 'SENT')
+        self.assertEqual(mail.outbox[0].to, ['hr@example.com'])
+        self.assertEqual(mail.outbox[0].cc, ['me@example.com'])
+        self.assertEqual(len(mail.outbox[0].attachments), 1)
+        self.assertTrue(self.application.email_sent)
+        self.assertEqual(self.application.status, 'APPLIED')
+
+    def test_worker_keeps_edits_made_while_queued(self):
+        self.queue()
+        [claimed] = claim_outbound_emails(10)
+        JobApplication.objects.filter(pk=self.application.pk).update(status='PHONE_SCREEN', hr_name='Sam')
+        self.assertTrue(deliver_outbound_email(claimed))
+        self.application.refresh_from_db()
+        self.assertEqual(
+            (self.application.email_sent, self.application.status, self.application.hr_name),
+            (True, 'PHONE_SCREEN', 'Sam'),
+        )
+
+    def test_bookkeeping_errors_after_sending_dont_stop_the_worker(self):
+        outbound = self.queue()
+        with mock.patch.object(JobApplication, 'mark_as_sent', side_effect=DatabaseError('locked')), \
+                self.assertLogs('jobs.email_utils', 'ERROR'):
+            [claimed] = claim_outbound_emails(10)
+            self.assertTrue(deliver_outbound_email(claimed))
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, 'SENT')
+
+        self.queue()
+        out = StringIO()
+        with mock.patch('jobs.management.commands.send_queued_emails.deliver_outbound_email',
+                        side_effect=RuntimeError('bad row')), \
+                self.assertLogs('jobs.management.commands.send_queued_emails', 'ERROR'):
+            call_command('send_queued_emails', '--concurrency', '2', stdout=out)
+        self.assertIn('1 email(s) hit an unexpected error', out.getvalue())
+
+    def test_failures_back_off_then_give_up(self):
+        outbound = self.queue()
+        with mock.patch.object(LocmemEmailBackend, 'send_messages', side_effect=SMTPException('down')):
+            [claimed] = claim_outbound_emails(10)
+            self.assertEqual(claim_outbound_emails(10), [])
+            self.assertFalse(deliver_outbound_email(claimed, max_attempts=2))
+            outbound.refresh_from_db()
+            self.assertEqual(outbound.status, 'PENDING')
+            self.assertGreater(outbound.next_attempt_at, timezone.now())
+
+            [claimed] = claim_outbound_emails(10, now=outbound.next_attempt_at)
+            self.assertFalse(deliver_outbound_email(claimed, max_attempts=2))
+        outbound.refresh_from_db()
+        self.assertEqual((outbound.status, outbound.attempts, outbound.last_error), ('FAILED', 2, 'down'))
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.email_sent)
+
+    def test_view_enqueues_without_sending(self):
+        sender = UserEmail.objects.create(user=self.user, email='heidi@example.com', label='Work')
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('jobs:send_hr_email', args=[self.application.pk]), {
+            'sender_email': sender.pk, 'to_email': 'hr@example.com', 'hr_name': 'Sam', 'attach_resume': 'on',
+        })
+        self.assertRedirects(response, reverse('jobs:application_detail', args=[self.application.pk]),
+                             fetch_redirect_response=False)
+        outbound = OutboundEmail.objects.get()
+        self.assertEqual((outbound.status, outbound.from_email), ('PENDING', 'Work <heidi@example.com>'))
+        self.assertTrue(outbound.html_body)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class CountingEmailBackend(LocmemEmailBackend):
+    """Locmem backend counting opened connections, optionally dropping the first send"""
+    opened = 0
+    drop_next_send = False
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if CountingEmailBackend.drop_next_send:
+            CountingEmailBackend.drop_next_send = False
+            raise SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='jobs.tests.CountingEmailBackend')
+class EmailConnectionPoolTests(TestCase):
+    def setUp(self):
+        CountingEmailBackend.opened = 0
+        CountingEmailBackend.drop_next_send = False
+
+    def messages(self, count, from_email='noreply@example.com'):
+        return [EmailMessage(f'Reminder {index}', 'Body', from_email, [f'user{index}@example.com'])
+                for index in range(count)]
+
+    def test_connections_are_reused_up_to_the_cap_per_sender(self):
+        with EmailConnectionPool(max_messages_per_connection=2) as pool:
+            sent = pool.send_messages(self.messages(5) + self.messages(1, from_email='other@example.com'))
+        self.assertEqual(sent, 6)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(CountingEmailBackend.opened, 4)
+
+    def test_dropped_connection_is_reopened(self):
+        pool = EmailConnectionPool()
+        pool.send_messages(self.messages(1))
+        CountingEmailBackend.drop_next_send = True
+        self.assertEqual(pool.send_messages(self.messages(2)), 2)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        pool.close()
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ivan', email='ivan@example.com', password='secret')
+        self.now = timezone.now()
+        self.application = create_application(
+            self.user, status='DRAFT', deadline=self.now.date() + timedelta(days=2)
+        )
+        create_application(self.user, company_name='Later', status='DRAFT', deadline=self.now.date() + timedelta(days=30))
+        create_application(self.user, company_name='Sent', status='APPLIED', deadline=self.now.date())
+        self.interviews = [
+            InterviewRound.objects.create(
+                application=self.application, round_number=index + 1, interview_type='PHONE',
+                scheduled_date=self.now + timedelta(hours=hours)
+            )
+            for index, hours in enumerate([1, 2, 3, 48])
+        ]
+
+    def test_due_reminders_are_queued_once(self):
+        counts = queue_due_reminders(now=self.now, batch_size=2)
+        self.assertEqual(counts, {'INTERVIEW': 3, 'DEADLINE': 1})
+        self.assertEqual(OutboundEmail.objects.filter(to=['ivan@example.com']).count(), 4)
+        self.assertIn('Round: 1', OutboundEmail.objects.filter(subject__startswith='Interview').first().body)
+
+        self.assertEqual(queue_due_reminders(now=self.now, batch_size=2), {'INTERVIEW': 0, 'DEADLINE': 0})
+
+        # A rescheduled interview is reminded again
+        interview = self.interviews[0]
+        interview.scheduled_date += timedelta(minutes=30)
+        interview.save()
+        self.assertEqual(queue_due_reminders(now=self.now), {'INTERVIEW': 1, 'DEADLINE': 0})
+        self.assertEqual(ReminderLog.objects.count(), 5)
+
+    def test_zero_lead_queues_no_interview_reminders(self):
+        call_command('send_reminders', '--interview-lead-hours', '0', '--deadline-lead-days', '0', stdout=StringIO())
+        self.assertFalse(ReminderLog.objects.filter(kind='INTERVIEW').exists())
+
+    def test_command_queues_and_worker_sends(self):
+        call_command('send_reminders', stdout=StringIO())
+        call_command('send_queued_emails', '--concurrency', '1', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 4)
+
+
+class HREmailRenderCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('judy', email='judy@example.com', password='secret', first_name='Judy')
+        self.application = create_application(self.user, title='Platform Engineer')
+
+    def test_preview_and_sends_share_one_render(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(email_utils, 'render_to_string', wraps=email_utils.render_to_string) as render:
+            response = self.client.get(
+                reverse('jobs:hr_email_preview', args=[self.application.pk]),
+                {'hr_name': 'Sam <HR>', 'custom_message': 'Hello\nthere'},
+            )
+            first = queue_hr_application_email(self.application, 'sam@example.com', hr_name='Sam <HR>',
+                                               custom_message='Hello\r\nthere')
+            second = queue_hr_application_email(self.application, 'kim@example.com', hr_name='Kim',
+                                                custom_message='Hello\r\nthere')
+        self.assertEqual(render.call_count, 2)
+        self.assertContains(response, 'Dear Sam &lt;HR&gt;,')
+        self.assertEqual(first.html_body, response.content.decode())
+        self.assertIn('Dear Kim,', second.body)
+
+        queue_hr_application_email(self.application, 'hr@example.com', custom_message='Changed')
+        self.assertIn('Dear Hiring Manager,', OutboundEmail.objects.latest('pk').body)
+        self.assertIn('Changed', OutboundEmail.objects.latest('pk').body)
+
+
+class DocumentStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        email_utils._attachment_cache.clear()
+        self.user = User.objects.create_user('ken', password='secret')
+
+    def upload(self, name, content, filename='resume.pdf'):
+        return Document.objects.create(
+            user=self.user, name=name, document_type='RESUME', file=SimpleUploadedFile(filename, content)
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.upload('CV', b'%PDF-1.4 same bytes')
+        second = self.upload('CV copy', b'%PDF-1.4 same bytes', filename='other name.PDF')
+        third = self.upload('Other CV', b'%PDF-1.4 different bytes')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.sha256, hashlib.sha256(b'%PDF-1.4 same bytes').hexdigest())
+        self.assertNotEqual(first.file.name, third.file.name)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.file.path))), 1)
+        self.assertEqual(first.filename, 'CV.pdf')
+
+    def test_repeat_attachments_come_from_the_cache(self):
+        document = self.upload('CV', b'%PDF-1.4 resume')
+        with mock.patch.object(ContentAddressedStorage, 'open', autospec=True,
+                               side_effect=ContentAddressedStorage.open) as storage_open:
+            messages = [EmailMessage('Hello', 'Body', 'me@example.com', ['hr@example.com']) for _ in range(3)]
+            for message in messages:
+                attach_documents(message, [Document.objects.get(pk=document.pk)])
+        self.assertEqual(storage_open.call_count, 1)
+        for message in messages:
+            raw = message.message().as_bytes()
+            self.assertIn(b'filename="CV.pdf"', raw)
+            self.assertIn(base64.b64encode(b'%PDF-1.4 resume'), raw)
+
+    def test_changing_an_attachment_leaves_the_cached_part_alone(self):
+        document = self.upload('CV', b'%PDF-1.4 resume')
+        part = email_utils.document_attachment_part(document)
+        part.replace_header('Content-Disposition', 'inline')
+        part.add_header('X-Tracking', '1')
+        again = email_utils.document_attachment_part(document)
+        self.assertIn('attachment', again['Content-Disposition'])
+        self.assertIsNone(again['X-Tracking'])
+
+
+class DocumentUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media_root, DOCUMENT_MAX_UPLOAD_SIZE=1000, DOCUMENT_UPLOAD_CHUNK_SIZE=400
+        ))
+        self.user = User.objects.create_user('leo', password='secret')
+        self.client.force_login(self.user)
+        self.content = bytes(range(256)) * 3
+
+    def test_upload_is_streamed_and_hashed(self):
+        response = self.client.post(reverse('jobs:document_upload'), {
+            'name': 'Portfolio', 'document_type': 'PORTFOLIO',
+            'file': SimpleUploadedFile('portfolio.pdf', self.content),
+        })
+        self.assertRedirects(response, reverse('jobs:document_list'), fetch_redirect_response=False)
+        document = Document.objects.get()
+        self.assertEqual(document.sha256, hashlib.sha256(self.content).hexdigest())
+        self.assertTrue(document.file.name.startswith('documents/sha256/'))
+        with document.file.open('rb') as file:
+            self.assertEqual(file.read(), self.content)
+
+        response = self.client.post(reverse('jobs:document_upload'), {
+            'name': 'Too big', 'document_type': 'PORTFOLIO',
+            'file': SimpleUploadedFile('big.pdf', b'x' * 1001),
+        })
+        self.assertFormError(response.context['form'], 'file', 'File size must be less than 1000\xa0bytes.')
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'documents', 'uploads')), [])
+
+    def put_chunk(self, url, start, data):
+        return self.client.put(
+            url, data, content_type='application/octet-stream',
+            headers={'Content-Range': f'bytes {start}-{start + len(data) - 1}/{len(self.content)}'},
+        )
+
+    def test_resumable_chunked_upload(self):
+        response = self.client.post(reverse('jobs:document_upload_start'), {
+            'filename': 'portfolio.pdf', 'size': len(self.content), 'name': 'Portfolio', 'document_type': 'PORTFOLIO',
+        })
+        self.assertEqual(response.status_code, 201)
+        url = response.json()['url']
+
+        self.assertEqual(self.put_chunk(url, 0, self.content[:400]).json()['received'], 400)
+        # A retried or out-of-order chunk is refused with the offset to resume from
+        response = self.put_chunk(url, 0, self.content[:400])
+        self.assertEqual((response.status_code, response.json()['received']), (409, 400))
+        self.assertEqual(self.client.get(url).json(), {'received': 400, 'size': len(self.content)})
+
+        response = self.put_chunk(url, 400, self.content[400:])
+        self.assertEqual(response.status_code, 201)
+        document = Document.objects.get(pk=response.json()['document_id'])
+        self.assertEqual(document.sha256, hashlib.sha256(self.content).hexdigest())
+        with document.file.open('rb') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'documents', 'uploads')), [])
+
+
+class DocumentDownloadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.user = User.objects.create_user('mia', password='secret')
+        self.content = b'0123456789' * 10
+        self.document = Document.objects.create(
+            user=self.user, name='CV', document_type='RESUME', file=SimpleUploadedFile('cv.pdf', self.content)
+        )
+        self.url = reverse('jobs:document_download', args=[self.document.pk])
+        self.client.force_login(self.user)
+
+    def test_full_and_range_downloads(self):
+        response = self.client.get(self.url, {'download': 1})
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.document.sha256}"')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment; filename="CV.pdf"', response['Content-Disposition'])
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=10-19', 'If-Range': response['ETag']})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=-5'})
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+        response = self.client.get(self.url, headers={'Range': 'bytes=200-'})
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */100'))
+        # A stale If-Range gets the whole file
+        response = self.client.get(self.url, headers={'Range': 'bytes=10-19', 'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_requests_and_access(self):
+        response = self.client.get(self.url, headers={'If-None-Match': f'"{self.document.sha256}"'})
+        self.assertEqual(response.status_code, 304)
+
+        with override_settings(DOCUMENT_DOWNLOAD_ACCEL_REDIRECT='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+
+        self.client.force_login(User.objects.create_user('other', password='secret'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ApplicationImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('nina', password='secret')
+        self.acme = Company.objects.create(name='Acme')
+        create_application(self.user, company_name='Acme', title='Engineer')
+        self.client.force_login(self.user)
+
+    def test_csv_import_dedupes_and_reports_bad_rows(self):
+        rows = [
+            'company,title,status,remote_allowed,deadline',
+            ' acme ,Designer,applied,true,2030-01-31',
+            'Initech,Analyst,Phone Screen,false,',
+            'INITECH,analyst,,,',
+            'Acme,engineer,,,',
+            ',Missing company,,,',
+            'Initech,Tester,NOT_A_STATUS,,',
+            'Initech,Manager,,,',
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write('\n'.join(rows))
+        self.addCleanup(os.remove, csv_file.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_applications', 'nina', csv_file.name, '--batch-size', '2', stdout=out, stderr=err)
+
+        self.assertIn('Imported 3 of 7 application(s) (1 new companies, 3 new positions, 4 row(s) skipped)', out.getvalue())
+        self.assertIn('Row 3: You already have an application for this position.', err.getvalue())
+        self.assertIn('Row 4: You already have an application for this position.', err.getvalue())
+        self.assertIn('Row 5: company:', err.getvalue())
+        self.assertIn('Row 6: status:', err.getvalue())
+        self.assertEqual(Company.objects.filter(name__iexact='initech').count(), 1)
+        designer = JobApplication.objects.get(user=self.user, position__title='Designer')
+        self.assertEqual(designer.position.company, self.acme)
+        self.assertEqual((designer.status, str(designer.deadline)), ('APPLIED', '2030-01-31'))
+        self.assertTrue(designer.position.remote_allowed)
+
+        # bulk_create skips signals; the snapshot and search index are caught up
+        self.assertEqual(get_snapshot(self.user).total, 4)
+        self.assertEqual(search_applications(self.user, 'designer'), [designer.pk])
+
+    def test_json_upload_view(self):
+        records = [
+            {'company': 'Globex', 'title': 'Engineer', 'priority': 'HIGH', 'salary_expectation': 120000},
+            {'company': 'Globex', 'title': 'Engineer'},
+            'not an object',
+        ]
+        self.assertContains(self.client.get(reverse('jobs:application_import')), 'Import Applications')
+        upload = SimpleUploadedFile('applications.json', json.dumps(records).encode())
+        response = self.client.post(reverse('jobs:application_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertEqual(response.context['result'].errors, [
+            (2, 'You already have an application for this position.'),
+            (3, 'Expected an object with application fields.'),
+        ])
+        self.assertTrue(JobApplication.objects.filter(user=self.user, position__company__name='Globex', priority='HIGH').exists())
+
+        upload = SimpleUploadedFile('applications.csv', b'name,title\nAcme,Engineer\n')
+        response = self.client.post(reverse('jobs:application_import'), {'file': upload})
+        self.assertFormError(response.context['form'], 'file', 'Missing column(s): company')
+
+    def test_existing_titles_match_whatever_their_whitespace(self):
+        position = JobPosition.objects.create(company=self.acme, title='Senior   Data\tEngineer')
+        newcomer = User.objects.create_user('omar', password='secret')
+        result = import_applications(newcomer, [{'company': 'Acme', 'title': 'senior data engineer'}])
+        self.assertEqual(result.created, 1)
+        self.assertEqual(JobApplication.objects.get(user=newcomer).position, position)
+        self.assertEqual(JobPosition.objects.filter(company=self.acme).count(), 2)
+
+    def test_json_records_are_decoded_incrementally(self):
+        records = [{'company': f'Company {index}', 'notes': 'x' * 100} for index in range(50)]
+        with mock.patch('jobs.import_utils.READ_CHUNK_SIZE', 7):
+            self.assertEqual(list(iter_json_records(BytesIO(json.dumps(records).encode()))), records)
+            lines = '\n'.join(json.dumps(record) for record in records)
+            self.assertEqual(list(iter_json_records(BytesIO(lines.encode()))), records)
+
+
+class ApplicationExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('otto', password='secret')
+        for index in range(5):
+            application = create_application(self.user, title=f'Role {index}', status='APPLIED', notes=f'Note, "{index}"')
+            InterviewRound.objects.create(
+                application=application, round_number=1, interview_type='PHONE', scheduled_date=timezone.now()
+            )
+            ApplicationNote.objects.create(application=application, note=f'Called back {index}')
+        create_application(User.objects.create_user('other', password='secret'), title='Hidden')
+        self.client.force_login(self.user)
+
+    def test_jsonl_export_streams_joined_rows(self):
+        response = self.client.get(reverse('jobs:application_export', args=['jsonl']))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="applications-', response['Content-Disposition'])
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([record['title'] for record in records], [f'Role {index}' for index in range(5)])
+        self.assertEqual(records[0]['company'], 'Acme')
+        self.assertEqual(records[0]['interview_rounds'][0]['interview_type'], 'PHONE')
+        self.assertEqual(records[0]['application_notes'][0]['note'], 'Called back 0')
+
+        # One application query read in chunks of two, plus two prefetches per chunk
+        with self.assertNumQueries(7):
+            b''.join(stream_export(self.user, 'jsonl', chunk_size=2))
+        self.assertEqual(self.client.get(reverse('jobs:application_export', args=['xml'])).status_code, 404)
+
+    def test_csv_export_can_be_imported_again(self):
+        response = self.client.get(reverse('jobs:application_export', args=['csv']))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content)
+
+        newcomer = User.objects.create_user('newcomer', password='secret')
+        result = import_applications(newcomer, iter_csv_records(BytesIO(content)))
+        self.assertEqual((result.created, result.error_count, result.companies_created), (5, 0, 0))
+        self.assertEqual(
+            sorted(JobApplication.objects.filter(user=newcomer).values_list('notes', flat=True)),
+            [f'Note, "{index}"' for index in range(5)],
+        )
+
+
+class CompanyDeduplicationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('pia', password='secret')
+        self.google = Company.objects.create(name='Google')
+        self.client.force_login(self.user)
+
+    def test_variants_resolve_to_one_company(self):
+        self.assertEqual(Company.objects.lookup('google inc.'), self.google)
+        self.assertEqual(Company.objects.lookup_or_create('Google, L.L.C.'), (self.google, False))
+        form = CompanyForm(data={'name': 'GOOGLE LLC'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('already exists as "Google"', form.errors['name'][0])
+
+        response = self.client.post(reverse('jobs:application_create_with_company'), {
+            'company_name': 'google inc.', 'job_title': 'SRE', 'employment_type': 'FULL_TIME',
+            'status': 'DRAFT', 'priority': 'MEDIUM',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Company.objects.count(), 1)
+        self.assertEqual(JobApplication.objects.get(user=self.user).position.company, self.google)
+
+    def test_merge_command_repoints_positions(self):
+        # Key stored under older normalization rules
+        duplicate = Company.objects.bulk_create([Company(name='Google LLC', normalized_name='google llc')])[0]
+        application = create_application(self.user, company_name='Google LLC', title='SRE')
+        self.assertEqual(get_snapshot(self.user).company_counts, {str(duplicate.pk): 1})
+
+        out = StringIO()
+        call_command('merge_companies', stdout=out)
+        self.assertIn('Merged 1 duplicate companies (1 positions repointed, 0 companies re-keyed)', out.getvalue())
+        self.assertFalse(Company.objects.filter(pk=duplicate.pk).exists())
+        application.refresh_from_db()
+        self.assertEqual(application.position.company, self.google)
+        self.assertEqual(get_snapshot(self.user).company_counts, {str(self.google.pk): 1})
+
+
+class CompanyListCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('quinn', password='secret')
+        for index, status in enumerate(['APPLIED', 'OFFER_RECEIVED', 'REJECTED']):
+            create_application(self.user, company_name='Globex', title=f'Role {index}', status=status)
+        create_application(self.user, company_name='Acme', title='Engineer', status='APPLIED')
+        Company.objects.create(name='Initech')
+        # Another user's applications don't count
+        create_application(User.objects.create_user('other', password='secret'), company_name='Initech', title='Hidden')
+        self.client.force_login(self.user)
+
+    def test_counts_come_with_the_list_query(self):
+        url = reverse('jobs:company_list')
+        with self.assertNumQueries(4):
+            # Session, user, the page and its count
+            response = self.client.get(url)
+        counts = {
+            company.name: (company.user_application_count, company.user_active_count, company.user_offer_count)
+            for company in response.context['page_obj']
+        }
+        self.assertEqual(counts, {'Acme': (1, 1, 0), 'Globex': (3, 2, 1), 'Initech': (0, 0, 0)})
+
+    def test_applications_ordering_follows_the_counter(self):
+        # Every user's applications count: Initech's one ties with Acme's and sorts by name
+        create_application(User.objects.create_user('third', password='secret'), company_name='Initech', title='Other')
+        url = reverse('jobs:company_list')
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'sort': 'applications'})
+        self.assertEqual([company.name for company in response.context['page_obj']], ['Globex', 'Initech', 'Acme'])
+
+        # Orderings on the per-user counts aren't offered and fall back to the name
+        response = self.client.get(url, {'sort': 'active'})
+        self.assertEqual(response.context['sort'], 'name')
+        self.assertEqual([company.name for company in response.context['page_obj']], ['Acme', 'Globex', 'Initech'])
+
+    def test_count_ordering_paginates(self):
+        for index in range(12):
+            Company.objects.create(name=f'Company {index:02}')
+        url = reverse('jobs:company_list')
+        first = self.client.get(url, {'sort': 'applications'}).context['page_obj']
+        self.assertEqual([company.name for company in first][:3], ['Globex', 'Acme', 'Initech'])
+        second = self.client.get(url + '?' + first.next_querystring).context['page_obj']
+        names = [company.name for company in first] + [company.name for company in second]
+        self.assertEqual(len(names), 15)
+        self.assertEqual(len(set(names)), 15)
+
+
+class QueryProfilerTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('rosa', password='secret')
+        for index in range(12):
+            application = create_application(
+                self.user, company_name=f'Company {index % 4}', title=f'Role {index}', status='APPLIED'
+            )
+            InterviewRound.objects.create(
+                application=application, round_number=1, interview_type='PHONE',
+                scheduled_date=timezone.now() + timedelta(days=1)
+            )
+            ApplicationNote.objects.create(application=application, note='Followed up')
+        self.application = application
+        rebuild_snapshots(user_ids=[self.user.pk])
+        self.client.force_login(self.user)
+
+    def test_hot_views_stay_within_their_budgets(self):
+        for url in [
+            reverse('jobs:home'),
+            reverse('jobs:application_list'),
+            reverse('jobs:application_list') + '?search=role&status=APPLIED',
+            reverse('jobs:application_detail', args=[self.application.pk]),
+            reverse('jobs:company_list'),
+            reverse('jobs:statistics'),
+            reverse('jobs:document_list'),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.assertWithinQueryBudget(url).status_code, 200)
+
+        with self.assertRaisesMessage(AssertionError, 'Query budget of 1 exceeded: 12 queries (11 duplicates)'):
+            with self.assertMaxQueries(1):
+                for _ in range(12):
+                    Company.objects.filter(pk=self.application.position.company_id).first()
+
+    @override_settings(QUERY_PROFILER_ENABLED=True)
+    def test_middleware_reports_timings_and_repeated_queries(self):
+        with self.assertLogs('jobs.profiler', 'INFO') as logs:
+            response = self.client.get(reverse('jobs:application_list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries, 0 duplicates", tpl;dur=')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['view'], entry['status'], entry['budget'], entry['similar']), ('jobs:application_list', 200, 5, []))
+        self.assertGreater(entry['template_ms'], 0)
+
+        # Reading each application's position without select_related is an N+1
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'), 'SELECT * FROM t WHERE id IN (...) LIMIT N'
+        )
+        with profile_queries() as profile:
+            titles = [application.position.title for application in JobApplication.objects.filter(user=self.user)]
+        self.assertEqual(len(titles), 12)
+        self.assertEqual([count for _, count in profile.similar_queries()], [12])
+
+    def test_templates_are_only_instrumented_while_profiling(self):
+        original_render = Template._render
+        with profile_queries():
+            self.assertIsNot(Template._render, original_render)
+            with profile_queries():
+                pass
+            self.assertIsNot(Template._render, original_render)
+        self.assertIs(Template._render, original_render)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('quinn', password='secret')
+        self.application = create_application(self.user, company_name='Acme')
+        self.acme = self.application.position.company
+
+    def counters(self):
+        self.application.refresh_from_db()
+        self.acme.refresh_from_db()
+        return self.application.interview_round_count, self.application.note_count, self.acme.application_count
+
+    def test_children_and_applications_are_counted(self):
+        self.assertEqual(self.counters(), (0, 0, 1))
+        before = self.application.last_activity_at
+        interview = InterviewRound.objects.create(
+            application=self.application, round_number=1, interview_type='PHONE', scheduled_date=timezone.now()
+        )
+        note = ApplicationNote.objects.create(application=self.application, note='Called back')
+        ApplicationNote.objects.create(application=self.application, note='Sent portfolio')
+        self.assertEqual(self.counters(), (1, 2, 1))
+        self.assertGreater(self.application.last_activity_at, before)
+
+        interview.delete()
+        ApplicationNote.objects.filter(pk=note.pk).delete()
+        create_application(self.user, company_name='Acme', title='Designer')
+        self.assertEqual(self.counters(), (0, 1, 2))
+
+    def test_moving_and_deleting_applications(self):
+        globex = Company.objects.create(name='Globex')
+        self.application.position = JobPosition.objects.create(company=globex, title='SRE')
+        self.application.save()
+        globex.refresh_from_db()
+        self.assertEqual((self.counters()[2], globex.application_count), (0, 1))
+
+        # Cascades neither uncount children of deleted applications nor count below zero
+        ApplicationNote.objects.create(application=self.application, note='Bye')
+        self.application.position.delete()
+        globex.refresh_from_db()
+        self.assertEqual(globex.application_count, 0)
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_saving_an_out_of_date_instance_keeps_the_counters(self):
+        stale_application = JobApplication.objects.get(pk=self.application.pk)
+        stale_company = Company.objects.get(pk=self.acme.pk)
+        InterviewRound.objects.create(
+            application=self.application, round_number=1, interview_type='PHONE', scheduled_date=timezone.now()
+        )
+        create_application(self.user, company_name='Acme', title='Designer')
+
+        stale_application.status = 'APPLIED'
+        stale_application.save()
+        stale_company.location = 'Berlin'
+        stale_company.save()
+        self.assertEqual(self.counters(), (1, 0, 2))
+        self.assertEqual((self.application.status, self.acme.location), ('APPLIED', 'Berlin'))
+
+    def test_ordinary_saves_leave_nothing_to_repair(self):
+        self.application.status = 'APPLIED'
+        self.application.save()
+        note = ApplicationNote.objects.create(application=self.application, note='Called back')
+        note.note = 'Called back twice'
+        note.save()
+        InterviewRound.objects.create(
+            application=self.application, round_number=1, interview_type='PHONE', scheduled_date=timezone.now()
+        )
+        create_application(self.user, company_name='Globex')
+        self.assertEqual(rebuild_counters(dry_run=True), {'applications': 0, 'companies': 0})
+
+    def test_repair_command_fixes_drifted_counters(self):
+        note = ApplicationNote.objects.create(application=self.application, note='Called back')
+        JobApplication.objects.update(
+            note_count=5, interview_round_count=2, last_activity_at=timezone.now() - timedelta(days=30)
+        )
+        Company.objects.update(application_count=0)
+
+        out = StringIO()
+        call_command('rebuild_counters', '--dry-run', stdout=out)
+        self.assertIn('Would repair the counters of 1 applications and 1 companies', out.getvalue())
+        self.assertEqual(self.counters(), (2, 5, 0))
+
+        call_command('rebuild_counters', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(self.counters(), (0, 1, 1))
+        self.assertEqual(self.application.last_activity_at, note.updated_at)
+        self.assertEqual(rebuild_counters(), {'applications': 0, 'companies': 0})
+
+
+class BenchmarkTests(TestCase):
+    def test_seeded_dataset_benchmarks_every_hot_view_and_email(self):
+        counts = seed_dataset(users=2, companies=5, positions_per_company=4, applications=30,
+                              interview_ratio=0.5, note_ratio=0.5, documents_per_user=3, batch_size=7)
+        self.assertEqual(
+            (counts['users'], counts['positions'], counts['applications'], counts['documents']), (2, 20, 30, 6)
+        )
+        self.assertEqual(counts['notes'], ApplicationNote.objects.count())
+        self.assertEqual(counts['interview_rounds'], InterviewRound.objects.count())
+        self.assertEqual(rebuild_counters(), {'applications': 0, 'companies': 0})
+        self.assertEqual(Document.objects.filter(is_default=True, document_type='RESUME').count(), 2)
+        rebuild_snapshots()
+        rebuild_index()
+
+        user = User.objects.get(username='bench_user_0')
+        views = benchmark_views(self.client, user, repeat=1)
+        emails = benchmark_emails(user, repeat=1)
+        self.assertEqual(set(views), {
+            'home', 'application_list', 'application_list_search', 'application_list_filter', 'application_detail',
+            'statistics', 'company_list', 'company_list_by_applications', 'company_list_search',
+        })
+        self.assertEqual({name: result['status'] for name, result in views.items()}, dict.fromkeys(views, [200]))
+        self.assertEqual(set(emails), {
+            'hr_application_email', 'hr_application_email_cached', 'status_update_email',
+            'deadline_reminder_email', 'interview_reminder_email',
+        })
+        # Emails are rendered from already loaded objects
+        self.assertEqual({result['queries'] for result in emails.values()}, {0})
+        self.assertEqual(set(json.loads(json.dumps(views['home']))), {
+            'queries', 'duplicates', 'first_ms', 'median_ms', 'min_ms', 'max_ms', 'status',
+        })
+
+
+class ApplicationDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='secret')
+        resume = Document.objects.create(user=self.user, name='CV', document_type='RESUME', file='cv.pdf')
+        cover_letter = Document.objects.create(
+            user=self.user, name='Letter', document_type='COVER_LETTER', file='letter.pdf'
+        )
+        sender = UserEmail.objects.create(user=self.user, email='alice@example.com', label='Work')
+        self.application = create_application(
+            self.user, company_name='Initech', title='Backend Engineer', resume=resume,
+            cover_letter=cover_letter, sender_email=sender, email_sent=True, email_sent_date=timezone.now(),
+        )
+        InterviewRound.objects.create(
+            application=self.application, round_number=1, interview_type='PHONE', scheduled_date=timezone.now()
+        )
+        ApplicationNote.objects.create(application=self.application, note='Sent a thank-you email')
+        self.url = reverse('jobs:application_detail', args=[self.application.pk])
+        self.client.force_login(self.user)
+
+    def test_fragments_are_cached_until_their_version_changes(self):
+        # Session, user, the application graph, then the interviews and notes of the cold fragments
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Sent a thank-you email')
+        self.assertContains(response, 'Round 1: Phone Screen')
+        self.assertContains(response, 'CV')
+        self.assertContains(response, 'from alice@example.com')
+        with self.assertNumQueries(3):
+            self.assertContains(self.client.get(self.url), 'Sent a thank-you email')
+
+        InterviewRound.objects.create(
+            application=self.application, round_number=2, interview_type='ONSITE', scheduled_date=timezone.now()
+        )
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Round 2: Onsite Interview')
+
+        ApplicationNote.objects.create(application=self.application, note='Second round booked')
+        self.assertContains(self.client.get(self.url), 'Second round booked')
+
+        company = self.application.position.company
+        company.name = 'Initrode'
+        company.save()
+        self.application.status = 'OFFER_RECEIVED'
+        self.application.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, '<h4 class="mb-3">Initrode</h4>', html=True)
+        self.assertContains(response, 'Offer Received')
+
+
+class ApplicationFormChoicesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        other = User.objects.create_user('bob', password='secret')
+        self.resume = Document.objects.create(user=self.user, name='CV', document_type='RESUME', file='cv.pdf')
+        self.default_resume = Document.objects.create(
+            user=self.user, name='Default CV', document_type='RESUME', file='cv2.pdf', is_default=True
+        )
+        Document.objects.create(user=other, name='Not mine', document_type='RESUME', file='cv3.pdf')
+        self.letter = Document.objects.create(
+            user=self.user, name='Letter', document_type='COVER_LETTER', file='letter.pdf'
+        )
+        UserEmail.objects.create(user=self.user, email='a@example.com', label='Old')
+        self.primary = UserEmail.objects.create(user=self.user, email='b@example.com', label='Work', is_primary=True)
+        company = Company.objects.create(name='Acme')
+        self.positions = [JobPosition.objects.create(company=company, title=f'Role {index}') for index in range(4)]
+        self.client.force_login(self.user)
+
+    def test_choices_come_from_one_query_per_kind(self):
+        # Session, user, documents, emails, and whether there is any position at all
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('jobs:application_create'))
+        form = response.context['form']
+        self.assertEqual(form['resume'].initial, self.default_resume)
+        self.assertEqual(form['sender_email'].initial, self.primary)
+        self.assertEqual([choice for _, choice in form.fields['resume'].choices][1:], ['Default CV (Resume)', 'CV (Resume)'])
+        # Positions come from the autocomplete endpoint, only a chosen one is rendered
+        self.assertEqual(form.fields['position'].objects, [])
+        self.assertContains(response, f'data-autocomplete-url="{reverse("jobs:position_autocomplete")}"')
+        self.assertNotContains(response, 'Setup Required')
+
+        response = self.client.get(reverse('jobs:application_create'), {'position': self.positions[1].pk})
+        self.assertEqual(response.context['form'].fields['position'].objects, [self.positions[1]])
+
+        with self.assertNumQueries(4):
+            self.client.get(reverse('jobs:application_create_with_company'))
+
+    def test_any_position_can_be_submitted(self):
+        application = JobApplication.objects.create(user=self.user, position=self.positions[0])
+        response = self.client.get(reverse('jobs:application_edit', args=[application.pk]))
+        self.assertEqual(response.context['form'].fields['position'].objects, [self.positions[0]])
+
+        response = self.client.post(reverse('jobs:application_edit', args=[application.pk]), {
+            'position': self.positions[1].pk, 'status': 'APPLIED', 'priority': 'HIGH',
+            'application_platform': 'OTHER', 'resume': self.resume.pk, 'sender_email': self.primary.pk,
+        })
+        self.assertRedirects(response, reverse('jobs:application_detail', args=[application.pk]))
+        application.refresh_from_db()
+        self.assertEqual((application.position, application.resume), (self.positions[1], self.resume))
+
+        # Another user's document isn't among the loaded ones nor in the field's queryset
+        foreign = Document.objects.get(name='Not mine')
+        response = self.client.post(reverse('jobs:application_edit', args=[application.pk]), {
+            'position': self.positions[1].pk, 'status': 'APPLIED', 'priority': 'HIGH',
+            'application_platform': 'OTHER', 'resume': foreign.pk,
+        })
+        self.assertFormError(response.context['form'], 'resume', 'Select a valid choice. That choice is not one of the available choices.')
+
+
+class SingleFlagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('rae', password='secret')
+        self.work = UserEmail.objects.create(user=self.user, email='rae@work.example', label='Work', is_primary=True)
+
+    def updates(self, save):
+        with CaptureQueriesContext(connection) as queries:
+            save()
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+    def test_primary_email_is_handed_over(self):
+        home = UserEmail.objects.create(user=self.user, email='rae@home.example', label='Home')
+        home.full_clean()
+        home.is_primary = True
+        # Unset the previous primary, then save
+        self.assertEqual(len(self.updates(home.save)), 2)
+        self.assertEqual(list(UserEmail.objects.filter(is_primary=True)), [home])
+
+        # Edits that keep the flag skip the extra UPDATE
+        home.label = 'Personal'
+        self.assertEqual(len(self.updates(home.save)), 1)
+        home = UserEmail.objects.get(pk=home.pk)
+        home.label = 'Private'
+        self.assertEqual(len(self.updates(home.save)), 1)
+
+    def test_database_rejects_a_second_flag(self):
+        home = UserEmail.objects.create(user=self.user, email='rae@home.example', label='Home')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserEmail.objects.filter(pk=home.pk).update(is_primary=True)
+
+        resume = Document.objects.create(user=self.user, name='CV', document_type='RESUME', file='cv.pdf', is_default=True)
+        letter = Document.objects.create(
+            user=self.user, name='Letter', document_type='COVER_LETTER', file='letter.pdf', is_default=True
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Document.objects.filter(pk=letter.pk).update(document_type='RESUME')
+
+        # Moving a default to another type takes over that type's default
+        letter.document_type = 'RESUME'
+        letter.save()
+        self.assertEqual(list(Document.objects.filter(is_default=True)), [letter])
+        resume.refresh_from_db()
+        self.assertFalse(resume.is_default)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='secret')
+        self.acme = Company.objects.create(name='Acme Corp')
+        globex = Company.objects.create(name='Globex')
+        Company.objects.create(name='Acme Rockets')
+        self.backend = JobPosition.objects.create(company=self.acme, title='Backend Engineer')
+        JobPosition.objects.create(company=globex, title='backend developer')
+        JobPosition.objects.create(company=globex, title='Designer')
+        self.client.force_login(self.user)
+
+    def get_results(self, name, **params):
+        response = self.client.get(reverse(f'jobs:{name}'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=60', response['Cache-Control'])
+        return response.json()['results']
+
+    def test_prefix_search_with_limits(self):
+        self.assertEqual(
+            [result['text'] for result in self.get_results('company_autocomplete', q='acme')],
+            ['Acme Corp', 'Acme Rockets'],
+        )
+        self.assertEqual(self.get_results('company_autocomplete', q='ACME ROC'), [
+            {'id': Company.objects.get(name='Acme Rockets').pk, 'text': 'Acme Rockets'},
+        ])
+        self.assertEqual(len(self.get_results('company_autocomplete', q='', limit='2')), 2)
+        # Limits above the configured one are capped
+        with self.settings(AUTOCOMPLETE_RESULT_LIMIT=1):
+            self.assertEqual(len(self.get_results('company_autocomplete', q='acme', limit='50')), 1)
+
+        self.assertEqual(
+            [result['text'] for result in self.get_results('position_autocomplete', q='BACKEND')],
+            ['backend developer at Globex', 'Backend Engineer at Acme Corp'],
+        )
+        self.assertEqual(
+            [result['id'] for result in self.get_results('position_autocomplete', q='back', company=self.acme.pk)],
+            [self.backend.pk],
+        )
+        self.assertEqual(self.get_results('position_autocomplete', q='engineer'), [])
+
+    def test_results_are_cached_until_positions_or_companies_change(self):
+        with self.assertNumQueries(3):
+            self.get_results('position_autocomplete', q='back')
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.get_results('position_autocomplete', q='back')), 2)
+
+        JobPosition.objects.create(company=self.acme, title='Backend Lead')
+        self.assertEqual(len(self.get_results('position_autocomplete', q='back')), 3)
+        self.acme.name = 'Acme Industries'
+        self.acme.save()
+        self.assertIn('Backend Engineer at Acme Industries',
+                      [result['text'] for result in self.get_results('position_autocomplete', q='back')])
+        self.assertEqual(self.get_results('company_autocomplete', q='acme i')[0]['text'], 'Acme Industries')
+
+
+class DatabaseConfigTests(TestCase):
+    def test_profiles(self):
+        self.assertEqual(database_config(settings.BASE_DIR, env={}), {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': settings.BASE_DIR / 'db.sqlite3',
+        })
+
+        tuned = database_config(settings.BASE_DIR, env={'DATABASE_PROFILE': 'sqlite-tuned'})
+        self.assertEqual(tuned['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('PRAGMA journal_mode=WAL', tuned['OPTIONS']['init_command'].split(';'))
+
+        persistent = database_config(settings.BASE_DIR, env={
+            'DATABASE_PROFILE': 'postgres', 'DATABASE_HOST': 'db', 'DATABASE_CONN_MAX_AGE': '300',
+        })
+        self.assertEqual(
+            (persistent['HOST'], persistent['CONN_MAX_AGE'], persistent['CONN_HEALTH_CHECKS'], persistent['OPTIONS']),
+            ('db', 300, True, {}),
+        )
+        pooled = database_config(settings.BASE_DIR, env={
+            'DATABASE_PROFILE': 'postgres', 'DATABASE_POOL': 'true', 'DATABASE_POOL_MAX_SIZE': '20',
+        })
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        self.assertEqual(pooled['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10})
+
+        with self.assertRaises(ImproperlyConfigured):
+            database_config(settings.BASE_DIR, env={'DATABASE_PROFILE': 'oracle'})
+        with self.assertRaises(ImproperlyConfigured):
+            database_config(settings.BASE_DIR, env={'DATABASE_PROFILE': 'postgres', 'DATABASE_POOL': 'maybe'})
@@ -0,0 +1,216 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils import timezone
+
+from .models import Document, DocumentUpload
+from .storage_utils import get_document_storage
+
+
+UPLOAD_STAGING_DIR = 'documents/uploads'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkOffsetError(ValueError):
+    """A chunk does not start where the upload currently ends"""
+
+    def __init__(self, expected):
+        super().__init__(f'Expected a chunk starting at byte {expected}')
+        self.expected = expected
+
+
+def max_upload_size():
+    return getattr(settings, 'DOCUMENT_MAX_UPLOAD_SIZE', 100 * 1024 * 1024)
+
+
+def upload_chunk_size():
+    return getattr(settings, 'DOCUMENT_UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024)
+
+
+def staging_dir():
+    """Directory for uploads in progress, next to the document files"""
+    path = get_document_storage().path(UPLOAD_STAGING_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def staging_path(upload):
+    """Staging file of a resumable upload"""
+    return os.path.join(staging_dir(), f'{upload.pk}.part')
+
+
+class StagedUploadedFile(UploadedFile):
+    """
+    Upload written to a staging file inside the document storage
+
+    Being on the same file system, the storage moves it into place with a
+    rename instead of copying. sha256 is filled in as the data arrives.
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, extension = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + extension, dir=staging_dir())
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # The file was moved into storage, nothing left to delete
+            pass
+
+
+class StreamingDocumentUploadHandler(FileUploadHandler):
+    """
+    Upload handler writing documents straight to the document storage
+
+    Chunks are hashed and counted as they are written, so memory stays flat
+    whatever the file size and Document.save doesn't read the file again.
+    Data past DOCUMENT_MAX_UPLOAD_SIZE is dropped; the file still reports
+    its full size so DocumentForm rejects it.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = StagedUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size <= max_upload_size():
+            self.file.write(raw_data)
+            self.digest.update(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = self.size
+        if self.size <= max_upload_size():
+            self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+
+class StagedFile(File):
+    """A complete chunked upload, moved into storage by rename when saved"""
+
+    def __init__(self, path, name, sha256):
+        super().__init__(open(path, 'rb'), name)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Append a chunk of a resumable upload, streaming it to the staging file
+
+    Args:
+        upload: DocumentUpload instance
+        stream: File-like object to read the chunk from (e.g. the request)
+        offset: Byte offset the chunk starts at
+        length: Length of the chunk in bytes
+
+    Returns:
+        int: Number of bytes received so far
+
+    Raises:
+        ChunkOffsetError: If the chunk doesn't start where the upload ends
+        ValueError: If the chunk is too large or runs past the announced size
+    """
+    if offset != upload.received:
+        raise ChunkOffsetError(upload.received)
+    if length > upload_chunk_size():
+        raise ValueError(f'Chunks may not be larger than {upload_chunk_size()} bytes')
+    if offset + length > upload.size:
+        raise ValueError('The chunk runs past the end of the file')
+
+    path = staging_path(upload)
+    mode = 'r+b' if os.path.exists(path) else 'wb'
+    with open(path, mode) as staged:
+        # Drop whatever an interrupted earlier attempt left past the offset
+        staged.seek(offset)
+        staged.truncate()
+        remaining = length
+        while remaining:
+            data = stream.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not data:
+                raise ValueError('The chunk is shorter than its announced length')
+            staged.write(data)
+            remaining -= len(data)
+
+    if not DocumentUpload.objects.filter(pk=upload.pk, received=offset).update(
+        received=offset + length, updated_at=timezone.now()
+    ):
+        # Another request appended the same chunk concurrently
+        upload.refresh_from_db(fields=['received'])
+        raise ChunkOffsetError(upload.received)
+    upload.received = offset + length
+    return upload.received
+
+
+def complete_upload(upload):
+    """
+    Turn a fully received upload into a Document
+
+    The staging file is hashed once, then renamed into content-addressed
+    storage (or dropped if an identical file is already stored).
+
+    Returns:
+        Document
+    """
+    path = staging_path(upload)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as staged:
+        for data in iter(lambda: staged.read(STREAM_CHUNK_SIZE), b''):
+            digest.update(data)
+
+    staged_file = StagedFile(path, upload.filename, digest.hexdigest())
+    try:
+        document = Document.objects.create(
+            user=upload.user,
+            name=upload.name,
+            document_type=upload.document_type,
+            file=staged_file,
+            description=upload.description,
+            is_default=upload.is_default,
+        )
+    finally:
+        staged_file.close()
+        if os.path.exists(path):
+            os.remove(path)
+    upload.delete()
+    return document
+
+
+def delete_stale_uploads(older_than):
+    """
+    Delete resumable uploads that haven't received data for a while
+
+    Returns:
+        int: Number of deleted uploads
+    """
+    stale = DocumentUpload.objects.filter(updated_at__lt=timezone.now() - older_than)
+    count = 0
+    for upload in stale.iterator():
+        path = staging_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+        upload.delete()
+        count += 1
+    return count
+
+
+def default_stale_upload_age():
+    return timedelta(hours=getattr(settings, 'DOCUMENT_UPLOAD_EXPIRY_HOURS', 24))
@@ -11,11 +11,14 @@ urlpatterns = [
     path('applications/', views.application_list, name='application_list'),
     path('applications/create/', views.application_create, name='application_create'),
     path('applications/create-with-company/', views.application_create_with_company, name='application_create_with_company'),
+    path('applications/import/', views.application_import, name='application_import'),
+    path('applications/export/<str:export_format>/', views.application_export, name='application_export'),
     path('applications/<int:pk>/', views.application_detail, name='application_detail'),
     path('applications/<int:pk>/edit/', views.application_edit, name='application_edit'),
     path('applications/<int:pk>/delete/', views.application_delete, name='application_delete'),
     path('applications/<int:pk>/send-email/', views.send_application_email_view, name='send_application_email'),
     path('applications/<int:pk>/send-hr-email/', views.send_hr_email_view, name='send_hr_email'),
+    path('applications/<int:pk>/send-hr-email/preview/', views.hr_email_preview, name='hr_email_preview'),
     
     # Interview Rounds
     path('applications/<int:application_pk>/add-interview/', views.add_interview_round, name='add_interview_round'),
@@ -26,11 +29,15 @@ urlpatterns = [
     # Documents
     path('documents/', views.document_list, name='document_list'),
     path('documents/upload/', views.document_upload, name='document_upload'),
+    path('documents/uploads/', views.document_upload_start, name='document_upload_start'),
+    path('documents/uploads/<uuid:upload_id>/', views.document_upload_chunk, name='document_upload_chunk'),
+    path('documents/<int:pk>/download/', views.document_download, name='document_download'),
     path('documents/<int:pk>/edit/', views.document_edit, name='document_edit'),
     path('documents/<int:pk>/delete/', views.document_delete, name='document_delete'),
     
     # Companies
     path('companies/', views.company_list, name='company_list'),
+    path('companies/autocomplete/', views.company_autocomplete, name='company_autocomplete'),
     path('companies/create/', views.company_create, name='company_create'),
     path('companies/add/', views.company_create, name='company_add'),  # Alias for create
     path('companies/<int:pk>/edit/', views.company_edit, name='company_edit'),
@@ -38,6 +45,7 @@ urlpatterns = [
     
     # Job Positions
     path('positions/create/', views.position_create, name='position_create'),
+    path('positions/autocomplete/', views.position_autocomplete, name='position_autocomplete'),
     
     # Statistics
     path('statistics/', views.statistics, name='statistics'),
@@ -1,69 +1,60 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.clickjacking import xframe_options_sameorigin
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
 from datetime import timedelta
+from functools import partial
+import os
+import re
 
-from .models import Company, JobPosition, JobApplication, Document, InterviewRound, ApplicationNote, UserEmail
+from .models import Company, JobPosition, JobApplication, Document, DocumentUpload, InterviewRound, ApplicationNote, UserEmail
 from .forms import (CompanyForm, JobPositionForm, JobApplicationForm, DocumentForm, 
-                   InterviewRoundForm, ApplicationNoteForm, EmailApplicationForm, JobApplicationWithInlineCompanyForm, HREmailForm, UserEmailForm)
-from .email_utils import send_application_email, send_hr_application_email
-
-
+                   InterviewRoundForm, ApplicationNoteForm, EmailApplicationForm, JobApplicationWithInlineCompanyForm, HREmailForm, UserEmailForm,
+                   DocumentUploadForm, ApplicationImportForm)
+from .autocomplete_utils import (autocomplete_cache_timeout, autocomplete_companies, autocomplete_limit,
+                                 autocomplete_positions)
+from .choice_utils import get_form_choices
+from .email_utils import queue_application_email, queue_hr_application_email, render_hr_application_email
+from .dashboard_utils import get_dashboard_data
+from .download_utils import document_response
+from .export_utils import CONTENT_TYPES, export_formats, stream_export
+from .fragment_utils import application_fragment_versions, fragment_cache_timeout
+from .import_utils import ImportFileError, detect_format, import_applications, iter_records
+from .pagination_utils import cached_count, cursor_paginate
+from .profiling_utils import query_budget
+from .search_utils import matching_applications, matching_companies
+from .stats_utils import annotate_company_counts, get_application_statistics, get_snapshot
+from .upload_utils import (ChunkOffsetError, StreamingDocumentUploadHandler, append_chunk, complete_upload,
+                           max_upload_size, staging_path, upload_chunk_size)
+
+
+@query_budget(6)
 def home(request):
     """Home page with dashboard overview"""
     if request.user.is_authenticated:
-        # Get user's application statistics
-        total_applications = JobApplication.objects.filter(user=request.user).count()
-        pending_applications = JobApplication.objects.filter(
-            user=request.user, 
-            status__in=['DRAFT', 'APPLIED']
-        ).count()
-        interview_applications = JobApplication.objects.filter(
-            user=request.user,
-            status__in=['PHONE_SCREEN', 'TECHNICAL_INTERVIEW', 'ONSITE_INTERVIEW', 'FINAL_INTERVIEW']
-        ).count()
-        
-        # Recent applications
-        recent_applications = JobApplication.objects.filter(
-            user=request.user
-        ).order_by('-created_at')[:5]
-        
-        # Upcoming interviews
-        upcoming_interviews = InterviewRound.objects.filter(
-            application__user=request.user,
-            scheduled_date__gte=timezone.now(),
-            status='SCHEDULED'
-        ).order_by('scheduled_date')[:5]
-        
-        context = {
-            'total_applications': total_applications,
-            'pending_applications': pending_applications,
-            'interview_applications': interview_applications,
-            'recent_applications': recent_applications,
-            'upcoming_interviews': upcoming_interviews,
-        }
+        context = get_dashboard_data(request.user)
         return render(request, 'jobs/dashboard.html', context)
     else:
         return render(request, 'jobs/home.html')
 
 
 @login_required
+@query_budget(5)
 def application_list(request):
     """List all job applications for the current user"""
-    applications = JobApplication.objects.filter(user=request.user)
+    applications = JobApplication.objects.filter(user=request.user).select_related('position__company')
     
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        applications = applications.filter(
-            Q(position__title__icontains=search_query) |
-            Q(position__company__name__icontains=search_query) |
-            Q(notes__icontains=search_query)
-        )
+        applications = applications.filter(pk__in=matching_applications(request.user, search_query))
     
     # Filter by status
     status_filter = request.GET.get('status')
@@ -75,13 +66,15 @@ def application_list(request):
     if priority_filter:
         applications = applications.filter(priority=priority_filter)
     
-    # Order by creation date (newest first)
-    applications = applications.order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(applications, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination, newest first; the unfiltered total comes from the stats snapshot
+    if search_query or status_filter or priority_filter:
+        approximate_count = partial(cached_count, applications)
+    else:
+        def approximate_count():
+            return get_snapshot(request.user).total
+    page_obj = cursor_paginate(
+        request, applications, ['-created_at', '-id'], 10, approximate_count=approximate_count
+    )
     
     # Get filter choices for the template
     status_choices = JobApplication.STATUS_CHOICES
@@ -94,14 +87,34 @@ def application_list(request):
         'priority_filter': priority_filter,
         'status_choices': status_choices,
         'priority_choices': priority_choices,
+        'export_formats': export_formats(),
     }
     return render(request, 'jobs/application_list.html', context)
 
 
 @login_required
+def application_export(request, export_format):
+    """Stream all of the user's applications with their interviews and notes as a download"""
+    if export_format not in export_formats():
+        raise Http404('Unsupported export format')
+    response = StreamingHttpResponse(
+        stream_export(request.user, export_format), content_type=CONTENT_TYPES[export_format]
+    )
+    filename = f'applications-{timezone.localdate().isoformat()}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@query_budget(5)
 def application_detail(request, pk):
     """View details of a specific job application"""
-    application = get_object_or_404(JobApplication, pk=pk, user=request.user)
+    # Everything the page shows outside the cached fragments comes in one query
+    application = get_object_or_404(
+        JobApplication.objects.select_related('position__company', 'resume', 'cover_letter', 'sender_email'),
+        pk=pk, user=request.user
+    )
+    # Only evaluated when their fragment isn't cached
     interview_rounds = application.interview_rounds.all().order_by('round_number')
     notes = application.application_notes.all().order_by('-created_at')
     
@@ -109,6 +122,8 @@ def application_detail(request, pk):
         'application': application,
         'interview_rounds': interview_rounds,
         'notes': notes,
+        'fragment_versions': application_fragment_versions(application),
+        'fragment_timeout': fragment_cache_timeout(),
     }
     return render(request, 'jobs/application_detail.html', context)
 
@@ -128,13 +143,13 @@ def application_create(request):
             messages.warning(request, 'Selected position not found.')
     
     if request.method == 'POST':
-        form = JobApplicationForm(request.POST, user=request.user)
+        form = JobApplicationForm(request.POST, user=request.user, choices=get_form_choices(request))
         if form.is_valid():
             application = form.save()
             messages.success(request, 'Job application created successfully!')
             return redirect('jobs:application_detail', pk=application.pk)
     else:
-        form = JobApplicationForm(user=request.user, initial=initial_data)
+        form = JobApplicationForm(user=request.user, choices=get_form_choices(request), initial=initial_data)
     
     context = {'form': form, 'title': 'Create New Application'}
     return render(request, 'jobs/application_form.html', context)
@@ -144,31 +159,58 @@ def application_create(request):
 def application_create_with_company(request):
     """Create a new job application with inline company creation"""
     if request.method == 'POST':
-        form = JobApplicationWithInlineCompanyForm(request.POST, user=request.user)
+        form = JobApplicationWithInlineCompanyForm(request.POST, user=request.user, choices=get_form_choices(request))
         if form.is_valid():
             application = form.save()
             messages.success(request, 'Job application and company created successfully!')
             return redirect('jobs:application_detail', pk=application.pk)
     else:
-        form = JobApplicationWithInlineCompanyForm(user=request.user)
+        form = JobApplicationWithInlineCompanyForm(user=request.user, choices=get_form_choices(request))
     
     context = {'form': form, 'title': 'Create New Application with Company'}
     return render(request, 'jobs/application_form_with_company.html', context)
 
 
+@login_required
+def application_import(request):
+    """Import applications in bulk from an uploaded CSV or JSON file"""
+    result = None
+    if request.method == 'POST':
+        form = ApplicationImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            file_format = form.cleaned_data['format'] or detect_format(upload.name)
+            if not file_format:
+                form.add_error('format', 'Could not tell the format from the file name, please pick one.')
+            else:
+                try:
+                    result = import_applications(request.user, iter_records(upload, file_format))
+                except ImportFileError as exc:
+                    form.add_error('file', str(exc))
+                else:
+                    messages.success(request, f'Imported {result.created} of {result.rows} application(s).')
+                    if result.error_count:
+                        messages.warning(request, f'{result.error_count} row(s) were skipped, see below.')
+    else:
+        form = ApplicationImportForm()
+    
+    context = {'form': form, 'result': result}
+    return render(request, 'jobs/application_import.html', context)
+
+
 @login_required
 def application_edit(request, pk):
     """Edit an existing job application"""
     application = get_object_or_404(JobApplication, pk=pk, user=request.user)
     
     if request.method == 'POST':
-        form = JobApplicationForm(request.POST, instance=application, user=request.user)
+        form = JobApplicationForm(request.POST, instance=application, user=request.user, choices=get_form_choices(request))
         if form.is_valid():
             form.save()
             messages.success(request, 'Job application updated successfully!')
             return redirect('jobs:application_detail', pk=application.pk)
     else:
-        form = JobApplicationForm(instance=application, user=request.user)
+        form = JobApplicationForm(instance=application, user=request.user, choices=get_form_choices(request))
     
     context = {'form': form, 'application': application, 'title': 'Edit Application'}
     return render(request, 'jobs/application_form.html', context)
@@ -196,7 +238,9 @@ def send_application_email_view(request, pk):
     if request.method == 'POST':
         form = EmailApplicationForm(request.POST, application=application)
         if form.is_valid():
-            success = send_application_email(
+            # Sent by the send_queued_emails worker, which marks the
+            # application as sent once delivery is confirmed
+            queue_application_email(
                 application=application,
                 subject=form.cleaned_data['subject'],
                 message=form.cleaned_data['message'],
@@ -206,11 +250,8 @@ def send_application_email_view(request, pk):
                 attach_cover_letter=form.cleaned_data['attach_cover_letter']
             )
             
-            if success:
-                messages.success(request, 'Application email sent successfully!')
-                return redirect('jobs:application_detail', pk=application.pk)
-            else:
-                messages.error(request, 'Failed to send email. Please check your email settings.')
+            messages.success(request, 'Application email queued and will be sent shortly.')
+            return redirect('jobs:application_detail', pk=application.pk)
     else:
         form = EmailApplicationForm(application=application)
     
@@ -236,7 +277,9 @@ def send_hr_email_view(request, pk):
             application.hr_name = form.cleaned_data['hr_name']
             application.save()
             
-            success = send_hr_application_email(
+            # Sent by the send_queued_emails worker, which marks the
+            # application as sent once delivery is confirmed
+            queue_hr_application_email(
                 application=application,
                 sender_email=form.cleaned_data['sender_email'],
                 to_email=form.cleaned_data['to_email'],
@@ -247,12 +290,8 @@ def send_hr_email_view(request, pk):
                 attach_cover_letter=form.cleaned_data['attach_cover_letter']
             )
             
-            if success:
-                application.mark_as_sent()
-                messages.success(request, 'Professional application email sent successfully to HR!')
-                return redirect('jobs:application_detail', pk=application.pk)
-            else:
-                messages.error(request, 'Failed to send email. Please check your email settings and try again.')
+            messages.success(request, 'Professional application email to HR queued and will be sent shortly.')
+            return redirect('jobs:application_detail', pk=application.pk)
     else:
         form = HREmailForm(application=application)
     
@@ -266,6 +305,24 @@ def send_hr_email_view(request, pk):
 
 
 @login_required
+@xframe_options_sameorigin
+def hr_email_preview(request, pk):
+    """Render the HR email as it will be sent, for the preview frame of the send page"""
+    application = get_object_or_404(
+        JobApplication.objects.select_related('user', 'position__company', 'resume', 'cover_letter'),
+        pk=pk, user=request.user
+    )
+    # Shares its cached render with the send that follows
+    bodies = render_hr_application_email(
+        application,
+        custom_message=request.GET.get('custom_message'),
+        hr_name=request.GET.get('hr_name', '').strip(),
+    )
+    return HttpResponse(bodies['html'])
+
+
+@login_required
+@query_budget(4)
 def document_list(request):
     """List all documents for the current user"""
     documents = Document.objects.filter(user=request.user).order_by('-created_at')
@@ -275,10 +332,10 @@ def document_list(request):
     if doc_type_filter:
         documents = documents.filter(document_type=doc_type_filter)
     
-    # Pagination
-    paginator = Paginator(documents, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination, newest first
+    page_obj = cursor_paginate(
+        request, documents, ['-created_at', '-id'], 10, approximate_count=partial(cached_count, documents)
+    )
     
     document_types = Document.DOCUMENT_TYPE_CHOICES
     
@@ -290,9 +347,28 @@ def document_list(request):
     return render(request, 'jobs/document_list.html', context)
 
 
+def _document_form_context(form, title, document=None):
+    return {
+        'form': form,
+        'document': document,
+        'title': title,
+        'max_upload_size': max_upload_size(),
+        'upload_chunk_size': upload_chunk_size(),
+    }
+
+
 @login_required
+@csrf_exempt
 def document_upload(request):
     """Upload a new document"""
+    # Stream the file straight to storage. Upload handlers can't be changed
+    # once the CSRF check has read the body, so CSRF is checked afterwards.
+    request.upload_handlers = [StreamingDocumentUploadHandler(request)]
+    return _document_upload(request)
+
+
+@csrf_protect
+def _document_upload(request):
     if request.method == 'POST':
         form = DocumentForm(request.POST, request.FILES, user=request.user)
         if form.is_valid():
@@ -302,13 +378,88 @@ def document_upload(request):
     else:
         form = DocumentForm(user=request.user)
     
-    context = {'form': form, 'title': 'Upload Document'}
-    return render(request, 'jobs/document_form.html', context)
+    return render(request, 'jobs/document_form.html', _document_form_context(form, 'Upload Document'))
 
 
 @login_required
+@require_POST
+def document_upload_start(request):
+    """Start a resumable chunked upload (used by the upload page for large files)"""
+    form = DocumentUploadForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    upload = form.save(commit=False)
+    upload.user = request.user
+    upload.save()
+    return JsonResponse({
+        'upload_id': str(upload.pk),
+        'received': 0,
+        'chunk_size': upload_chunk_size(),
+        'url': reverse('jobs:document_upload_chunk', args=[upload.pk]),
+    }, status=201)
+
+
+@login_required
+def document_upload_chunk(request, upload_id):
+    """
+    Resumable upload endpoint
+
+    GET reports how many bytes were received, so an interrupted upload can
+    resume from there. PUT appends the chunk given by the Content-Range
+    header; the last chunk creates the document. DELETE cancels the upload.
+    """
+    upload = get_object_or_404(DocumentUpload, pk=upload_id, user=request.user)
+    
+    if request.method == 'GET':
+        return JsonResponse({'received': upload.received, 'size': upload.size})
+    
+    if request.method == 'DELETE':
+        path = staging_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+        upload.delete()
+        return HttpResponse(status=204)
+    
+    if request.method != 'PUT':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', request.headers.get('Content-Range', ''))
+    if not match:
+        return JsonResponse({'error': 'A "Content-Range: bytes start-end/size" header is required'}, status=400)
+    start, end, size = map(int, match.groups())
+    length = int(request.headers.get('Content-Length') or 0)
+    if size != upload.size or end - start + 1 != length:
+        return JsonResponse({'error': 'Content-Range does not match the upload'}, status=400)
+    
+    try:
+        append_chunk(upload, request, start, length)
+    except ChunkOffsetError as e:
+        return JsonResponse({'error': str(e), 'received': e.expected}, status=409)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    if not upload.is_complete:
+        return JsonResponse({'received': upload.received, 'size': upload.size})
+    
+    document = complete_upload(upload)
+    messages.success(request, 'Document uploaded successfully!')
+    return JsonResponse({
+        'document_id': document.pk,
+        'redirect': reverse('jobs:document_list'),
+    }, status=201)
+
+
+@login_required
+@csrf_exempt
 def document_edit(request, pk):
     """Edit an existing document"""
+    # A replacement file is streamed too, see document_upload
+    request.upload_handlers = [StreamingDocumentUploadHandler(request)]
+    return _document_edit(request, pk)
+
+
+@csrf_protect
+def _document_edit(request, pk):
     document = get_object_or_404(Document, pk=pk, user=request.user)
     
     if request.method == 'POST':
@@ -320,8 +471,14 @@ def document_edit(request, pk):
     else:
         form = DocumentForm(instance=document, user=request.user)
     
-    context = {'form': form, 'document': document, 'title': 'Edit Document'}
-    return render(request, 'jobs/document_form.html', context)
+    return render(request, 'jobs/document_form.html', _document_form_context(form, 'Edit Document', document))
+
+
+@login_required
+def document_download(request, pk):
+    """Serve a document's file to its owner, with range and conditional request support"""
+    document = get_object_or_404(Document, pk=pk, user=request.user)
+    return document_response(request, document, as_attachment='download' in request.GET)
 
 
 @login_required
@@ -338,32 +495,87 @@ def document_delete(request, pk):
     return render(request, 'jobs/document_confirm_delete.html', context)
 
 
+# Both orderings are served by an index: each page reads the next rows of
+# jobs_company_name_idx or jobs_company_applications_idx. The per-user counts
+# shown on the cards are aggregated for the page only and can't be sorted on
+# without aggregating every company, so "applications" sorts by the
+# Company.application_count counter, which counts every user's applications.
+COMPANY_SORT_ORDERINGS = {
+    'name': ['name', 'id'],
+    'applications': ['-application_count', 'name', 'id'],
+}
+
+
 @login_required
+@query_budget(4)
 def company_list(request):
-    """List all companies"""
+    """List all companies with the user's application counts"""
     companies = Company.objects.all().order_by('name')
     
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        companies = companies.filter(
-            Q(name__icontains=search_query) |
-            Q(industry__icontains=search_query) |
-            Q(location__icontains=search_query)
-        )
-    
-    # Pagination
-    paginator = Paginator(companies, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        companies = companies.filter(pk__in=matching_companies(search_query))
+    
+    # Filter by industry
+    industry_filter = request.GET.get('industry')
+    if industry_filter:
+        companies = companies.filter(industry=industry_filter)
+    
+    # Keyset pagination by name or by the application counter, busiest first
+    sort = request.GET.get('sort')
+    if sort not in COMPANY_SORT_ORDERINGS:
+        sort = 'name'
+    page_obj = cursor_paginate(
+        request, annotate_company_counts(companies, request.user), COMPANY_SORT_ORDERINGS[sort], 12,
+        approximate_count=partial(cached_count, companies)
+    )
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
+        'industry_filter': industry_filter,
+        'sort': sort,
     }
     return render(request, 'jobs/company_list.html', context)
 
 
+def _autocomplete_response(results):
+    response = JsonResponse({'results': results})
+    # Private: login is required, even though the results aren't per user
+    patch_cache_control(response, private=True, max_age=autocomplete_cache_timeout())
+    return response
+
+
+def _autocomplete_limit(request):
+    """The requested number of results, capped at AUTOCOMPLETE_RESULT_LIMIT"""
+    try:
+        return max(1, min(int(request.GET['limit']), autocomplete_limit()))
+    except (KeyError, ValueError):
+        return autocomplete_limit()
+
+
+@login_required
+@query_budget(3)
+def company_autocomplete(request):
+    """Companies whose name starts with ?q=, as JSON"""
+    results = autocomplete_companies(request.GET.get('q', ''), limit=_autocomplete_limit(request))
+    return _autocomplete_response(results)
+
+
+@login_required
+@query_budget(3)
+def position_autocomplete(request):
+    """Positions whose title starts with ?q=, optionally of one ?company=, as JSON"""
+    company_id = request.GET.get('company')
+    results = autocomplete_positions(
+        request.GET.get('q', ''),
+        company_id=int(company_id) if company_id and company_id.isdigit() else None,
+        limit=_autocomplete_limit(request),
+    )
+    return _autocomplete_response(results)
+
+
 @login_required
 def company_create(request):
     """Create a new company"""
@@ -484,85 +696,10 @@ def add_application_note(request, application_pk):
 
 
 @login_required
+@query_budget(5)
 def statistics(request):
     """Show application statistics"""
-    user_applications = JobApplication.objects.filter(user=request.user)
-    total_applications = user_applications.count()
-    
-    # Status statistics with percentages
-    status_stats = []
-    for status_code, status_name in JobApplication.STATUS_CHOICES:
-        status_count = user_applications.filter(status=status_code).count()
-        percentage = round((status_count / total_applications * 100) if total_applications > 0 else 0, 1)
-        status_stats.append((status_code, status_count, percentage))
-    
-    # Calculate derived metrics
-    applications_this_month = user_applications.filter(
-        created_at__month=timezone.now().month,
-        created_at__year=timezone.now().year
-    ).count()
-    
-    interview_count = user_applications.filter(
-        status__in=['PHONE_SCREEN', 'TECHNICAL_INTERVIEW', 'ONSITE_INTERVIEW', 'FINAL_INTERVIEW']
-    ).count()
-    
-    response_rate = round((interview_count / total_applications * 100) if total_applications > 0 else 0, 1)
-    interview_rate = round((interview_count / total_applications * 100) if total_applications > 0 else 0, 1)
-    offer_count = user_applications.filter(status='OFFER').count()
-    offer_rate = round((offer_count / total_applications * 100) if total_applications > 0 else 0, 1)
-    rejection_count = user_applications.filter(status='REJECTED').count()
-    rejection_rate = round((rejection_count / total_applications * 100) if total_applications > 0 else 0, 1)
-    
-    # Top industries
-    top_industries = user_applications.values('position__company__industry').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
-    
-    # Top companies
-    top_companies = user_applications.values('position__company__name', 'position__company').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
-    
-    # Timeline data (last 6 months)
-    from datetime import datetime, timedelta
-    from django.db.models.functions import TruncMonth
-    
-    six_months_ago = timezone.now() - timedelta(days=180)
-    monthly_stats = user_applications.filter(
-        created_at__gte=six_months_ago
-    ).annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        count=Count('id')
-    ).order_by('month')
-    
-    # Format timeline data
-    timeline_data = []
-    max_count = max([m['count'] for m in monthly_stats]) if monthly_stats else 1
-    for stat in monthly_stats:
-        timeline_data.append({
-            'month': stat['month'].strftime('%b'),
-            'count': stat['count'],
-            'percentage': round((stat['count'] / max_count * 100) if max_count > 0 else 0, 1)
-        })
-    
-    # Recent applications
-    recent_applications = user_applications.order_by('-created_at')[:6]
-    
-    context = {
-        'status_stats': status_stats,
-        'total_applications': total_applications,
-        'applications_this_month': applications_this_month,
-        'interview_count': interview_count,
-        'response_rate': response_rate,
-        'interview_rate': interview_rate,
-        'offer_rate': offer_rate,
-        'rejection_rate': rejection_rate,
-        'top_industries': [(item['position__company__industry'] or 'Not Specified', item['count']) for item in top_industries],
-        'top_companies': [(Company.objects.get(pk=item['position__company']), item['count']) for item in top_companies if item['position__company']],
-        'timeline_data': timeline_data,
-        'recent_applications': recent_applications,
-    }
+    context = get_application_statistics(request.user)
     return render(request, 'jobs/statistics.html', context)
 
 
@@ -625,7 +762,8 @@ def user_email_delete(request, pk):
 def user_email_set_default(request, pk):
     """Set an email as primary"""
     user_email = get_object_or_404(UserEmail, pk=pk, user=request.user)
-    user_email.is_primary = True
-    user_email.save()  # This will automatically unset other primary emails due to model logic
+    if not user_email.is_primary:
+        user_email.is_primary = True
+        user_email.save(update_fields=['is_primary', 'updated_at'])  # Unsets the previous primary email too
     messages.success(request, f'Set {user_email.email} as primary email!')
     return redirect('jobs:user_email_list')
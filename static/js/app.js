@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeInteractions();
     initializeFormEnhancements();
     initializeSearchAndFilters();
+    initializeAutocomplete();
     initializeNotifications();
     initializeThemeSystem();
 });
@@ -197,6 +198,69 @@ function initializeSearchAndFilters() {
     });
 }
 
+// Autocomplete for selects and inputs with a data-autocomplete-url
+function initializeAutocomplete() {
+    function fetchResults(url, query) {
+        const params = new URLSearchParams({q: query});
+        return fetch(`${url}?${params}`, {headers: {'Accept': 'application/json'}})
+            .then(response => response.ok ? response.json() : {results: []})
+            .then(data => data.results);
+    }
+
+    function onTyping(input, callback) {
+        let typingTimeout;
+        input.addEventListener('input', function() {
+            clearTimeout(typingTimeout);
+            typingTimeout = setTimeout(() => callback(this.value.trim()), 250);
+        });
+    }
+
+    // Selects render only the chosen option; a search box above refills them
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(select => {
+        const url = select.dataset.autocompleteUrl;
+        const search = document.createElement('input');
+        search.type = 'search';
+        search.className = 'form-control mb-2';
+        search.placeholder = 'Type to search...';
+        search.setAttribute('autocomplete', 'off');
+        select.parentElement.insertBefore(search, select);
+
+        function refill(query) {
+            fetchResults(url, query).then(results => {
+                const selected = select.selectedOptions[0];
+                Array.from(select.options).forEach(option => {
+                    if (option.value && option !== selected) {
+                        option.remove();
+                    }
+                });
+                results.forEach(result => {
+                    if (!selected || String(result.id) !== selected.value) {
+                        select.add(new Option(result.text, result.id));
+                    }
+                });
+            });
+        }
+
+        onTyping(search, refill);
+        // Offer the latest entries before anything is typed
+        select.addEventListener('focus', () => refill(search.value.trim()), {once: true});
+    });
+
+    // Text inputs get their suggestions through a datalist
+    document.querySelectorAll('input[data-autocomplete-url]').forEach((input, index) => {
+        const datalist = document.createElement('datalist');
+        datalist.id = `autocomplete-list-${index}`;
+        input.setAttribute('list', datalist.id);
+        input.parentElement.appendChild(datalist);
+
+        onTyping(input, query => {
+            fetchResults(input.dataset.autocompleteUrl, query).then(results => {
+                datalist.replaceChildren(...results.map(result => new Option(result.text)));
+            });
+        });
+    });
+}
+
 // Notification System
 function initializeNotifications() {
     // Auto-hide alerts with progress bar